@@ -0,0 +1,112 @@
+"""Benchmark : liste des applications de l'onglet Quotas avec des milliers d'exécutables.
+
+Compare, sur une base temporaire contenant `--apps` applications distinctes :
+- l'ancien rafraîchissement (toutes les 5 s) : QComboBox.clear(), relecture de toutes les
+  applications de la base et ajout de chaque élément avec son icône ;
+- le catalogue incrémental : synchronisation (applications ajoutées depuis la dernière fois)
+  puis insertion des seules nouveautés dans le modèle du combo box.
+
+Usage :
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_app_catalog.py [--apps 5000] [--ticks 20]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication, QComboBox
+
+from tracker import db_manager
+from tracker.app_catalog import AppCatalog
+from tracker.icon_manager import icon_manager
+from ui.table_models import AppListModel
+
+def populate(apps):
+    """Une session par application distincte"""
+    now = datetime.now().replace(microsecond=0).isoformat()
+    db_manager.insert_sessions((f"App {i:05d}", f"D:\\Outils\\App{i}\\app{i}.exe", now, now, 1)
+                               for i in range(apps))
+
+def get_icon(app_name, app_path):
+    return icon_manager.get_cached_icon(app_name, app_path) or icon_manager.get_default_icon()
+
+def legacy_tick(combo):
+    """Ancien update_app_combo : tout vider puis tout relire et tout réinsérer"""
+    db_manager.bump_data_version()  # une session écrite entre deux rafraîchissements
+    combo.clear()
+    for app_name, app_path in db_manager.get_all_apps():
+        combo.addItem(get_icon(app_name, app_path), app_name)
+
+def catalog_tick(catalog, model, position):
+    """Nouveau chemin : synchronisation puis insertion des seuls ajouts"""
+    db_manager.bump_data_version()
+    catalog.sync()
+    new_apps, position = catalog.get_since(position)
+    model.add_apps(new_apps)
+    return position
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", type=int, default=5000)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    try:
+        db_manager.set_db_path(os.path.join(workdir, "catalog.db"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            db_manager.init_db()
+        populate(args.apps)
+
+        combo = QComboBox()
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            legacy_tick(combo)
+        legacy_ms = (time.perf_counter() - start) * 1000 / args.ticks
+        combo.setCurrentIndex(args.apps // 2)
+        legacy_tick(combo)
+        legacy_kept = combo.currentIndex() == args.apps // 2
+
+        catalog = AppCatalog()
+        model = AppListModel(get_icon)
+        combo = QComboBox()
+        combo.setModel(model)
+        start = time.perf_counter()
+        position = catalog_tick(catalog, model, 0)
+        first_ms = (time.perf_counter() - start) * 1000
+        combo.setCurrentIndex(args.apps // 2)
+        selected = combo.currentText()
+
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            position = catalog_tick(catalog, model, position)
+        catalog_ms = (time.perf_counter() - start) * 1000 / args.ticks
+
+        # Une nouvelle application arrive : elle est insérée sans perdre la sélection
+        start = time.perf_counter()
+        db_manager.insert_sessions([("AAA Nouvelle", None, datetime.now().isoformat(),
+                                     datetime.now().isoformat(), 1)])
+        position = catalog_tick(catalog, model, position)
+        addition_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{args.apps} applications distinctes")
+        print(f"{'ancien rafraîchissement':<34}{legacy_ms:>10.2f} ms/tick  (sélection conservée : {legacy_kept})")
+        print(f"{'catalogue, premier remplissage':<34}{first_ms:>10.2f} ms")
+        print(f"{'catalogue, tick sans nouveauté':<34}{catalog_ms:>10.3f} ms/tick")
+        print(f"{'catalogue, une nouvelle application':<34}{addition_ms:>10.2f} ms  "
+              f"(sélection conservée : {combo.currentText() == selected})")
+    finally:
+        db_manager.close_all_connections()
+        shutil.rmtree(workdir, ignore_errors=True)
+        app.quit()
+
+if __name__ == "__main__":
+    main()
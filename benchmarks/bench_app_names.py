@@ -0,0 +1,118 @@
+"""Benchmark : coût d'une résolution de nom d'application (ancien code vs règles compilées).
+
+Compare, par appel :
+- l'ancien TimeTracker.get_friendly_app_name (dictionnaire reconstruit à chaque appel,
+  `import os` dans la fonction, recherche linéaire des dossiers système) ;
+- CompiledRules.resolve (règles précompilées, sans mémo) ;
+- AppNameResolver.resolve (mémo, cas courant du tracking).
+
+Un fichier de règles utilisateur est généré (noms exacts, globs et regex) pour mesurer aussi
+le coût des motifs.
+
+Usage :
+    python benchmarks/bench_app_names.py [--iterations 200000] [--user-rules 50]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker.app_names import AppNameResolver, BUILTIN_EXACT, CompiledRules
+
+SAMPLES = [
+    ("chrome.exe", "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"),
+    ("Code.exe", "C:\\Users\\dev\\AppData\\Local\\Programs\\Microsoft VS Code\\Code.exe"),
+    ("explorer.exe", "C:\\Windows\\explorer.exe"),
+    ("Discord.exe", "C:\\Users\\dev\\AppData\\Local\\Discord\\app-1.0.9\\Discord.exe"),
+    ("idea64.exe", "D:\\JetBrains\\IntelliJ IDEA 2024.1\\bin\\idea64.exe"),
+    ("game.exe", "D:\\SteamLibrary\\steamapps\\common\\Hades\\game.exe"),
+    ("outil.exe", "D:\\Outils\\OutilMaison\\outil.exe"),
+    ("unknown.exe", "C:\\Program Files (x86)\\Vendor\\unknown.exe"),
+]
+
+# --- Ancien chemin : copie de TimeTracker.get_friendly_app_name avant compilation ---
+
+def legacy_friendly_app_name(exe_name, exe_path):
+    app_names = dict(BUILTIN_EXACT)  # le littéral était reconstruit à chaque appel
+
+    if exe_name.lower() in app_names:
+        return app_names[exe_name.lower()]
+
+    if exe_path:
+        try:
+            import os
+            parent_dir = os.path.basename(os.path.dirname(exe_path))
+            clean_name = parent_dir.replace(" (x86)", "").replace(" (x64)", "")
+            if not any(system_path in exe_path.lower() for system_path in [
+                "windows", "program files", "system32", "syswow64", "appdata"
+            ]):
+                return clean_name
+        except:
+            pass
+
+    return exe_name.replace('.exe', '').title()
+
+def write_user_rules(path, count):
+    """Fichier de règles utilisateur réaliste : moitié noms exacts, quart globs, quart regex"""
+    rng = random.Random(1)
+    config = {"exact": {}, "glob": {}, "regex": {}}
+    for i in range(count):
+        kind = ("exact", "exact", "glob", "regex")[i % 4]
+        if kind == "exact":
+            config["exact"][f"interne{i}.exe"] = f"Outil interne {i}"
+        elif kind == "glob":
+            config["glob"][f"*\\Vendor{i}\\*\\app{rng.randint(0, 99)}.exe"] = f"Vendor {i}"
+        else:
+            config["regex"][f".*\\\\projet{i}\\\\(bin|build)\\\\[^\\\\]+\\.exe"] = f"Projet {i}"
+    config["glob"]["*\\steamapps\\common\\*"] = "Jeu Steam"
+    config["exact"]["outil.exe"] = "Outil Maison"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+
+def measure(func, iterations):
+    """Retourne le coût moyen d'un appel en microsecondes"""
+    samples = SAMPLES * (iterations // len(SAMPLES))
+    start = time.perf_counter()
+    for exe_name, exe_path in samples:
+        func(exe_name, exe_path)
+    return (time.perf_counter() - start) * 1e6 / len(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--user-rules", type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    try:
+        config_path = os.path.join(workdir, "app_names.json")
+        write_user_rules(config_path, args.user_rules)
+        resolver = AppNameResolver(config_path)
+        without_rules = CompiledRules()
+        with open(config_path, encoding="utf-8") as f:
+            with_rules = CompiledRules.from_config(json.load(f))
+
+        results = [
+            ("ancien get_friendly_app_name", measure(legacy_friendly_app_name, args.iterations)),
+            ("règles intégrées compilées", measure(without_rules.resolve, args.iterations)),
+            (f"+ {args.user_rules} règles utilisateur", measure(with_rules.resolve, args.iterations)),
+            ("AppNameResolver (mémo)", measure(resolver.resolve, args.iterations)),
+        ]
+        print(f"\n{'Résolution':<36}{'µs/appel':>10}")
+        for label, micros in results:
+            print(f"{label:<36}{micros:>10.3f}")
+
+        print("\nExemples :")
+        for exe_name, exe_path in SAMPLES:
+            print(f"  {exe_name:<14} -> {resolver.resolve(exe_name, exe_path)}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark : volume de sessions écrites avec et sans regroupement des allers-retours.
+
+Rejoue (SimulatedForegroundSource, speed=inf) une journée de travail bruitée : longues sessions
+entrecoupées d'Alt+Tab rapides, de notifications de 1 à 4 s et de flashs de l'explorateur,
+puis compare, pour le pipeline complet (TimeTracker -> regroupement -> file d'écriture -> SQLite) :
+- le nombre de lignes de sessions et de lots écrits ;
+- la taille de la base ;
+- le temps réattribué par le regroupement (écart par application avec le scénario).
+Vérifie d'abord qu'une longue session suivie d'un aller-retour est écrite sans attendre
+la fin de la session en cours (check_release).
+
+Usage :
+    python benchmarks/bench_coalescer.py [--blocks 400] [--min-dwell 3] [--bounce-gap 10]
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker import db_manager
+from tracker.foreground import SimulatedForegroundSource
+from tracker.session_coalescer import SessionCoalescer
+from tracker.time_tracker import TimeTracker
+
+WORK_APPS = ["code.exe", "chrome.exe", "winword.exe", "excel.exe", "figma.exe"]
+NOISE_APPS = ["slack.exe", "discord.exe", "teams.exe", "outlook.exe"]
+
+def make_script(blocks, seed=3):
+    """Sessions de travail de 1 à 15 min, chacune suivie de bruit aléatoire"""
+    rng = random.Random(seed)
+    script, previous = [], None
+    for _ in range(blocks):
+        app = rng.choice([app for app in WORK_APPS if app != previous])
+        previous = app
+        script.append((app, rng.uniform(60, 900)))
+        for _ in range(rng.randint(0, 4)):
+            kind = rng.random()
+            if kind < 0.4:
+                # Alt+Tab vers une autre application puis retour
+                script.append((rng.choice(NOISE_APPS), rng.uniform(2, 8)))
+                script.append((app, rng.uniform(5, 120)))
+            elif kind < 0.8:
+                # Notification qui prend le focus quelques secondes
+                script.append((rng.choice(NOISE_APPS), rng.uniform(1, 4)))
+                script.append((app, rng.uniform(5, 120)))
+            else:
+                # Flash de l'explorateur
+                script.append(("explorer.exe", rng.uniform(0.2, 1)))
+                script.append((app, rng.uniform(5, 120)))
+    return script
+
+def check_release():
+    """Chrome 9h-10h, Slack 5 s, puis Chrome encore au premier plan : à la libération,
+    la première heure (Slack compris) part à l'écriture sans attendre le second Chrome"""
+    written = []
+    coalescer = SessionCoalescer(lambda *session: written.append(session), min_dwell=3, bounce_gap=10)
+    nine = datetime(2026, 1, 5, 9)
+    coalescer.add("Chrome", "chrome.exe", nine, nine + timedelta(hours=1))
+    coalescer.add("Slack", "slack.exe", nine + timedelta(hours=1), nine + timedelta(hours=1, seconds=5))
+    coalescer.release("Chrome")
+    assert written == [("Chrome", "chrome.exe", nine.isoformat(),
+                        (nine + timedelta(hours=1, seconds=5)).isoformat(), 3605)], written
+    assert coalescer.pending_segments() == [] and coalescer.bounces_merged == 1
+
+    # Le second Chrome, terminé plus tard, devient une ligne contiguë à la première
+    coalescer.add("Chrome", "chrome.exe", nine + timedelta(hours=1, seconds=5), nine + timedelta(hours=2))
+    coalescer.flush()
+    assert len(written) == 2 and written[1][2] == written[0][3], written
+
+def run(workdir, name, script, min_dwell, bounce_gap):
+    """Rejoue le scénario ; retourne le tracker, les lignes écrites, la taille et le temps par app"""
+    path = os.path.join(workdir, name)
+    db_manager.set_db_path(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db_manager.init_db()
+        tracker = TimeTracker(SimulatedForegroundSource(script, speed=math.inf, loop=False),
+                              min_dwell=min_dwell, bounce_gap=bounce_gap)
+        tracker.start_tracking()
+        tracker.tracking_thread.join()
+        tracker.shutdown()
+
+    conn = db_manager.get_connection()
+    rows = conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+    totals = defaultdict(int)
+    for app_name, seconds in conn.execute('SELECT app_name, SUM(duration_sec) FROM session_details GROUP BY app_name'):
+        totals[app_name] = seconds
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    size = os.path.getsize(path)
+    db_manager.close_all_connections()
+    return tracker, rows, size, totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=400)
+    parser.add_argument("--min-dwell", type=float, default=3.0)
+    parser.add_argument("--bounce-gap", type=float, default=10.0)
+    args = parser.parse_args()
+
+    check_release()
+    script = make_script(args.blocks)
+    hours = sum(seconds for _, seconds in script) / 3600
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    try:
+        raw, raw_rows, raw_size, raw_totals = run(workdir, "raw.db", script, 0, 0)
+        coalesced, rows, size, totals = run(workdir, "coalesced.db", script, args.min_dwell, args.bounce_gap)
+
+        print(f"Scénario : {len(script)} changements de fenêtre sur {hours:.1f} h")
+        print(f"{'':<22}{'lignes':>10}{'lots':>8}{'base (Ko)':>12}")
+        print(f"{'sans regroupement':<22}{raw_rows:>10}{raw.session_writer.flush_count:>8}{raw_size // 1024:>12}")
+        print(f"{'avec regroupement':<22}{rows:>10}{coalesced.session_writer.flush_count:>8}{size // 1024:>12}")
+        print(f"Lignes : {raw_rows / rows:.1f}x moins")
+
+        stats = coalesced.coalescer.get_stats()
+        total = sum(raw_totals.values())
+        print(f"\nRegroupement : {stats['rows_saved']} lignes évitées, {stats['blips_absorbed']} passages brefs, "
+              f"{stats['bounces_merged']} allers-retours")
+        print(f"Temps réattribué : {stats['reattributed_seconds']:.0f} s "
+              f"({stats['reattributed_seconds'] / total * 100:.2f} % du temps suivi)")
+        print(f"\n{'Application':<22}{'sans (s)':>10}{'avec (s)':>10}{'écart (s)':>11}")
+        for app_name in sorted(raw_totals, key=raw_totals.get, reverse=True):
+            print(f"{app_name:<22}{raw_totals[app_name]:>10}{totals.get(app_name, 0):>10}"
+                  f"{totals.get(app_name, 0) - raw_totals[app_name]:>11}")
+    finally:
+        db_manager.close_all_connections()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
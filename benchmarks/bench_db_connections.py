@@ -0,0 +1,202 @@
+"""Benchmark : connexion par appel (ancien chemin) vs connexion partagée WAL.
+
+Génère une base de test avec un million de sessions au format d'origine (app_name et
+app_path répétés dans chaque session), la migre au schéma actuel (table apps) puis compare :
+- le coût d'une lecture simple (liste des quotas) et d'un tick complet de rafraîchissement
+  de l'interface (les requêtes faites par ChronixMainWindow.update_stats) ;
+- le coût d'une écriture de session ;
+  les deux chemins exécutent le même SQL sur une copie de la base d'origine, sans cache ni
+  cumuls quotidiens : seul le coût des connexions (et du journal WAL) diffère ;
+- la taille de la base avant (sessions avec app_name/app_path, version 3) et après la
+  table apps, ainsi que la durée de la migration.
+
+Usage :
+    python benchmarks/bench_db_connections.py [--sessions 1000000] [--iterations 20]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker import db_manager
+
+APPS = ["Chrome", "Firefox", "VS Code", "Discord", "Slack", "Steam", "Python",
+        "Explorateur Windows", "Microsoft Word", "Microsoft Excel", "Spotify", "Figma"]
+QUOTA_APPS = APPS[:6]
+
+def populate(path, sessions):
+    """Crée une base au schéma d'origine avec `sessions` sessions sur les deux dernières années"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            app_name TEXT,
+            app_path TEXT,
+            start_time TEXT,
+            end_time TEXT,
+            duration_sec INTEGER
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE quotas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            app_name TEXT UNIQUE,
+            daily_limit_minutes INTEGER,
+            enabled BOOLEAN DEFAULT 1
+        )
+    ''')
+
+    now = datetime.now()
+    rng = random.Random(42)
+
+    def rows():
+        for _ in range(sessions):
+            start = now - timedelta(seconds=rng.randint(0, 730 * 86400))
+            duration = rng.randint(1, 1800)
+            end = start + timedelta(seconds=duration)
+            app = rng.choice(APPS)
+            yield (app, f"C:\\Program Files\\{app}\\{app}.exe", start.isoformat(), end.isoformat(), duration)
+
+    with conn:
+        conn.executemany('''
+            INSERT INTO sessions (app_name, app_path, start_time, end_time, duration_sec)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows())
+        for app in QUOTA_APPS:
+            conn.execute('INSERT OR REPLACE INTO quotas (app_name, daily_limit_minutes, enabled) VALUES (?, ?, 1)',
+                         (app, 120))
+    conn.close()
+
+def migrate(path, up_to=None):
+    """Migre la base (jusqu'à la version `up_to`, compactée) ; retourne la durée en secondes"""
+    migrations = db_manager.MIGRATIONS
+    if up_to is not None:
+        db_manager.MIGRATIONS = [entry for entry in migrations if entry[0] <= up_to]
+    try:
+        start = time.perf_counter()
+        db_manager.set_db_path(path)
+        db_manager.init_db()
+        if up_to is not None:
+            db_manager.vacuum()
+        elapsed = time.perf_counter() - start
+    finally:
+        db_manager.MIGRATIONS = migrations
+        db_manager.close_all_connections()
+    return elapsed
+
+# Les deux chemins exécutent les mêmes requêtes sur le schéma d'origine, sans le cache des
+# lectures ni les cumuls quotidiens : seule la gestion des connexions est comparée
+
+INSERT_SQL = '''
+    INSERT INTO sessions (app_name, app_path, start_time, end_time, duration_sec)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+def tick(query):
+    """Les lectures d'un rafraîchissement de l'interface (ChronixMainWindow.update_stats)"""
+    today = datetime.now().date().isoformat()
+    daily = '''SELECT app_name, SUM(duration_sec) FROM sessions
+               WHERE DATE(start_time) = ? GROUP BY app_name'''
+    for _ in range(3):  # résumé, top apps, graphique
+        query(daily, (today,))
+    query(daily, (today,))  # tableau des statistiques
+    quotas = query('SELECT app_name, daily_limit_minutes FROM quotas WHERE enabled = 1')
+    for app_name, _ in quotas:
+        query('SELECT daily_limit_minutes FROM quotas WHERE app_name = ? AND enabled = 1', (app_name,))
+        query('''SELECT SUM(duration_sec) FROM sessions
+                 WHERE app_name = ? AND DATE(start_time) = ?''', (app_name, today))
+    query('SELECT DISTINCT app_name, app_path FROM sessions ORDER BY app_name')
+
+# --- Ancien chemin : une connexion (et un journal rollback) par appel ---------
+
+def legacy_query(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    results = cursor.fetchall()
+    conn.close()
+    return results
+
+def legacy_insert(path, row):
+    conn = sqlite3.connect(path)
+    conn.execute(INSERT_SQL, row)
+    conn.commit()
+    conn.close()
+
+# --- Nouveau chemin : connexion partagée par thread (WAL) --------------------
+
+def pooled_query(sql, params=()):
+    return db_manager.get_connection().execute(sql, params).fetchall()
+
+def pooled_insert(row):
+    conn = db_manager.get_connection()
+    with conn:
+        conn.execute(INSERT_SQL, row)
+
+def measure(func, iterations):
+    """Retourne le temps moyen d'un appel en millisecondes"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    pooled_path = os.path.join(workdir, "pooled.db")
+    shared_path = os.path.join(workdir, "shared.db")
+    legacy_path = os.path.join(workdir, "legacy.db")
+    v3_path = os.path.join(workdir, "v3.db")
+    try:
+        print(f"Génération de {args.sessions} sessions...")
+        # L'ancien chemin utilisait le schéma d'origine et le journal rollback par défaut
+        populate(legacy_path, args.sessions)
+        shutil.copy(legacy_path, pooled_path)
+        shutil.copy(legacy_path, shared_path)
+        shutil.copy(legacy_path, v3_path)
+        migrate(v3_path, up_to=3)
+        migration_seconds = migrate(pooled_path)
+
+        # Schéma d'origine, sans migration : mêmes tables que l'ancien chemin
+        db_manager.set_db_path(shared_path)
+        quota_sql = 'SELECT app_name, daily_limit_minutes FROM quotas WHERE enabled = 1'
+        sample = ("Chrome", "C:\\Apps\\Chrome.exe", datetime.now().isoformat(),
+                  datetime.now().isoformat(), 1)
+
+        results = [
+            ("lecture simple (quotas)",
+             measure(lambda: legacy_query(legacy_path, quota_sql), args.iterations * 50),
+             measure(lambda: pooled_query(quota_sql), args.iterations * 50)),
+            ("tick update_stats complet",
+             measure(lambda: tick(lambda sql, params=(): legacy_query(legacy_path, sql, params)), args.iterations),
+             measure(lambda: tick(pooled_query), args.iterations)),
+            ("écriture d'une session",
+             measure(lambda: legacy_insert(legacy_path, sample), args.iterations * 10),
+             measure(lambda: pooled_insert(sample), args.iterations * 10)),
+        ]
+
+        print(f"\n{'Opération':<32}{'par appel (ms)':>16}{'partagée (ms)':>16}{'gain':>8}")
+        for label, legacy_ms, pooled_ms in results:
+            print(f"{label:<32}{legacy_ms:>16.3f}{pooled_ms:>16.3f}{legacy_ms / pooled_ms:>7.1f}x")
+
+        v3_size, pooled_size = os.path.getsize(v3_path), os.path.getsize(pooled_path)
+        print(f"\nTaille : {v3_size / 1e6:.1f} Mo (noms répétés dans les sessions) -> "
+              f"{pooled_size / 1e6:.1f} Mo (table apps) : {100 * (1 - pooled_size / v3_size):.0f} % de moins ; "
+              f"migration complète en {migration_seconds:.1f} s")
+    finally:
+        db_manager.close_all_connections()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark : export des sessions, lecture complète (fetchall) vs flux par lots (fetchmany).
+
+Pour des historiques de taille croissante (`--sessions`, liste séparée par des virgules) :
+- lecture de toutes les lignes avec fetchall puis écriture du CSV (mémoire proportionnelle) ;
+- export_sessions : lots de `--batch-size` lignes écrits au fil de l'eau (mémoire constante).
+Mesure le pic de mémoire Python (tracemalloc) et la durée, puis compare les formats et le
+niveau de compression gzip sur le plus grand historique.
+
+Usage :
+    python benchmarks/bench_export.py [--sessions 100000,1000000] [--batch-size 5000]
+"""
+import argparse
+import contextlib
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker import db_manager, export
+
+def populate(count):
+    """Sessions d'une minute réparties sur 60 applications, insérées directement en SQL"""
+    conn = db_manager.get_connection()
+    start = datetime.now() - timedelta(minutes=count)
+    with conn:
+        conn.execute('DELETE FROM sessions')
+        conn.executemany('INSERT OR IGNORE INTO apps (id, name, path) VALUES (?, ?, ?)',
+                         [(i + 1, f"App {i}", f"C:\\Program Files\\App{i}\\app{i}.exe") for i in range(60)])
+
+        def rows():
+            for i in range(count):
+                begin = start + timedelta(minutes=i)
+                yield (i % 60 + 1, begin.isoformat(), (begin + timedelta(minutes=1)).isoformat(), 60,
+                       int(begin.timestamp()), int(begin.timestamp()) + 60, begin.date().isoformat())
+        conn.executemany('''
+            INSERT INTO sessions (app_id, start_time, end_time, duration_sec, start_ts, end_ts, day)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows())
+
+def export_fetchall(path):
+    """Ancienne approche : tout le résultat en mémoire, puis écriture"""
+    rows = db_manager.get_connection().execute('''
+        SELECT id, app_name, app_path, start_time, end_time, duration_sec, day
+        FROM session_details ORDER BY id
+    ''').fetchall()
+    with open(path, "w", encoding="utf-8", newline="") as output:
+        writer = csv.writer(output)
+        writer.writerow(export.COLUMNS)
+        writer.writerows(rows)
+    return len(rows)
+
+def measure(func):
+    """Retourne (durée en s, pic de mémoire Python en Mo) : deux appels, la durée étant
+    mesurée sans tracemalloc (qui ralentit chaque allocation)"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="100000,1000000", help="tailles d'historique, séparées par des virgules")
+    parser.add_argument("--batch-size", type=int, default=db_manager.EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    try:
+        db_manager.set_db_path(os.path.join(workdir, "chronix.db"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            db_manager.init_db()
+        output = os.path.join(workdir, "sessions")
+
+        print(f"{'sessions':>10}{'fetchall (s)':>14}{'pic (Mo)':>10}{'par lots (s)':>14}{'pic (Mo)':>10}")
+        for count in (int(size) for size in args.sessions.split(",")):
+            populate(count)
+            full_s, full_mb = measure(lambda: export_fetchall(output + ".full.csv"))
+            stream_s, stream_mb = measure(lambda: export.export_sessions(output + ".csv", batch_size=args.batch_size))
+            with open(output + ".full.csv", "rb") as a, open(output + ".csv", "rb") as b:
+                assert a.read() == b.read()
+            print(f"{count:>10}{full_s:>14.2f}{full_mb:>10.1f}{stream_s:>14.2f}{stream_mb:>10.1f}")
+
+        print(f"\n{'format':<22}{'durée (s)':>10}{'taille (Mo)':>13}")
+        variants = [("CSV", ".csv", {}), ("CSV gzip niveau 6", ".csv.gz", {}),
+                    ("CSV gzip niveau 9", ".9.csv.gz", {"level": 9}), ("JSON Lines", ".jsonl", {}),
+                    ("JSON Lines gzip", ".jsonl.gz", {})]
+        for label, suffix, options in variants:
+            export.GZIP_LEVEL = options.get("level", 6)
+            start = time.perf_counter()
+            export.export_sessions(output + suffix, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<22}{elapsed:>10.2f}{os.path.getsize(output + suffix) / (1024 * 1024):>13.1f}")
+    finally:
+        db_manager.close_all_connections()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark : pipeline de tracking complet avec une source de fenêtres simulée (Linux/CI).
+
+Mesure, sur une base temporaire :
+- le débit de bout en bout (source -> TimeTracker -> file d'écriture -> SQLite) en rejouant
+  un scénario sans attente (SimulatedForegroundSource, speed=inf) ;
+- l'erreur d'attribution et le nombre de réveils d'une source par événements comparée
+  à une scrutation périodique, en rejouant le même scénario en temps réel.
+
+Usage :
+    python benchmarks/bench_foreground.py [--switches 5000] [--realtime 20] [--interval 1.0]
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker import db_manager
+from tracker.foreground import PollingForegroundSource, SimulatedForegroundSource
+from tracker.time_tracker import TimeTracker
+
+APPS = ["chrome.exe", "code.exe", "slack.exe", "discord.exe", "explorer.exe", "spotify.exe", "figma.exe"]
+
+def make_script(switches, min_seconds, max_seconds, seed=42):
+    """Scénario aléatoire mais reproductible, sans deux fois la même application de suite"""
+    rng = random.Random(seed)
+    script, previous = [], None
+    for _ in range(switches):
+        exe_name = rng.choice([app for app in APPS if app != previous])
+        script.append((exe_name, round(rng.uniform(min_seconds, max_seconds), 3)))
+        previous = exe_name
+    return script
+
+def run_tracker(source, wait):
+    """Fait tourner un TimeTracker sur la source ; `wait(tracker)` rend la main à l'arrêt"""
+    # Sans regroupement : on mesure la précision de la source elle-même
+    tracker = TimeTracker(source, min_dwell=0, bounce_gap=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracker.start_tracking()
+        wait(tracker)
+        tracker.shutdown()
+    return tracker
+
+def recorded_seconds():
+    """Temps enregistré par application, calculé depuis les horodatages des sessions"""
+    totals = defaultdict(float)
+    rows = db_manager.get_connection().execute('SELECT app_name, start_time, end_time FROM session_details')
+    for app_name, start, end in rows:
+        totals[app_name] += (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds()
+    return totals
+
+def expected_seconds(tracker, script):
+    """Temps attendu par application (nom convivial) d'après le scénario"""
+    totals = defaultdict(float)
+    for exe_name, seconds in script:
+        totals[tracker.get_friendly_app_name(exe_name, None)] += seconds
+    return totals
+
+def fresh_db(workdir, name):
+    db_manager.set_db_path(os.path.join(workdir, name))
+    with contextlib.redirect_stdout(io.StringIO()):
+        db_manager.init_db()
+
+def attribution_error(tracker, script):
+    expected, recorded = expected_seconds(tracker, script), recorded_seconds()
+    return sum(abs(expected[app] - recorded.get(app, 0.0)) for app in expected)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--switches", type=int, default=5000)
+    parser.add_argument("--realtime", type=float, default=20.0, help="durée du scénario en temps réel (s)")
+    parser.add_argument("--interval", type=float, default=1.0, help="intervalle de la scrutation comparée (s)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    try:
+        # --- Débit de bout en bout ------------------------------------------------
+        fresh_db(workdir, "throughput.db")
+        script = make_script(args.switches, 1, 600)
+        source = SimulatedForegroundSource(script, speed=math.inf, loop=False)
+        start = time.perf_counter()
+        tracker = run_tracker(source, lambda tracker: tracker.tracking_thread.join())
+        elapsed = time.perf_counter() - start
+        writer = tracker.session_writer.get_stats()
+        print(f"Débit : {args.switches} changements en {elapsed * 1000:.0f} ms "
+              f"({args.switches / elapsed:,.0f}/s), {writer['written']} sessions écrites "
+              f"en {writer['flush_count']} lots, {writer['dropped']} perdues")
+        print(f"Erreur d'attribution totale : {attribution_error(tracker, script):.3f} s "
+              f"(troncature des durées à la seconde non comprise)")
+
+        # --- Événements vs scrutation, en temps réel ------------------------------
+        # Segments d'au moins 1 s : TimeTracker ignore les sessions de durée nulle
+        switches = max(2, int(args.realtime / 1.8))
+        script = make_script(switches, 1.1, 2.5, seed=7)
+        duration = sum(seconds for _, seconds in script)
+        print(f"\nScénario temps réel : {switches} changements sur {duration:.1f} s")
+        print(f"{'Source':<28}{'réveils':>10}{'erreur (s)':>14}{'erreur/chgt (ms)':>18}")
+
+        fresh_db(workdir, "events.db")
+        source = SimulatedForegroundSource(script, loop=False)
+        tracker = run_tracker(source, lambda tracker: tracker.tracking_thread.join())
+        error = attribution_error(tracker, script)
+        print(f"{'événements':<28}{source.events:>10}{error:>14.3f}{error / switches * 1000:>18.1f}")
+
+        fresh_db(workdir, "polling.db")
+        reference = SimulatedForegroundSource(script, loop=False)
+        origin = time.monotonic()
+        source = PollingForegroundSource(probe=lambda: reference.probe_at(time.monotonic() - origin),
+                                         interval=args.interval)
+        tracker = run_tracker(source, lambda tracker: time.sleep(duration - (time.monotonic() - origin)))
+        error = attribution_error(tracker, script)
+        print(f"{f'scrutation ({args.interval:g} s)':<28}{source.wakeups:>10}{error:>14.3f}"
+              f"{error / switches * 1000:>18.1f}")
+    finally:
+        db_manager.close_all_connections()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark : carte d'activité application × jour de la semaine × heure sur une longue période.
+
+Compare, sur une base de `--days` jours d'historique simulé :
+- le calcul naïf : toutes les sessions relues en Python puis découpées heure par heure ;
+- get_usage_heatmap : découpage vectorisé numpy (premier appel, cache des lectures, puis
+  nouveau calcul après l'écriture d'un lot de sessions : seules les nouvelles lignes sont lues).
+Vérifie au passage que les deux matrices sont identiques.
+
+Usage :
+    python benchmarks/bench_heatmap.py [--days 365] [--sessions-per-day 400]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from tracker import db_manager
+
+def populate(days, per_day, seed=5):
+    """Journées de travail de 8h à 20h, sessions de quelques secondes à plus d'une heure"""
+    rng = random.Random(seed)
+    apps = [(f"App {i}", f"C:\\Program Files\\App{i}\\app{i}.exe") for i in range(60)]
+    first_day = datetime.now().date() - timedelta(days=days)
+    for day in range(days):
+        # Horodatages issus de l'horloge réelle, comme ceux du tracker (pas d'heure inexistante
+        # lors du passage à l'heure d'été)
+        moment = datetime.combine(first_day + timedelta(days=day), datetime.min.time()).timestamp() + 8 * 3600
+        batch = []
+        for _ in range(per_day):
+            seconds = rng.choice([rng.uniform(3, 60), rng.uniform(60, 600), rng.uniform(600, 5400)])
+            app_name, app_path = apps[min(int(rng.expovariate(0.15)), len(apps) - 1)]
+            batch.append((app_name, app_path, datetime.fromtimestamp(moment).isoformat(),
+                          datetime.fromtimestamp(moment + seconds).isoformat(), int(seconds)))
+            moment += seconds + rng.choice([0, 0, 5, 120])
+        db_manager.insert_sessions(batch)
+    return first_day, first_day + timedelta(days=days - 1)
+
+def naive_heatmap(start_date, end_date):
+    """Ancienne approche : chaque session relue et découpée en Python, heure locale par heure
+    locale sur le temps réel (une heure sautée ou répétée au changement d'heure compte 0 ou 2 fois)"""
+    range_start = datetime.combine(start_date, datetime.min.time()).timestamp()
+    range_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time()).timestamp()
+    cells = {}
+    cursor = db_manager.get_connection().execute('''
+        SELECT app_name, start_time, end_time, duration_sec FROM session_details WHERE day BETWEEN ? AND ?
+    ''', ((start_date - timedelta(days=7)).isoformat(), end_date.isoformat()))
+    for app_name, start_time, end_time, duration_sec in cursor:
+        start = datetime.fromisoformat(start_time).replace(microsecond=0).timestamp()
+        end = datetime.fromisoformat(end_time).replace(microsecond=0).timestamp()
+        weight = duration_sec / (end - start) if end > start else 0
+        moment, end = max(start, range_start), min(end, range_end)
+        while moment < end:
+            local = time.localtime(moment)
+            next_hour = min(end, moment - (moment + local.tm_gmtoff) % 3600 + 3600)
+            key = (app_name, local.tm_wday, local.tm_hour)
+            cells[key] = cells.get(key, 0) + (next_hour - moment) * weight
+            moment = next_hour
+    return cells
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sessions-per-day", type=int, default=400)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    try:
+        db_manager.set_db_path(os.path.join(workdir, "chronix.db"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            db_manager.init_db()
+        start_date, end_date = populate(args.days, args.sessions_per_day)
+
+        start = time.perf_counter()
+        cells = naive_heatmap(start_date, end_date)
+        naive_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        app_names, matrix = db_manager.get_usage_heatmap(start_date, end_date)
+        vectorized_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        db_manager.get_usage_heatmap(start_date, end_date)
+        cached_ms = (time.perf_counter() - start) * 1000
+
+        moment = datetime.combine(end_date, datetime.min.time()) + timedelta(hours=21)
+        db_manager.insert_sessions([("App 0", "", (moment + timedelta(minutes=i)).isoformat(),
+                                     (moment + timedelta(minutes=i + 1)).isoformat(), 60) for i in range(50)])
+        start = time.perf_counter()
+        db_manager.get_usage_heatmap(start_date, end_date)
+        incremental_ms = (time.perf_counter() - start) * 1000
+
+        expected = np.zeros_like(matrix)
+        for (app_name, weekday, hour), seconds in cells.items():
+            expected[app_names.index(app_name), weekday, hour] = seconds
+        error = np.abs(matrix - expected).max()
+
+        print(f"{args.days * args.sessions_per_day} sessions sur {args.days} jours, {len(app_names)} applications")
+        print(f"{'découpage Python par session':<34}{naive_ms:>10.0f} ms")
+        print(f"{'get_usage_heatmap (numpy)':<34}{vectorized_ms:>10.0f} ms  ({naive_ms / vectorized_ms:.1f}x)")
+        print(f"{'get_usage_heatmap (cache)':<34}{cached_ms:>10.3f} ms")
+        print(f"{'après un lot de 50 sessions':<34}{incremental_ms:>10.0f} ms")
+        print(f"Écart maximal entre les deux matrices : {error:.6f} s")
+    finally:
+        db_manager.close_all_connections()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark : coût d'une icône d'application dans le thread de l'interface.
+
+Compare, pour `--apps` applications :
+- l'ancien chemin : rendu d'une pastille (QPixmap, antialiasing, police) à chaque échec du cache ;
+- un démarrage à froid : le thread de l'interface ne fait que planifier le rendu ;
+- un démarrage à chaud : PNG déjà rendus, relus depuis le disque par le même thread ;
+- le cache mémoire (LRU bornée).
+
+Usage :
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_icons.py [--apps 2000] [--memory 256]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication
+
+from tracker.icon_manager import IconManager
+
+def measure(func, apps):
+    """Retourne le coût moyen d'un appel en microsecondes"""
+    start = time.perf_counter()
+    for app_name, exe_path in apps:
+        func(app_name, exe_path)
+    return (time.perf_counter() - start) * 1e6 / len(apps)
+
+def wait_for_renders(app, manager, timeout=60.0):
+    """Traite les événements jusqu'à la fin des rendus en arrière-plan ; retourne la durée"""
+    start = time.perf_counter()
+    while manager.get_stats()["pending"] and time.perf_counter() - start < timeout:
+        app.processEvents()
+        time.sleep(0.001)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", type=int, default=2000)
+    parser.add_argument("--memory", type=int, default=256, help="taille du cache mémoire")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    apps = [(f"App {i:05d}", os.path.join(workdir, f"app{i}.exe")) for i in range(args.apps)]
+    try:
+        cache_dir = os.path.join(workdir, "icon_cache")
+
+        legacy = IconManager(cache_dir=cache_dir)
+        legacy_us = measure(lambda app_name, _: legacy.create_text_icon(app_name[0], app_name), apps)
+
+        cold = IconManager(cache_dir=cache_dir, max_memory_icons=args.memory)
+        cold_us = measure(cold.get_cached_icon, apps)
+        render_seconds = wait_for_renders(app, cold)
+
+        warm = IconManager(cache_dir=cache_dir, max_memory_icons=args.memory)
+        warm_us = measure(warm.get_cached_icon, apps)
+        load_seconds = wait_for_renders(app, warm)
+        hot = apps[-args.memory:]  # les plus récemment utilisées, encore en mémoire
+        memory_us = measure(warm.get_cached_icon, hot)
+        stats = warm.get_stats()
+
+        print(f"{args.apps} applications, cache mémoire de {args.memory} icônes")
+        print(f"{'ancien rendu synchrone':<34}{legacy_us:>10.1f} µs/icône")
+        print(f"{'démarrage à froid (planification)':<34}{cold_us:>10.1f} µs/icône  "
+              f"(rendu en arrière-plan : {render_seconds * 1000:.0f} ms au total)")
+        print(f"{'démarrage à chaud (PNG sur disque)':<34}{warm_us:>10.1f} µs/icône  "
+              f"(lecture en arrière-plan : {load_seconds * 1000:.0f} ms, {stats['renders']} rendu)")
+        print(f"{'cache mémoire':<34}{memory_us:>10.1f} µs/icône")
+        print(f"Icônes en mémoire : {stats['memory_size']} (bornées), sur disque : {len(os.listdir(cache_dir))}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        app.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark : coût d'un battement du journal de session face au chemin d'écriture de la base.
+
+Compare, sur une base contenant déjà `--sessions` sessions :
+- un battement du journal (réécriture en place d'un emplacement de 4 Ko), sans et avec fsync ;
+- l'alternative en base : mise à jour d'une ligne unique (INSERT OR REPLACE) dans une transaction ;
+- l'écriture d'une session seule (insert_session) et d'un lot de 50 (file d'écriture).
+Puis estime le coût par heure avec un battement toutes les `--interval` secondes.
+
+Usage :
+    python benchmarks/bench_journal.py [--sessions 100000] [--rounds 500] [--interval 30]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker import db_manager
+from tracker.session_journal import SessionJournal
+
+APPS = [(f"App {i}", f"C:\\Program Files\\App{i}\\app{i}.exe") for i in range(40)]
+
+def make_sessions(count, start):
+    """Sessions contiguës d'une minute, réparties sur les applications"""
+    sessions = []
+    for i in range(count):
+        app_name, app_path = APPS[i % len(APPS)]
+        begin = start + timedelta(minutes=i)
+        sessions.append((app_name, app_path, begin.isoformat(), (begin + timedelta(minutes=1)).isoformat(), 60))
+    return sessions
+
+def measure(func, rounds):
+    """Retourne le coût moyen d'un appel en microsecondes"""
+    start = time.perf_counter()
+    for i in range(rounds):
+        func(i)
+    return (time.perf_counter() - start) * 1e6 / rounds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=30.0, help="secondes entre deux battements")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    try:
+        db_manager.set_db_path(os.path.join(workdir, "chronix.db"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            db_manager.init_db()
+        start = datetime.now() - timedelta(minutes=args.sessions + 10 * args.rounds)
+        history = make_sessions(args.sessions, start)
+        for i in range(0, len(history), 5000):
+            db_manager.insert_sessions(history[i:i + 5000])
+        conn = db_manager.get_connection()
+        conn.execute('CREATE TABLE IF NOT EXISTS open_session (id INTEGER PRIMARY KEY CHECK (id = 1), '
+                     'app_name TEXT, app_path TEXT, start_time TEXT, heartbeat TEXT)')
+
+        # Contenu typique : une session dans la file, une en attente de regroupement, la session ouverte
+        upcoming = iter(make_sessions(52 * args.rounds + 1, start + timedelta(minutes=args.sessions)))
+        opened = datetime.now()
+        segments = [(APPS[0][0], APPS[0][1], opened - timedelta(minutes=3), opened - timedelta(minutes=2)),
+                    (APPS[1][0], APPS[1][1], opened - timedelta(minutes=2), opened - timedelta(minutes=1)),
+                    (APPS[2][0], APPS[2][1], opened - timedelta(minutes=1), None)]
+
+        fast = SessionJournal(os.path.join(workdir, "fast.session"), durable=False)
+        fast_us = measure(lambda i: fast.write(segments, opened + timedelta(seconds=i)), args.rounds)
+        durable = SessionJournal(os.path.join(workdir, "durable.session"))
+        durable_us = measure(lambda i: durable.write(segments, opened + timedelta(seconds=i)), args.rounds)
+        fast.close()
+        durable.close()
+
+        def upsert(i):
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO open_session VALUES (1, ?, ?, ?, ?)',
+                             (APPS[2][0], APPS[2][1], opened.isoformat(), (opened + timedelta(seconds=i)).isoformat()))
+        upsert_us = measure(upsert, args.rounds)
+
+        single_us = measure(lambda i: db_manager.insert_session(*next(upcoming)), args.rounds)
+        batch_us = measure(lambda i: db_manager.insert_sessions([next(upcoming) for _ in range(50)]),
+                           max(1, args.rounds // 10))
+
+        per_hour = 3600 / args.interval
+        print(f"Base : {args.sessions} sessions, {args.rounds} mesures")
+        print(f"{'opération':<40}{'µs/appel':>12}{'ms/heure':>12}")
+        rows = [
+            ("battement du journal (sans fsync)", fast_us, per_hour),
+            ("battement du journal (fsync)", durable_us, per_hour),
+            ("ligne unique en base (upsert)", upsert_us, per_hour),
+            ("insert_session (une session)", single_us, None),
+            ("insert_sessions (lot de 50)", batch_us, None),
+        ]
+        for label, cost, calls in rows:
+            hourly = f"{cost * calls / 1000:>12.1f}" if calls else f"{'':>12}"
+            print(f"{label:<40}{cost:>12.1f}{hourly}")
+        print(f"\nBattement toutes les {args.interval:g} s : {per_hour:.0f} écritures/heure, "
+              f"{durable_us * per_hour / 1e6 / 3600 * 100:.5f} % du temps avec fsync")
+        print(f"Un battement coûte {durable_us / single_us:.2f}x l'écriture d'une session seule, "
+              f"{durable_us / (batch_us / 50):.2f}x une session écrite par lot")
+    finally:
+        db_manager.close_all_connections()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
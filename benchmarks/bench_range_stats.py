@@ -0,0 +1,102 @@
+"""Benchmark : statistiques d'une période quelconque (mois, trimestre, année, tout l'historique).
+
+Compare, sur `--years` années de cumuls quotidiens (`--apps` applications par jour) :
+- l'ancienne requête : SUM(total_sec) sur daily_usage entre deux dates (coût proportionnel à la période) ;
+- get_range_stats : différence de deux colonnes des sommes cumulées (coût indépendant de la période) ;
+- get_range_stats après l'écriture d'une session (seuls les jours modifiés sont relus).
+
+Usage :
+    python benchmarks/bench_range_stats.py [--years 3] [--apps 40] [--rounds 50]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker import db_manager, periods
+
+def populate(days, apps, seed=11):
+    """Cumuls quotidiens directement dans daily_usage (les sessions ne sont pas lues ici)"""
+    rng = random.Random(seed)
+    first_day = datetime.now().date() - timedelta(days=days - 1)
+    rows = [((first_day + timedelta(days=day)).isoformat(), f"App {app}", rng.randint(60, 7200), rng.randint(1, 30), 600)
+            for day in range(days) for app in range(apps) if rng.random() < 0.8]
+    conn = db_manager.get_connection()
+    with conn:
+        conn.executemany('INSERT INTO daily_usage VALUES (?, ?, ?, ?, ?)', rows)
+    return len(rows)
+
+def sql_range_stats(start_date, end_date):
+    """Ancienne approche : agrégation SQL sur toute la période"""
+    return db_manager.get_connection().execute('''
+        SELECT app_name, SUM(total_sec) as total_seconds
+        FROM daily_usage
+        WHERE day BETWEEN ? AND ?
+        GROUP BY app_name
+        ORDER BY total_seconds DESC
+    ''', (start_date.isoformat(), end_date.isoformat())).fetchall()
+
+def measure(func, rounds):
+    """Retourne le coût moyen d'un appel en millisecondes"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--apps", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    try:
+        db_manager.set_db_path(os.path.join(workdir, "chronix.db"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            db_manager.init_db()
+        days = args.years * 365
+        rows = populate(days, args.apps)
+
+        start = time.perf_counter()
+        db_manager.get_range_stats(datetime.now().date(), datetime.now().date())
+        build_ms = (time.perf_counter() - start) * 1000
+
+        today = datetime.now().date()
+        ranges = [(name, periods.period_range(name)) for name in ("Ce mois", "Ce trimestre", "Cette année")]
+        ranges.append(("tout l'historique", (today - timedelta(days=days - 1), today)))
+
+        print(f"{rows} cumuls quotidiens sur {days} jours ; sommes cumulées construites en {build_ms:.0f} ms")
+        print(f"{'période':<20}{'SQL (ms)':>10}{'cumuls (ms)':>13}{'après écriture (ms)':>21}")
+        for name, (start_date, end_date) in ranges:
+            sql_ms = measure(lambda: sql_range_stats(start_date, end_date), args.rounds)
+            prefix_ms = measure(lambda: db_manager.get_range_stats(start_date, end_date), args.rounds)
+            assert dict(db_manager.get_range_stats(start_date, end_date)) == dict(sql_range_stats(start_date, end_date))
+
+            write_seconds = 0.0
+            for _ in range(args.rounds):
+                moment = datetime.now().replace(microsecond=0)
+                db_manager.insert_session("App 0", "", moment.isoformat(), (moment + timedelta(seconds=1)).isoformat(), 1)
+                start = time.perf_counter()
+                db_manager.get_range_stats(start_date, end_date)
+                write_seconds += time.perf_counter() - start
+            write_ms = write_seconds * 1000 / args.rounds
+            print(f"{name:<20}{sql_ms:>10.2f}{prefix_ms:>13.3f}{write_ms:>21.2f}")
+
+        for group_by in ("day", "week", "month"):
+            cost = measure(lambda: db_manager.get_range_stats(ranges[-1][1][0], today, group_by), args.rounds)
+            print(f"Regroupement par {group_by:<6} sur tout l'historique : {cost:.2f} ms")
+    finally:
+        db_manager.close_all_connections()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
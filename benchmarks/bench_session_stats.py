@@ -0,0 +1,148 @@
+"""Benchmark : nombre, moyenne, médiane et maximum des sessions par application sur une période.
+
+Compare, sur une base de `--days` jours d'historique simulé :
+- une requête par application (COUNT, AVG, MAX puis la session du milieu), comme l'aurait
+  demandé la colonne « Sessions » du tableau ;
+- une requête groupée unique (médiane par fonction de fenêtre ROW_NUMBER) ;
+- get_range_stats(sessions=True) : sommes cumulées de daily_usage et daily_durations (premier
+  calcul, puis nouveau calcul après l'écriture d'un lot de sessions).
+Vérifie que nombre, moyenne et maximum sont identiques et mesure l'écart de la médiane approchée.
+
+Usage :
+    python benchmarks/bench_session_stats.py [--days 365] [--sessions-per-day 400] [--rounds 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker import db_manager
+
+APPS = [(f"App {i}", f"C:\\Program Files\\App{i}\\app{i}.exe") for i in range(60)]
+
+def make_day(day, per_day, rng):
+    """Journée de travail à partir de 8h, sessions de quelques secondes à plus d'une heure"""
+    moment = datetime.combine(day, datetime.min.time()).timestamp() + 8 * 3600
+    batch = []
+    for _ in range(per_day):
+        seconds = rng.choice([rng.uniform(3, 60), rng.uniform(60, 600), rng.uniform(600, 5400)])
+        app_name, app_path = APPS[min(int(rng.expovariate(0.15)), len(APPS) - 1)]
+        batch.append((app_name, app_path, datetime.fromtimestamp(moment).isoformat(),
+                      datetime.fromtimestamp(moment + seconds).isoformat(), int(seconds)))
+        moment += seconds + rng.choice([0, 0, 5, 120])
+    return batch
+
+def per_app_stats(start_date, end_date):
+    """Approche naïve : une requête pour la liste des applications, puis deux par application"""
+    conn = db_manager.get_connection()
+    bounds = (start_date.isoformat(), end_date.isoformat())
+    stats = {}
+    for app_name, in conn.execute('SELECT DISTINCT app_name FROM session_details WHERE day BETWEEN ? AND ?',
+                                  bounds).fetchall():
+        count, average, longest = conn.execute('''
+            SELECT COUNT(*), AVG(duration_sec), MAX(duration_sec)
+            FROM session_details WHERE app_name = ? AND day BETWEEN ? AND ?
+        ''', (app_name, *bounds)).fetchone()
+        middle = conn.execute('''
+            SELECT AVG(duration_sec) FROM (
+                SELECT duration_sec FROM session_details WHERE app_name = ? AND day BETWEEN ? AND ?
+                ORDER BY duration_sec LIMIT 2 - ? % 2 OFFSET (? - 1) / 2)
+        ''', (app_name, *bounds, count, count)).fetchone()[0]
+        stats[app_name] = (count, round(average), round(middle), longest)
+    return stats
+
+def grouped_stats(start_date, end_date):
+    """Une seule requête groupée, la médiane par numérotation des sessions de chaque application"""
+    rows = db_manager.get_connection().execute('''
+        SELECT app_name, COUNT(*), AVG(duration_sec),
+               AVG(CASE WHEN rank IN ((total + 1) / 2, total / 2 + 1) THEN duration_sec END),
+               MAX(duration_sec)
+        FROM (
+            SELECT app_name, duration_sec,
+                   ROW_NUMBER() OVER (PARTITION BY app_name ORDER BY duration_sec) AS rank,
+                   COUNT(*) OVER (PARTITION BY app_name) AS total
+            FROM session_details WHERE day BETWEEN ? AND ?
+        )
+        GROUP BY app_name
+    ''', (start_date.isoformat(), end_date.isoformat())).fetchall()
+    return {app_name: (count, round(average), round(median), longest)
+            for app_name, count, average, median, longest in rows}
+
+def rollup_stats(start_date, end_date):
+    """Les mêmes colonnes, lues dans les cumuls quotidiens"""
+    return {app_name: tuple(columns)
+            for app_name, _, *columns in db_manager.get_range_stats(start_date, end_date, sessions=True)}
+
+def measure(func, rounds):
+    """Retourne le coût moyen d'un appel en millisecondes"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sessions-per-day", type=int, default=400)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chronix-bench-")
+    try:
+        db_manager.set_db_path(os.path.join(workdir, "chronix.db"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            db_manager.init_db()
+        rng = random.Random(7)
+        # Journées de 8h à moins de minuit : aucune session coupée, les deux comptes coïncident
+        per_day = min(args.sessions_per_day, 20)
+        today = datetime.now().date()
+        for day in range(args.days, 0, -1):
+            for _ in range(0, args.sessions_per_day, per_day):
+                db_manager.insert_sessions(make_day(today - timedelta(days=day), per_day, rng))
+        print(f"{args.days * args.sessions_per_day} sessions sur {args.days} jours")
+
+        print(f"{'période':<12}{'par app (ms)':>14}{'groupée (ms)':>14}{'cumuls (ms)':>13}"
+              f"{'après écriture (ms)':>21}{'écart médiane':>15}")
+        for days in (7, 30, 90, args.days):
+            start_date, end_date = today - timedelta(days=days), today - timedelta(days=1)
+            expected = grouped_stats(start_date, end_date)
+            assert per_app_stats(start_date, end_date) == expected
+            db_manager.clear_daily_index()
+            rollups = rollup_stats(start_date, end_date)
+            assert rollups.keys() == expected.keys()
+            errors = []
+            for app_name, (count, average, median, longest) in expected.items():
+                assert (rollups[app_name][0], rollups[app_name][1], rollups[app_name][3]) == (count, average, longest)
+                errors.append(abs(rollups[app_name][2] - median) / median)
+
+            naive_ms = measure(lambda: per_app_stats(start_date, end_date), args.rounds)
+            grouped_ms = measure(lambda: grouped_stats(start_date, end_date), args.rounds)
+
+            def fresh():
+                db_manager.clear_daily_index()
+                rollup_stats(start_date, end_date)
+            rollup_ms = measure(fresh, args.rounds)
+
+            write_seconds = 0.0
+            for _ in range(args.rounds):
+                db_manager.insert_sessions(make_day(today, 20, rng))
+                start = time.perf_counter()
+                rollup_stats(start_date, end_date)
+                write_seconds += time.perf_counter() - start
+            write_ms = write_seconds * 1000 / args.rounds
+            print(f"{days:>4} jours  {naive_ms:>14.1f}{grouped_ms:>14.1f}{rollup_ms:>13.1f}{write_ms:>21.2f}"
+                  f"{max(errors) * 100:>13.1f} %")
+    finally:
+        db_manager.close_all_connections()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark : temps de démarrage à froid de Chronix (lancé à chaque ouverture de session).
+
+Mesure dans des processus Python neufs :
+- le coût d'import de ui.main_window avec `python -X importtime` (total et modules les plus lourds),
+  et vérifie que matplotlib/numpy ne sont pas importés au démarrage ;
+- le temps jusqu'à l'affichage de la fenêtre, puis jusqu'au premier instantané de statistiques
+  (base de données initialisée en arrière-plan). Nécessite l'environnement Windows complet.
+
+Chaque mesure utilise une copie temporaire de la base pour ne pas toucher aux données réelles.
+
+Usage :
+    python benchmarks/bench_startup.py [--runs 5] [--top 15] [--skip-window] [--json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules qui ne doivent pas être chargés avant le premier rendu du graphique
+DEFERRED_MODULES = ("matplotlib", "numpy")
+
+WINDOW_SCRIPT = r'''
+import time
+start = time.perf_counter()
+import sys
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+app = QApplication(sys.argv)
+from ui.main_window import ChronixMainWindow
+imported = time.perf_counter()
+window = ChronixMainWindow()
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+deferred = [name for name in %r if name in sys.modules]
+timings = {}
+
+def poll():
+    if window.last_snapshot_id == 0 and time.perf_counter() - start < 30:
+        return
+    timings["first_snapshot_ms"] = (time.perf_counter() - start) * 1000
+    timer.stop()
+    window.quit_application()
+
+timer = QTimer()
+timer.timeout.connect(poll)
+timer.start(5)
+app.exec()
+print("RESULT", {"import_ms": (imported - start) * 1000, "shown_ms": (shown - start) * 1000,
+                 "deferred_loaded_at_show": deferred, **timings})
+''' % (DEFERRED_MODULES,)
+
+def child_env():
+    """Environnement du processus mesuré, avec le dépôt dans le path"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    return env
+
+def measure_imports(workdir, top):
+    """Lance `python -X importtime -c "import ui.main_window"` et analyse sa sortie"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import ui.main_window"],
+                            cwd=workdir, env=child_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    modules = []
+    for line in result.stderr.splitlines():
+        # Format : "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.rstrip(), int(self_us), int(cumulative_us)))
+
+    # Les modules de premier niveau (sans indentation) se partagent tout le temps d'import
+    total_us = sum(cumulative for name, _, cumulative in modules if not name.startswith("  "))
+    # Un même module peut apparaître au premier niveau et imbriqué : garder la plus grande valeur
+    cumulative_by_name = {}
+    for name, _, cumulative in modules:
+        name = name.strip()
+        cumulative_by_name[name] = max(cumulative, cumulative_by_name.get(name, 0))
+    heaviest = sorted(cumulative_by_name.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "total_ms": total_us / 1000,
+        "module_count": len(modules),
+        "deferred_loaded": [name for name in DEFERRED_MODULES if name in cumulative_by_name],
+        "heaviest": [(name, cumulative / 1000) for name, cumulative in heaviest],
+    }
+
+def measure_window(workdir):
+    """Démarre la fenêtre principale dans un processus neuf et retourne ses temps"""
+    result = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], cwd=workdir, env=child_env(),
+                            capture_output=True, text=True, timeout=120)
+    for line in result.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return eval(line[len("RESULT "):], {})
+    raise RuntimeError((result.stderr or result.stdout).strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--skip-window", action="store_true",
+                        help="ne mesurer que les imports (sans fenêtre ni tracking)")
+    parser.add_argument("--json", action="store_true", help="sortie JSON pour le suivi dans le temps")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chronix-startup-")
+    try:
+        source_db = os.path.join(REPO_ROOT, "chronix.db")
+        if os.path.exists(source_db):
+            shutil.copy(source_db, workdir)
+
+        # Premier lancement pour compiler le bytecode, non compté
+        measure_imports(workdir, args.top)
+        imports = [measure_imports(workdir, args.top) for _ in range(args.runs)]
+        windows = [] if args.skip_window else [measure_window(workdir) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "import_total_ms": statistics.median(run["total_ms"] for run in imports),
+        "import_module_count": imports[-1]["module_count"],
+        "deferred_loaded_at_import": imports[-1]["deferred_loaded"],
+        "heaviest_imports_ms": imports[-1]["heaviest"],
+    }
+    for key in ("import_ms", "shown_ms", "first_snapshot_ms"):
+        values = [run[key] for run in windows if key in run]
+        if values:
+            report[f"window_{key}"] = statistics.median(values)
+    if windows:
+        report["deferred_loaded_at_show"] = windows[-1]["deferred_loaded_at_show"]
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    print(f"Import de ui.main_window : {report['import_total_ms']:.1f} ms "
+          f"({report['import_module_count']} modules, médiane sur {args.runs})")
+    print(f"Modules différés chargés à l'import : {report['deferred_loaded_at_import'] or 'aucun'}")
+    print(f"\n{'Module':<48}{'cumulé (ms)':>12}")
+    for name, cumulative_ms in report["heaviest_imports_ms"]:
+        print(f"{name:<48}{cumulative_ms:>12.1f}")
+
+    if windows:
+        print(f"\n{'Étape du démarrage':<40}{'médiane (ms)':>14}")
+        for key, label in (("window_import_ms", "imports"), ("window_shown_ms", "fenêtre affichée"),
+                           ("window_first_snapshot_ms", "premières statistiques")):
+            if key in report:
+                print(f"{label:<40}{report[key]:>14.1f}")
+        print(f"Modules différés chargés à l'affichage : {report['deferred_loaded_at_show'] or 'aucun'}")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,8 @@
 # Module tracker pour Chronix
 # Gestion du suivi du temps d'utilisation des applications
-
-from . import db_manager
-from . import time_tracker
-from . import window_tracker
+#
+# Les sous-modules ne sont pas importés ici : `python -m tracker` (mode sans interface)
+# ne charge que ce dont il a besoin. Importer explicitement, ex. `from tracker import db_manager`.
 
 __version__ = "1.0.0"
 __author__ = "Chronix Team"
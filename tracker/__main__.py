@@ -0,0 +1,7 @@
+# tracker/__main__.py
+# Point d'entrée sans interface : python -m tracker
+import sys
+
+from .daemon import main
+
+sys.exit(main())
@@ -0,0 +1,47 @@
+# tracker/app_catalog.py
+# Catalogue des applications connues : alimenté au fil des insertions de sessions,
+# il ne transmet aux consommateurs (liste de l'onglet Quotas) que les ajouts
+import threading
+
+from . import db_manager
+
+class AppCatalog:
+    """Applications connues, une entrée par nom, dans l'ordre de découverte.
+    Un consommateur garde sa position (nombre d'entrées déjà lues) et ne récupère
+    ensuite que les nouvelles, sans relire l'historique"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []          # [(app_name, app_path)]
+        self._names = set()
+        self._last_id = 0           # plus grand apps.id lu par sync()
+        db_manager.app_listeners.append(self.add)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, apps):
+        """Intègre des applications (app_id, app_name, app_path) ; les noms connus sont ignorés"""
+        with self._lock:
+            for _, app_name, app_path in apps:
+                if app_name not in self._names:
+                    self._names.add(app_name)
+                    self._entries.append((app_name, app_path))
+
+    def sync(self):
+        """Lit les applications ajoutées à la base depuis le dernier appel
+        (chargement initial, ou écritures d'un autre processus comme le mode sans interface)"""
+        apps = db_manager.get_apps_since(self._last_id)
+        if apps:
+            # Les notifications de add() ne font pas avancer _last_id : rien n'est sauté
+            self._last_id = apps[-1][0]
+            self.add(apps)
+        return len(apps)
+
+    def get_since(self, position):
+        """Retourne les entrées ajoutées après `position` et la nouvelle position"""
+        with self._lock:
+            return self._entries[position:], len(self._entries)
+
+# Instance globale
+app_catalog = AppCatalog()
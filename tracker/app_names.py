@@ -0,0 +1,232 @@
+# tracker/app_names.py
+# Résolution du nom convivial des applications : règles intégrées + fichier de règles
+# utilisateur (app_names.json), compilées une fois, résultats mémorisés, rechargement à chaud
+import fnmatch
+import json
+import ntpath
+import os
+import re
+import threading
+import time
+
+from . import db_manager
+
+# Fichier de règles utilisateur, à côté de la base (None : suit db_manager.DB_PATH)
+CONFIG_PATH = os.environ.get("CHRONIX_APP_NAMES")
+CONFIG_NAME = "app_names.json"
+
+# Noms des exécutables courants
+BUILTIN_EXACT = {
+    # Navigateurs
+    "chrome.exe": "Chrome",
+    "firefox.exe": "Firefox",
+    "msedge.exe": "Edge",
+    "brave.exe": "Brave",
+    "opera.exe": "Opera",
+
+    # Éditeurs de code
+    "code.exe": "VS Code",
+    "cursor.exe": "Cursor",
+    "notepad++.exe": "Notepad++",
+    "sublime_text.exe": "Sublime Text",
+    "atom.exe": "Atom",
+    "webstorm64.exe": "WebStorm",
+    "pycharm64.exe": "PyCharm",
+    "intellij64.exe": "IntelliJ IDEA",
+
+    # Applications Microsoft
+    "explorer.exe": "Explorateur Windows",
+    "notepad.exe": "Bloc-notes",
+    "wordpad.exe": "WordPad",
+    "calc.exe": "Calculatrice",
+    "mspaint.exe": "Paint",
+    "winword.exe": "Microsoft Word",
+    "excel.exe": "Microsoft Excel",
+    "powerpnt.exe": "Microsoft PowerPoint",
+    "outlook.exe": "Microsoft Outlook",
+    "teams.exe": "Microsoft Teams",
+    "skype.exe": "Skype",
+
+    # Applications de communication
+    "discord.exe": "Discord",
+    "slack.exe": "Slack",
+    "telegram.exe": "Telegram",
+    "whatsapp.exe": "WhatsApp",
+
+    # Applications de développement
+    "python.exe": "Python",
+    "node.exe": "Node.js",
+    "git.exe": "Git",
+    "docker.exe": "Docker",
+    "postman.exe": "Postman",
+
+    # Applications de design
+    "photoshop.exe": "Adobe Photoshop",
+    "illustrator.exe": "Adobe Illustrator",
+    "figma.exe": "Figma",
+    "sketch.exe": "Sketch",
+
+    # Applications de jeux
+    "steam.exe": "Steam",
+    "epicgameslauncher.exe": "Epic Games",
+    "origin.exe": "Origin",
+    "battle.net.exe": "Battle.net",
+
+    # Applications système
+    "svchost.exe": "Service Windows",
+    "winlogon.exe": "Windows Logon",
+    "csrss.exe": "Client Server Runtime",
+    "wininit.exe": "Windows Initialization",
+    "services.exe": "Services Windows",
+    "lsass.exe": "Local Security Authority",
+    "spoolsv.exe": "Spooler Service",
+    "taskmgr.exe": "Gestionnaire des tâches",
+    "control.exe": "Panneau de configuration",
+    "regedit.exe": "Éditeur de registre",
+    "cmd.exe": "Invite de commandes",
+    "powershell.exe": "PowerShell",
+    "conhost.exe": "Console Host",
+}
+
+# Dossiers dont le nom n'est pas celui d'une application
+SYSTEM_PATH_FRAGMENTS = ("windows", "program files", "system32", "syswow64", "appdata")
+
+class CompiledRules:
+    """Règles figées et précompilées : dictionnaire des noms exacts (utilisateur puis
+    intégrés) et une seule expression régulière pour tous les motifs (glob et regex)"""
+
+    def __init__(self, user_exact=None, patterns=(), aliases=None):
+        self.exact = {exe.lower(): name for exe, name in BUILTIN_EXACT.items()}
+        self.user_exact = {exe.lower(): name for exe, name in (user_exact or {}).items()}
+        self.aliases = dict(aliases or {})
+        # Une alternative nommée par motif, dans l'ordre du fichier (le premier gagne)
+        self.pattern_names = {}
+        alternatives = []
+        for index, (regex, name) in enumerate(patterns):
+            group = f"rule{index}"
+            self.pattern_names[group] = name
+            alternatives.append(f"(?P<{group}>{regex})")
+        self.pattern = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        self.system_path = re.compile("|".join(map(re.escape, SYSTEM_PATH_FRAGMENTS)), re.IGNORECASE)
+
+    @classmethod
+    def from_config(cls, config):
+        """Compile le contenu d'un fichier de règles : {"exact", "glob", "regex", "aliases"}"""
+        patterns = []
+        for glob, name in config.get("glob", {}).items():
+            # fnmatch.translate produit une expression ancrée en fin ; on la veut sans drapeaux globaux
+            patterns.append((fnmatch.translate(glob).replace("(?s:", "(?:", 1), name))
+        for regex, name in config.get("regex", {}).items():
+            re.compile(regex)  # erreur explicite sur le motif fautif
+            patterns.append((f"(?:{regex})\\Z", name))
+        return cls(config.get("exact"), patterns, config.get("aliases"))
+
+    def resolve(self, exe_name, exe_path):
+        """Applique les règles dans l'ordre : exact utilisateur, motifs, exact intégré, dossier"""
+        exe_key = exe_name.lower()
+        name = self.user_exact.get(exe_key)
+
+        if name is None and self.pattern is not None:
+            match = self.pattern.match(exe_path or exe_name)
+            if match:
+                name = self.pattern_names[match.lastgroup]
+
+        if name is None:
+            name = self.exact.get(exe_key)
+
+        if name is None and exe_path and not self.system_path.search(exe_path):
+            # Nom du dossier parent (souvent le nom de l'app), hors dossiers système ;
+            # chemins Windows quelle que soit la plateforme (source simulée)
+            name = ntpath.basename(ntpath.dirname(exe_path)).replace(" (x86)", "").replace(" (x64)", "")
+
+        if not name:
+            # En dernier recours, le nom sans l'extension
+            name = exe_name.replace('.exe', '').title()
+
+        return self.aliases.get(name, name)
+
+class AppNameResolver:
+    """Nom canonique d'une application, partagé par le tracker, les icônes et les statistiques"""
+
+    def __init__(self, config_path=CONFIG_PATH, check_interval=2.0, max_memo=4096):
+        self._config_path = config_path
+        self.check_interval = check_interval
+        self.max_memo = max_memo
+        # Règles et mémo associé, remplacés ensemble lors d'un rechargement
+        self._state = (CompiledRules(), {})
+        self.listeners = []         # appelés après chaque rechargement des règles
+        self.reloads = 0
+        self._config_stamp = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.check_for_changes(force=True)
+
+    def resolve(self, exe_name, exe_path=None):
+        """Convertit le nom de l'exe (et son chemin) en nom convivial de l'application"""
+        if time.monotonic() >= self._next_check:
+            self.check_for_changes()
+
+        rules, memo = self._state
+        key = (exe_name, exe_path)
+        name = memo.get(key)
+        if name is None:
+            name = rules.resolve(exe_name, exe_path)
+            if len(memo) >= self.max_memo:
+                memo.clear()
+            memo[key] = name
+        return name
+
+    def canonical(self, app_name):
+        """Nom canonique d'un nom déjà enregistré (alias définis dans le fichier de règles)"""
+        return self._state[0].aliases.get(app_name, app_name)
+
+    def alias_pairs(self):
+        """Paires (nom, nom canonique) des alias actifs, triées (utilisables comme clé de cache)"""
+        return tuple(sorted(self._state[0].aliases.items()))
+
+    @property
+    def config_path(self):
+        """Fichier de règles : celui donné, sinon app_names.json dans le dossier de la base"""
+        return self._config_path or os.path.join(os.path.dirname(db_manager.DB_PATH), CONFIG_NAME)
+
+    @property
+    def memo_size(self):
+        return len(self._state[1])
+
+    def check_for_changes(self, force=False):
+        """Recharge les règles si le fichier a été créé, modifié ou supprimé"""
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            # Le chemin fait partie de l'empreinte : changer de base change de fichier de règles
+            config_path = self.config_path
+            try:
+                stat = os.stat(config_path)
+                stamp = (config_path, stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamp = None
+            if stamp == self._config_stamp and not force:
+                return False
+            self._config_stamp = stamp
+
+            try:
+                if stamp is None:
+                    rules = CompiledRules()
+                else:
+                    with open(config_path, encoding="utf-8") as f:
+                        rules = CompiledRules.from_config(json.load(f))
+            except (OSError, ValueError, re.error) as e:
+                # Fichier invalide : on garde les règles actuelles
+                print(f"⚠️  Règles de noms ignorées ({config_path}): {e}")
+                return False
+
+            self._state = (rules, {})
+            self.reloads += 1
+
+        if stamp is not None:
+            print(f"🔤 Règles de noms chargées depuis {config_path}")
+        for listener in self.listeners:
+            listener()
+        return True
+
+# Instance globale
+app_name_resolver = AppNameResolver()
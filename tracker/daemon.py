@@ -0,0 +1,125 @@
+# tracker/daemon.py
+# Collecte sans interface : TimeTracker seul, sans PyQt6 ni matplotlib
+#
+#   python -m tracker [--db chronix.db] [--source events|polling] [--simulate [SCÉNARIO]] [--duration N]
+#
+# Budget visé (mesuré avec `--stats`) : moins de 30 Mo de mémoire résidente et moins
+# de 0,1 % d'un cœur en régime établi ; voir la section « Mode sans interface » du README.
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+
+from . import db_manager
+from . import foreground
+from .time_tracker import TimeTracker
+
+def peak_memory_mb():
+    """Pic de mémoire résidente du processus en Mo (None si indisponible)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilo-octets sous Linux, octets sous macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except Exception:
+        return None
+
+def install_signal_handlers(stop_event):
+    """Arrêt propre sur SIGINT/SIGTERM (et Ctrl+Pause sous Windows)"""
+    def handle_signal(signum, frame):
+        print(f"🛑 Signal {signal.Signals(signum).name} reçu, arrêt en cours...")
+        stop_event.set()
+
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), handle_signal)
+
+def run(tracker, stop_event, duration=None):
+    """Fait tourner le tracker jusqu'au signal d'arrêt (ou pendant `duration` secondes),
+    puis enregistre la session ouverte et vide la file d'écriture"""
+    deadline = time.monotonic() + duration if duration else None
+    tracker.start_tracking()
+    try:
+        # Attente par tranches d'une seconde : sous Windows, Event.wait() sans délai
+        # n'est pas interrompu par Ctrl+C
+        while not stop_event.is_set():
+            timeout = 1.0 if deadline is None else min(1.0, deadline - time.monotonic())
+            if timeout <= 0:
+                break
+            stop_event.wait(timeout)
+    finally:
+        tracker.shutdown()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tracker",
+                                     description="Chronix sans interface : collecte des sessions uniquement")
+    parser.add_argument("--db", default=db_manager.DB_PATH, help="chemin de la base (défaut : %(default)s)")
+    parser.add_argument("--source", choices=("events", "polling"), default="events",
+                        help="notifications Windows ou scrutation périodique (défaut : %(default)s)")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="intervalle de scrutation en secondes (défaut : %(default)s)")
+    parser.add_argument("--simulate", nargs="?", const="", metavar="SCÉNARIO",
+                        help="source simulée, ex. \"chrome.exe:20,-:5,code.exe:45\" (scénario par défaut si vide)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="accélération du scénario simulé (défaut : %(default)s)")
+    parser.add_argument("--min-dwell", type=float, default=3.0,
+                        help="passage plus bref attribué à la session qui l'entoure, en secondes "
+                             "(défaut : %(default)s, 0 pour désactiver)")
+    parser.add_argument("--bounce-gap", type=float, default=10.0,
+                        help="aller-retour A -> B -> A regroupé si B dure moins de N secondes "
+                             "(défaut : %(default)s, 0 pour désactiver)")
+    parser.add_argument("--heartbeat", type=float, default=30.0,
+                        help="sauvegarde de la session ouverte toutes les N secondes, récupérée après "
+                             "un arrêt brutal (défaut : %(default)s, 0 pour désactiver)")
+    parser.add_argument("--duration", type=float, help="s'arrêter après N secondes")
+    parser.add_argument("--stats", action="store_true", help="afficher la consommation CPU/mémoire à l'arrêt")
+    args = parser.parse_args(argv)
+
+    if args.simulate is not None:
+        script = foreground.SimulatedForegroundSource.parse_script(args.simulate) if args.simulate else None
+        source = foreground.SimulatedForegroundSource(script, speed=args.speed)
+    elif not foreground.windows_available():
+        parser.error("la détection des fenêtres nécessite Windows (pywin32 et psutil) ; utilisez --simulate")
+    elif args.source == "polling":
+        source = foreground.PollingForegroundSource(interval=args.interval)
+    else:
+        source = foreground.WinEventForegroundSource(fallback_interval=args.interval)
+
+    db_manager.set_db_path(args.db)
+    db_manager.init_db()
+
+    stop_event = threading.Event()
+    install_signal_handlers(stop_event)
+
+    tracker = TimeTracker(source, min_dwell=args.min_dwell, bounce_gap=args.bounce_gap,
+                          heartbeat_interval=args.heartbeat)
+    print(f"🗄️  Base de données : {os.path.abspath(args.db)}")
+    started = time.monotonic()
+    run(tracker, stop_event, args.duration)
+
+    if args.stats:
+        elapsed = time.monotonic() - started
+        cpu = time.process_time()
+        writer = tracker.session_writer.get_stats()
+        memory = peak_memory_mb()
+        memory_text = f"{memory:.1f} Mo" if memory is not None else "inconnue"
+        print(f"📊 Durée {elapsed:.1f}s, CPU {cpu:.2f}s ({cpu / elapsed * 100 if elapsed else 0:.2f} %), "
+              f"mémoire max {memory_text}")
+        print(f"📊 Sessions écrites : {writer['written']}, lots : {writer['flush_count']}, "
+              f"perdues : {writer['dropped']}")
+        coalescer = tracker.coalescer.get_stats()
+        print(f"📊 Regroupement : {coalescer['received']} sessions reçues, {coalescer['rows_saved']} lignes évitées "
+              f"({coalescer['blips_absorbed']} passages brefs, {coalescer['bounces_merged']} allers-retours)")
+        print(f"📊 Journal : {tracker.journal.heartbeats if tracker.journal else 0} battements, "
+              f"{tracker.recovered_sessions} sessions récupérées au démarrage")
+        processes = tracker.process_cache.get_stats()
+        print(f"📊 Cache des processus : {processes['hits']} succès, {processes['misses']} échecs "
+              f"({processes['hit_rate']:.0%}), {processes['size']} entrées")
+    return 0
@@ -1,12 +1,169 @@
 import sqlite3
+import bisect
 import os
+import atexit
+import threading
+import functools
+import contextlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
-def init_db():
-    """Initialise la base de données avec les tables sessions et quotas"""
-    conn = sqlite3.connect("chronix.db")
-    cursor = conn.cursor()
+from . import periods
+
+# Chemin de la base de données (relatif au répertoire de travail)
+DB_PATH = "chronix.db"
+
+# Attente maximale (en secondes) quand la base est verrouillée par un autre écrivain
+BUSY_TIMEOUT = 5.0
+
+# Une connexion longue durée par thread (le thread de tracking écrit, l'interface lit)
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+_generation = 0
+
+def _configure_connection(conn):
+    """Applique le mode WAL et les pragmas de performance à une nouvelle connexion"""
+    # WAL : les lectures de l'interface ne bloquent plus l'écriture du tracker
+    conn.execute("PRAGMA journal_mode=WAL")
+    # En WAL, NORMAL ne synchronise le disque qu'aux checkpoints
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(BUSY_TIMEOUT * 1000)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-8000")  # 8 Mo de cache de pages
+    conn.execute("PRAGMA mmap_size=67108864")  # 64 Mo projetés en mémoire
+
+def get_connection():
+    """Retourne la connexion du thread courant, en l'ouvrant si nécessaire"""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.generation != _generation:
+        # check_same_thread=False uniquement pour pouvoir fermer depuis close_all_connections
+        conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        _configure_connection(conn)
+        with _connections_lock:
+            _connections.append(conn)
+            _local.generation = _generation
+        _local.conn = conn
+    return conn
+
+def close_thread_connection():
+    """Ferme la connexion du thread courant : à appeler en fin de thread éphémère
+    (worker, minuterie) pour qu'elle ne reste pas ouverte jusqu'à la sortie du programme"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        return
+    _local.conn = None
+    with _connections_lock:
+        if conn in _connections:
+            _connections.remove(conn)
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+def close_all_connections():
+    """Ferme toutes les connexions ouvertes (tous threads confondus)"""
+    global _generation
+    with _connections_lock:
+        for conn in _connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _connections.clear()
+        _generation += 1
+
+def set_db_path(path):
+    """Change la base de données utilisée et ferme les connexions existantes"""
+    global DB_PATH
+    close_all_connections()
+    DB_PATH = path
+    clear_app_ids()
+    bump_data_version()
+
+atexit.register(close_all_connections)
+
+# Cache LRU des lectures, invalidé par un compteur de génération que chaque écriture
+# de ce processus incrémente (les écritures d'un autre processus ne sont pas vues)
+QUERY_CACHE_SIZE = 128
+
+_data_version = 0
+_query_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_hits = 0
+_cache_misses = 0
+
+def bump_data_version():
+    """Signale une écriture : toutes les lectures en cache deviennent obsolètes"""
+    global _data_version
+    with _cache_lock:
+        _data_version += 1
+        _query_cache.clear()
+
+def clear_query_cache():
+    """Vide le cache des lectures et remet les compteurs à zéro"""
+    global _cache_hits, _cache_misses
+    with _cache_lock:
+        _query_cache.clear()
+        _cache_hits = 0
+        _cache_misses = 0
+
+def get_cache_stats():
+    """Retourne les compteurs du cache des lectures"""
+    with _cache_lock:
+        total = _cache_hits + _cache_misses
+        return {
+            "hits": _cache_hits,
+            "misses": _cache_misses,
+            "hit_rate": _cache_hits / total if total else 0.0,
+            "size": len(_query_cache),
+            "data_version": _data_version,
+        }
+
+def cached_query(func):
+    """Mémorise le résultat d'une lecture jusqu'à la prochaine écriture"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _cache_hits, _cache_misses
+        # La date du jour fait partie de la clé : les valeurs par défaut changent à minuit
+        key = (func.__name__, args, tuple(sorted(kwargs.items())), datetime.now().date())
+        
+        with _cache_lock:
+            entry = _query_cache.get(key)
+            if entry is not None and entry[0] == _data_version:
+                _query_cache.move_to_end(key)
+                _cache_hits += 1
+                result = entry[1]
+                return list(result) if isinstance(result, list) else result
+            _cache_misses += 1
+            version = _data_version
+        
+        result = func(*args, **kwargs)
+        
+        with _cache_lock:
+            # Ne rien mémoriser si une écriture a eu lieu pendant la requête
+            if version == _data_version:
+                _query_cache[key] = (version, result)
+                _query_cache.move_to_end(key)
+                while len(_query_cache) > QUERY_CACHE_SIZE:
+                    _query_cache.popitem(last=False)
+        
+        return list(result) if isinstance(result, list) else result
     
+    return wrapper
+
+def _iso_to_epoch(iso_text):
+    """Convertit un horodatage ISO (heure locale) en secondes epoch"""
+    if not iso_text:
+        return None
+    try:
+        return int(datetime.fromisoformat(iso_text).timestamp())
+    except ValueError:
+        return None
+
+def _migrate_v1(cursor):
+    """Schéma initial : tables sessions et quotas"""
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS sessions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -26,157 +183,874 @@ def init_db():
             enabled BOOLEAN DEFAULT 1
         )
     ''')
-    
-    conn.commit()
-    conn.close()
 
-def insert_session(app_name, app_path, start_time, end_time, duration_sec):
-    """Insère une nouvelle session dans la base de données"""
-    conn = sqlite3.connect("chronix.db")
-    cursor = conn.cursor()
+def _migrate_v2(cursor):
+    """Colonnes epoch et jour précalculé, avec index composites sur le jour"""
+    cursor.execute('ALTER TABLE sessions ADD COLUMN start_ts INTEGER')
+    cursor.execute('ALTER TABLE sessions ADD COLUMN end_ts INTEGER')
+    cursor.execute('ALTER TABLE sessions ADD COLUMN day TEXT')
     
+    # Remplir les nouvelles colonnes pour l'historique existant
+    cursor.connection.create_function("iso_to_epoch", 1, _iso_to_epoch, deterministic=True)
     cursor.execute('''
-        INSERT INTO sessions (app_name, app_path, start_time, end_time, duration_sec)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (app_name, app_path, start_time, end_time, duration_sec))
+        UPDATE sessions
+        SET start_ts = iso_to_epoch(start_time),
+            end_ts = iso_to_epoch(end_time),
+            day = DATE(start_time)
+    ''')
     
-    conn.commit()
-    conn.close()
+    # duration_sec en fin d'index : les SUM() par jour sont servis par l'index seul
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_day_app ON sessions (day, app_name, duration_sec)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_app_day ON sessions (app_name, day, duration_sec)')
 
-def get_daily_stats(date=None):
-    """Récupère les statistiques quotidiennes"""
-    if date is None:
-        date = datetime.now().date()
+def _migrate_v3(cursor):
+    """Table de cumuls quotidiens par application, alimentée par insert_session"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_usage (
+            day TEXT NOT NULL,
+            app_name TEXT NOT NULL,
+            total_sec INTEGER NOT NULL DEFAULT 0,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            max_session_sec INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, app_name)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_daily_usage_app_day ON daily_usage (app_name, day)')
     
-    conn = sqlite3.connect("chronix.db")
-    cursor = conn.cursor()
+    # À cette version, sessions porte encore app_name
+    _rebuild_daily_usage(cursor, sessions_table="sessions")
+
+def _migrate_v4(cursor):
+    """Table apps (une ligne par application) : les sessions ne référencent plus que app_id"""
+    # Chemin inconnu stocké comme '' : la contrainte UNIQUE ne voit pas deux NULL comme égaux
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS apps (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            path TEXT NOT NULL DEFAULT '',
+            first_seen TEXT,
+            last_seen TEXT,
+            UNIQUE (name, path)
+        )
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO apps (name, path, first_seen, last_seen)
+        SELECT COALESCE(app_name, ''), COALESCE(app_path, ''), MIN(start_time), MAX(end_time)
+        FROM sessions
+        GROUP BY 1, 2
+        ORDER BY MIN(start_time)
+    ''')
     
+    # SQLite ne sait pas retirer des colonnes indexées : la table est reconstruite
     cursor.execute('''
-        SELECT app_name, SUM(duration_sec) as total_seconds
-        FROM sessions 
-        WHERE DATE(start_time) = ?
-        GROUP BY app_name
-        ORDER BY total_seconds DESC
-    ''', (date.isoformat(),))
+        CREATE TABLE sessions_v4 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            app_id INTEGER NOT NULL REFERENCES apps (id),
+            start_time TEXT,
+            end_time TEXT,
+            duration_sec INTEGER,
+            start_ts INTEGER,
+            end_ts INTEGER,
+            day TEXT
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO sessions_v4 (id, app_id, start_time, end_time, duration_sec, start_ts, end_ts, day)
+        SELECT s.id, a.id, s.start_time, s.end_time, s.duration_sec, s.start_ts, s.end_ts, s.day
+        FROM sessions s
+        JOIN apps a ON a.name = COALESCE(s.app_name, '') AND a.path = COALESCE(s.app_path, '')
+    ''')
+    cursor.execute('DROP TABLE sessions')
+    cursor.execute('ALTER TABLE sessions_v4 RENAME TO sessions')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_day_app ON sessions (day, app_id, duration_sec)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_app_day ON sessions (app_id, day, duration_sec)')
     
-    results = cursor.fetchall()
-    conn.close()
+    # Vue des sessions avec le nom et le chemin de l'application (exports, maintenance)
+    cursor.execute('''
+        CREATE VIEW IF NOT EXISTS session_details AS
+        SELECT s.id, s.app_id, a.name AS app_name, NULLIF(a.path, '') AS app_path,
+               s.start_time, s.end_time, s.duration_sec, s.start_ts, s.end_ts, s.day
+        FROM sessions s
+        JOIN apps a ON a.id = s.app_id
+    ''')
+
+def _migrate_v5(cursor):
+    """Effectifs des sessions par tranche de durée, par jour et par application"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_durations (
+            day TEXT NOT NULL,
+            app_name TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, app_name, bucket)
+        ) WITHOUT ROWID
+    ''')
+    _rebuild_daily_durations(cursor)
+
+# Migrations appliquées dans l'ordre ; PRAGMA user_version mémorise la dernière
+MIGRATIONS = [
+    (1, _migrate_v1),
+    (2, _migrate_v2),
+    (3, _migrate_v3),
+    (4, _migrate_v4),
+    (5, _migrate_v5),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Migrations qui réécrivent une table entière : une base existante est compactée ensuite
+VACUUM_AFTER = {4}
+
+def init_db():
+    """Initialise la base de données et applique les migrations de schéma manquantes"""
+    conn = get_connection()
+    cursor = conn.cursor()
     
-    return [(app_name, seconds) for app_name, seconds in results]
+    version = cursor.execute('PRAGMA user_version').fetchone()[0]
+    # Une base neuve n'a rien à compacter, même après toutes les migrations ; une base au
+    # schéma d'origine est aussi en version 0, mais sa table des sessions existe déjà
+    existing_db = version > 0 or cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sessions'").fetchone() is not None
+    needs_vacuum = False
+    
+    for target_version, migration in MIGRATIONS:
+        if version >= target_version:
+            continue
+        
+        # Chaque migration s'exécute dans sa propre transaction
+        with conn:
+            cursor.execute('BEGIN IMMEDIATE')
+            migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {target_version}')
+        
+        needs_vacuum = needs_vacuum or (existing_db and target_version in VACUUM_AFTER)
+        version = target_version
+        clear_app_ids()
+        clear_daily_index()
+        bump_data_version()
+        print(f"🗄️  Base de données migrée vers la version {version}")
+    
+    if needs_vacuum:
+        vacuum()
 
-def get_weekly_stats(weeks_back=0):
-    """Récupère les statistiques hebdomadaires"""
-    end_date = datetime.now().date() - timedelta(weeks=weeks_back)
-    start_date = end_date - timedelta(days=6)
+def vacuum():
+    """Compacte la base (rend au disque l'espace libéré par les migrations et suppressions)"""
+    conn = get_connection()
+    # En WAL, le fichier principal n'a sa taille réelle qu'une fois le journal reporté
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    size_before = os.path.getsize(DB_PATH) if os.path.exists(DB_PATH) else 0
+    conn.execute('VACUUM')
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    size_after = os.path.getsize(DB_PATH) if os.path.exists(DB_PATH) else 0
+    print(f"🗄️  Base compactée : {size_before // 1024} Ko -> {size_after // 1024} Ko")
+
+def split_by_day(start_time, end_time, duration_sec):
+    """Découpe une session en portions (jour ISO, secondes) aux changements de jour"""
+    start = datetime.fromisoformat(start_time)
+    end = datetime.fromisoformat(end_time)
+    
+    if end.date() <= start.date():
+        return [(start.date().isoformat(), duration_sec)]
+    
+    parts = []
+    cursor_time = start
+    while cursor_time.date() < end.date():
+        next_midnight = datetime.combine(cursor_time.date() + timedelta(days=1), datetime.min.time())
+        parts.append((cursor_time.date().isoformat(), int((next_midnight - cursor_time).total_seconds())))
+        cursor_time = next_midnight
+    
+    # La dernière portion absorbe les arrondis pour que la somme reste égale à duration_sec
+    remaining = duration_sec - sum(seconds for _, seconds in parts)
+    if remaining > 0:
+        parts.append((end.date().isoformat(), remaining))
+    return parts
+
+def _add_daily_usage(cursor, app_name, start_time, end_time, duration_sec):
+    """Ajoute une session aux cumuls quotidiens (dans la transaction en cours)"""
+    for day, seconds in split_by_day(start_time, end_time, duration_sec):
+        cursor.execute('''
+            INSERT INTO daily_usage (day, app_name, total_sec, session_count, max_session_sec)
+            VALUES (?, ?, ?, 1, ?)
+            ON CONFLICT (day, app_name) DO UPDATE SET
+                total_sec = total_sec + excluded.total_sec,
+                session_count = session_count + 1,
+                max_session_sec = MAX(max_session_sec, excluded.max_session_sec)
+        ''', (day, app_name, seconds, seconds))
+
+def _rebuild_daily_usage(cursor, sessions_table="session_details"):
+    """Recalcule entièrement daily_usage à partir des sessions brutes"""
+    cursor.execute('DELETE FROM daily_usage')
     
-    conn = sqlite3.connect("chronix.db")
+    # Sessions contenues dans une seule journée : agrégation directe en SQL
+    cursor.execute(f'''
+        INSERT INTO daily_usage (day, app_name, total_sec, session_count, max_session_sec)
+        SELECT day, app_name, SUM(duration_sec), COUNT(*), MAX(duration_sec)
+        FROM {sessions_table}
+        WHERE end_time < DATE(day, '+1 day')
+        GROUP BY day, app_name
+    ''')
+    
+    # Sessions qui passent minuit : découpage jour par jour
+    overnight = cursor.connection.execute(f'''
+        SELECT app_name, start_time, end_time, duration_sec
+        FROM {sessions_table}
+        WHERE end_time >= DATE(day, '+1 day')
+    ''').fetchall()
+    for app_name, start_time, end_time, duration_sec in overnight:
+        _add_daily_usage(cursor, app_name, start_time, end_time, duration_sec)
+
+# Tranches de durée des sessions (bornes en secondes) : la dernière est ouverte.
+# Les effectifs par tranche donnent une médiane approchée sur n'importe quelle période
+DURATION_BUCKETS = (5, 10, 15, 30, 45, 60, 90, 120, 180, 300, 450, 600, 900, 1200, 1800, 2700, 3600,
+                    5400, 7200, 10800)
+
+def _duration_bucket_sql(column):
+    """Expression SQL de la tranche de durée d'une colonne en secondes"""
+    cases = " ".join(f"WHEN {column} < {bound} THEN {bucket}" for bucket, bound in enumerate(DURATION_BUCKETS))
+    return f"CASE {cases} ELSE {len(DURATION_BUCKETS)} END"
+
+def _add_daily_durations(cursor, app_name, start_time, end_time, duration_sec):
+    """Compte la session dans les tranches de durée de chaque journée (comme daily_usage,
+    une session qui passe minuit compte une portion par jour)"""
+    for day, seconds in split_by_day(start_time, end_time, duration_sec):
+        cursor.execute('''
+            INSERT INTO daily_durations (day, app_name, bucket, session_count)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT (day, app_name, bucket) DO UPDATE SET session_count = session_count + 1
+        ''', (day, app_name, bisect.bisect_right(DURATION_BUCKETS, seconds)))
+
+def _rebuild_daily_durations(cursor):
+    """Recalcule entièrement daily_durations à partir des sessions brutes"""
+    cursor.execute('DELETE FROM daily_durations')
+    cursor.execute(f'''
+        INSERT INTO daily_durations (day, app_name, bucket, session_count)
+        SELECT day, app_name, {_duration_bucket_sql('duration_sec')}, COUNT(*)
+        FROM session_details
+        WHERE end_time < DATE(day, '+1 day')
+        GROUP BY 1, 2, 3
+    ''')
+    overnight = cursor.connection.execute('''
+        SELECT app_name, start_time, end_time, duration_sec
+        FROM session_details
+        WHERE end_time >= DATE(day, '+1 day')
+    ''').fetchall()
+    for app_name, start_time, end_time, duration_sec in overnight:
+        _add_daily_durations(cursor, app_name, start_time, end_time, duration_sec)
+
+def rebuild_daily_usage():
+    """Reconstruit la table de cumuls quotidiens (bases existantes ou réparation)"""
+    conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute('''
-        SELECT app_name, SUM(duration_sec) as total_seconds
-        FROM sessions 
-        WHERE DATE(start_time) BETWEEN ? AND ?
-        GROUP BY app_name
-        ORDER BY total_seconds DESC
-    ''', (start_date.isoformat(), end_date.isoformat()))
+    with conn:
+        cursor.execute('BEGIN IMMEDIATE')
+        _rebuild_daily_usage(cursor)
+        _rebuild_daily_durations(cursor)
     
-    results = cursor.fetchall()
-    conn.close()
+    bump_data_version()
+    clear_daily_index()
+    count = cursor.execute('SELECT COUNT(*) FROM daily_usage').fetchone()[0]
+    print(f"🗄️  Cumuls quotidiens reconstruits ({count} lignes)")
+
+# Identifiants des applications déjà connues : (nom, chemin) -> apps.id
+_app_ids = {}
+_app_ids_lock = threading.Lock()
+
+# Appelés après validation avec [(app_id, app_name, app_path), ...] des applications
+# que ce processus vient d'ajouter à la table apps (depuis le thread d'écriture)
+app_listeners = []
+
+def clear_app_ids():
+    """Oublie les identifiants d'applications (changement de base, migration)"""
+    with _app_ids_lock:
+        _app_ids.clear()
+
+def _get_app_id(cursor, app_name, app_path, seen_at, new_ids, created):
+    """Identifiant de l'application, créée au besoin dans la transaction en cours ;
+    les identifiants lus vont dans new_ids, les applications créées dans created"""
+    key = (app_name, app_path or '')
+    app_id = _app_ids.get(key) or new_ids.get(key)
+    if app_id is None:
+        cursor.execute('''
+            INSERT OR IGNORE INTO apps (name, path, first_seen, last_seen)
+            VALUES (?, ?, ?, ?)
+        ''', (*key, seen_at, seen_at))
+        inserted = cursor.rowcount == 1
+        app_id = cursor.execute('SELECT id FROM apps WHERE name = ? AND path = ?', key).fetchone()[0]
+        new_ids[key] = app_id
+        if inserted:
+            created.append((app_id, app_name, app_path or None))
+    return app_id
+
+def insert_sessions(sessions):
+    """Insère un lot de sessions (app_name, app_path, start_time, end_time, duration_sec)
+    en une seule transaction, cumuls quotidiens compris"""
+    conn = get_connection()
+    new_ids = {}
+    created = []
+    last_seen = {}
     
-    return [(app_name, seconds) for app_name, seconds in results]
+    # Le bloc with valide la transaction (ou l'annule en cas d'erreur)
+    with conn:
+        cursor = conn.cursor()
+        for app_name, app_path, start_time, end_time, duration_sec in sessions:
+            app_id = _get_app_id(cursor, app_name, app_path, start_time, new_ids, created)
+            last_seen[app_id] = max(last_seen.get(app_id, end_time), end_time)
+            cursor.execute('''
+                INSERT INTO sessions (app_id, start_time, end_time, duration_sec, start_ts, end_ts, day)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (app_id, start_time, end_time, duration_sec,
+                  _iso_to_epoch(start_time), _iso_to_epoch(end_time), start_time[:10]))
+            _add_daily_usage(cursor, app_name, start_time, end_time, duration_sec)
+            _add_daily_durations(cursor, app_name, start_time, end_time, duration_sec)
+        
+        # Une seule mise à jour de last_seen par application et par lot
+        cursor.executemany('''
+            UPDATE apps SET last_seen = MAX(COALESCE(last_seen, ''), ?) WHERE id = ?
+        ''', [(seen_at, app_id) for app_id, seen_at in last_seen.items()])
+    
+    # Identifiants mémorisés seulement une fois la transaction validée
+    if new_ids:
+        with _app_ids_lock:
+            _app_ids.update(new_ids)
+    if sessions:
+        _mark_daily_dirty(min(start_time[:10] for _, _, start_time, _, _ in sessions))
+    bump_data_version()
+    
+    if created:
+        for listener in app_listeners:
+            try:
+                listener(created)
+            except Exception as e:
+                print(f"❌ Erreur lors de la notification des nouvelles applications: {e}")
 
-def get_monthly_stats(months_back=0):
-    """Récupère les statistiques mensuelles"""
-    end_date = datetime.now().date()
-    start_date = end_date.replace(day=1) - timedelta(days=months_back * 30)
+def insert_session(app_name, app_path, start_time, end_time, duration_sec):
+    """Insère une nouvelle session et met à jour les cumuls quotidiens"""
+    insert_sessions([(app_name, app_path, start_time, end_time, duration_sec)])
+
+def get_last_session_end():
+    """Fin (texte ISO) de la dernière session écrite, None si la base est vide"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # Les sessions sont écrites dans l'ordre chronologique : la dernière ligne insérée
+    cursor.execute('SELECT end_time FROM sessions ORDER BY id DESC LIMIT 1')
+
+    result = cursor.fetchone()
+
+    return result[0] if result else None
+
+@cached_query
+def get_daily_stats(date=None):
+    """Récupère les statistiques quotidiennes"""
+    if date is None:
+        date = datetime.now().date()
     
-    conn = sqlite3.connect("chronix.db")
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
-        SELECT app_name, SUM(duration_sec) as total_seconds
-        FROM sessions 
-        WHERE DATE(start_time) >= ?
-        GROUP BY app_name
-        ORDER BY total_seconds DESC
-    ''', (start_date.isoformat(),))
+        SELECT app_name, total_sec
+        FROM daily_usage
+        WHERE day = ?
+        ORDER BY total_sec DESC
+    ''', (date.isoformat(),))
     
     results = cursor.fetchall()
-    conn.close()
     
     return [(app_name, seconds) for app_name, seconds in results]
 
+def get_weekly_stats(weeks_back=0):
+    """Récupère les statistiques hebdomadaires (semaine calendaire, du lundi au dimanche)"""
+    start_date = periods.week_start(datetime.now().date()) - timedelta(weeks=weeks_back)
+    return get_range_stats(start_date, start_date + timedelta(days=6))
+
+def get_monthly_stats(months_back=0):
+    """Récupère les statistiques mensuelles (mois calendaire)"""
+    start_date = periods.add_months(datetime.now().date(), -months_back)
+    return get_range_stats(start_date, periods.add_months(start_date, 1) - timedelta(days=1))
+
+# Sommes cumulées des cumuls quotidiens par application (temps, nombre de sessions, effectifs
+# par tranche de durée) : le cumul entre deux dates quelconques est une différence de deux
+# colonnes, quelle que soit la longueur de la période. Seuls les jours modifiés depuis la
+# dernière lecture (voir insert_sessions) sont relus
+_daily_index = None
+_daily_dirty_from = None
+_daily_index_lock = threading.Lock()
+
+def _mark_daily_dirty(day):
+    """Les cumuls à partir du jour ISO `day` sont à relire"""
+    global _daily_dirty_from
+    with _daily_index_lock:
+        if _daily_dirty_from is None or day < _daily_dirty_from:
+            _daily_dirty_from = day
+
+def clear_daily_index():
+    """Oublie les sommes cumulées (relues entièrement au prochain appel)"""
+    global _daily_index
+    with _daily_index_lock:
+        _daily_index = None
+
+def _extend_prefix(prefix, first_column, app_count, daily):
+    """Sommes cumulées (applications, jours + 1, ...) : colonnes conservées jusqu'à
+    first_column, puis recalculées à partir des valeurs quotidiennes relues `daily`"""
+    import numpy as np
+
+    result = np.zeros((app_count, first_column + daily.shape[1] + 1) + daily.shape[2:], dtype=prefix.dtype)
+    result[:prefix.shape[0], :first_column + 1] = prefix[:, :first_column + 1]
+    result[:, first_column + 1:] = result[:, first_column:first_column + 1] + np.cumsum(daily, axis=1)
+    return result
+
+def _load_daily_index():
+    """Retourne l'index des sommes cumulées, mis à jour si besoin (appelé avec le verrou)"""
+    global _daily_index, _daily_dirty_from
+    import numpy as np
+
+    index, dirty_from = _daily_index, _daily_dirty_from
+    if index is not None and index["generation"] == _generation and dirty_from is None:
+        return index
+
+    conn = get_connection()
+    full = (index is None or index["generation"] != _generation or index["first_day"] is None
+            or dirty_from < index["first_day"].isoformat())
+    if full:
+        bucket_count = len(DURATION_BUCKETS) + 1
+        index = {"generation": _generation, "first_day": None, "names": [], "positions": {},
+                 "seconds": np.zeros((0, 1), dtype=np.int64), "sessions": np.zeros((0, 1), dtype=np.int32),
+                 "buckets": np.zeros((0, 1, bucket_count), dtype=np.int32),
+                 "longest": np.zeros((0, 0), dtype=np.int32), "total_seconds": np.zeros(1, dtype=np.int64),
+                 "total_sessions": np.zeros(1, dtype=np.int32),
+                 "total_buckets": np.zeros((1, bucket_count), dtype=np.int32)}
+        dirty_from = ''
+    rows = conn.execute('''
+        SELECT day, app_name, total_sec, session_count, max_session_sec FROM daily_usage WHERE day >= ?
+    ''', (dirty_from,)).fetchall()
+    bucket_rows = conn.execute('''
+        SELECT day, app_name, bucket, session_count FROM daily_durations WHERE day >= ?
+    ''', (dirty_from,)).fetchall()
+    _daily_dirty_from = None
+
+    if index["first_day"] is None:
+        if not rows:
+            _daily_index = index
+            return index
+        index["first_day"] = datetime.fromisoformat(min(row[0] for row in rows)).date()
+    first_day = index["first_day"]
+    # Jours relus à partir de dirty_from (sans dépasser la fin de l'historique déjà connu)
+    old_day_count = index["seconds"].shape[1] - 1
+    first_column = 0 if full else min((datetime.fromisoformat(dirty_from).date() - first_day).days, old_day_count)
+
+    # Nouvelles applications et nouveaux jours : agrandir les matrices
+    positions, names = index["positions"], index["names"]
+    for row in rows + bucket_rows:
+        if row[1] not in positions:
+            positions[row[1]] = len(names)
+            names.append(row[1])
+
+    def cells(day_rows):
+        """(applications, colonnes relatives à first_column) des lignes relues"""
+        apps = np.array([positions[row[1]] for row in day_rows], dtype=np.int64)
+        days = np.array([(datetime.fromisoformat(row[0]).date() - first_day).days - first_column
+                         for row in day_rows], dtype=np.int64)
+        return apps, days
+
+    row_apps, row_days = cells(rows)
+    bucket_apps, bucket_days = cells(bucket_rows)
+    day_count = max([old_day_count, first_column, *(row_days + first_column + 1),
+                     *(bucket_days + first_column + 1)])
+    span = day_count - first_column
+
+    seconds = np.zeros((len(names), span), dtype=np.int64)
+    sessions = np.zeros((len(names), span), dtype=np.int32)
+    buckets = np.zeros((len(names), span, len(DURATION_BUCKETS) + 1), dtype=np.int32)
+    if rows:
+        np.add.at(seconds, (row_apps, row_days), np.array([row[2] for row in rows], dtype=np.int64))
+        np.add.at(sessions, (row_apps, row_days), np.array([row[3] for row in rows], dtype=np.int32))
+    if bucket_rows:
+        np.add.at(buckets, (bucket_apps, bucket_days, np.array([row[2] for row in bucket_rows])),
+                  np.array([row[3] for row in bucket_rows], dtype=np.int32))
+
+    # Le maximum ne se cumule pas : valeurs quotidiennes, jours relus remplacés
+    longest = np.zeros((len(names), day_count), dtype=np.int32)
+    longest[:index["longest"].shape[0], :first_column] = index["longest"][:, :first_column]
+    if rows:
+        np.maximum.at(longest, (row_apps, row_days + first_column),
+                      np.array([row[4] for row in rows], dtype=np.int32))
+
+    index.update(
+        seconds=_extend_prefix(index["seconds"], first_column, len(names), seconds),
+        sessions=_extend_prefix(index["sessions"], first_column, len(names), sessions),
+        buckets=_extend_prefix(index["buckets"], first_column, len(names), buckets),
+        longest=longest,
+    )
+    index.update(total_seconds=index["seconds"].sum(axis=0), total_sessions=index["sessions"].sum(axis=0),
+                 total_buckets=index["buckets"].sum(axis=0))
+    _daily_index = index
+    return index
+
+def _approximate_median(buckets, longest):
+    """Médiane approchée à partir des effectifs par tranche de durée (..., tranches) : chaque
+    session du milieu est placée au centre de sa part de la tranche, la plus longue à sa valeur exacte"""
+    import numpy as np
+
+    lower = np.array((0,) + DURATION_BUCKETS, dtype=float)
+    upper = np.array(DURATION_BUCKETS + (0,), dtype=float)
+    counts = buckets.sum(axis=-1)
+    cumulative = np.cumsum(buckets, axis=-1)
+
+    def ranked(rank):
+        """Durée approchée de la session de rang `rank` (à partir de 1) par ordre croissant"""
+        bucket = np.minimum((cumulative < rank[..., None]).sum(axis=-1), len(DURATION_BUCKETS))
+        inside = np.take_along_axis(buckets, bucket[..., None], axis=-1)[..., 0]
+        before = np.take_along_axis(cumulative, bucket[..., None], axis=-1)[..., 0] - inside
+        fraction = np.divide(rank - before - 0.5, inside, out=np.zeros(rank.shape), where=inside > 0)
+        # Tranches bornées par la session la plus longue (la dernière est ouverte)
+        top = np.where(bucket == len(DURATION_BUCKETS), longest, np.minimum(upper[bucket], longest))
+        value = lower[bucket] + fraction * np.maximum(top - lower[bucket], 0)
+        return np.where(rank >= counts, longest, value)
+
+    median = (ranked((counts + 1) // 2) + ranked(counts // 2 + 1)) / 2
+    return np.where(counts > 0, np.rint(median), 0).astype(np.int64)
+
+def get_range_stats(start_date, end_date, group_by="app", sessions=False):
+    """Temps passé entre deux dates incluses, à partir des sommes cumulées des cumuls quotidiens :
+    - group_by="app" : [(app_name, seconds)] par temps décroissant ;
+    - group_by="day", "week" ou "month" : [(début ISO de la tranche, seconds)] dans l'ordre
+      chronologique, une ligne par jour, semaine (du lundi) ou mois calendaire, même vide.
+    Avec sessions=True, chaque ligne se termine par (session_count, average_sec, median_sec, max_sec),
+    comptés comme daily_usage (une session qui passe minuit compte une portion par jour) :
+    la médiane est approchée à partir des tranches de durée (DURATION_BUCKETS)"""
+    import numpy as np
+
+    if group_by not in periods.GROUP_BY:
+        raise ValueError(f"Regroupement inconnu : {group_by}")
+    if start_date > end_date:
+        return []
+
+    with _daily_index_lock:
+        index = _load_daily_index()
+        first_day = index["first_day"]
+        day_count = index["seconds"].shape[1] - 1
+
+        def column(day):
+            """Colonne des sommes cumulées juste avant `day` (bornée à l'historique)"""
+            if first_day is None:
+                return 0
+            return min(max((day - first_day).days, 0), day_count)
+
+        def session_columns(count, seconds, buckets, longest):
+            """(session_count, average_sec, median_sec, max_sec) de chaque ligne"""
+            median = _approximate_median(buckets, longest)
+            return [(int(n), int(round(total / n)) if n else 0, int(m), int(top))
+                    for n, total, m, top in zip(count, seconds, median, longest)]
+
+        if group_by == "app":
+            a, b = column(start_date), column(end_date + timedelta(days=1))
+            seconds = index["seconds"][:, b] - index["seconds"][:, a]
+            keep = np.flatnonzero(seconds > 0)
+            stats = [(index["names"][i], int(seconds[i])) for i in keep]
+            if sessions:
+                longest = index["longest"][keep, a:b].max(axis=1) if b > a else np.zeros(len(keep), dtype=np.int32)
+                extra = session_columns(index["sessions"][keep, b] - index["sessions"][keep, a], seconds[keep],
+                                        index["buckets"][keep, b] - index["buckets"][keep, a], longest)
+                stats = [row + more for row, more in zip(stats, extra)]
+            return sorted(stats, key=lambda item: item[1], reverse=True)
+
+        starts = periods.bucket_starts(start_date, end_date, group_by)
+        bounds = [(column(max(bucket, start_date)),
+                   column(min(periods.next_bucket(bucket, group_by), end_date + timedelta(days=1))))
+                  for bucket in starts]
+        total_seconds = index["total_seconds"]
+        stats = [(bucket.isoformat(), int(total_seconds[b] - total_seconds[a]))
+                 for bucket, (a, b) in zip(starts, bounds)]
+        if sessions:
+            all_longest = index["longest"].max(axis=0) if index["longest"].size else np.zeros(0, dtype=np.int32)
+            extra = session_columns(
+                [index["total_sessions"][b] - index["total_sessions"][a] for a, b in bounds],
+                [seconds for _, seconds in stats],
+                np.array([index["total_buckets"][b] - index["total_buckets"][a] for a, b in bounds]).reshape(
+                    len(bounds), len(DURATION_BUCKETS) + 1),
+                np.array([all_longest[a:b].max() if b > a else 0 for a, b in bounds], dtype=np.int64))
+            stats = [row + more for row, more in zip(stats, extra)]
+        return stats
+
+# Colonnes des sessions déjà lues pour la carte d'activité : les appels suivants ne lisent
+# que les sessions ajoutées depuis (identifiants croissants, comme pour le catalogue des applications)
+# et seules les sessions de la dernière période demandée sont gardées
+_session_columns = None
+_session_columns_lock = threading.Lock()
+
+def _load_session_columns(first_day):
+    """Colonnes numpy (app_id, start_ts, end_ts, duration_sec) des sessions commencées
+    depuis first_day, complétées à chaque appel par les nouvelles lignes"""
+    global _session_columns
+    import numpy as np
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    with _session_columns_lock:
+        cached = _session_columns
+        last_id = conn.execute('SELECT MAX(id) FROM sessions').fetchone()[0] or 0
+        if (cached is None or cached["generation"] != _generation or first_day < cached["first_day"]
+                or last_id < cached["last_id"]):
+            # Première lecture (ou base changée, ou période plus ancienne) : à partir du premier
+            # identifiant de la journée, puis parcours séquentiel de la clé primaire
+            first_id = conn.execute('SELECT MIN(id) FROM sessions WHERE day >= ?',
+                                    (first_day.isoformat(),)).fetchone()[0]
+            cached = {"generation": _generation, "first_day": first_day, "last_id": (first_id or 1) - 1,
+                      "columns": tuple(np.zeros(0, dtype=np.int64) for _ in range(4))}
+        elif first_day > cached["first_day"]:
+            # Période plus récente : les sessions plus anciennes ne servent plus
+            keep = cached["columns"][1] >= datetime.combine(first_day, datetime.min.time()).timestamp()
+            cached = dict(cached, first_day=first_day, columns=tuple(column[keep] for column in cached["columns"]))
+
+        if last_id > cached["last_id"]:
+            cursor.execute('''
+                SELECT app_id, start_ts, end_ts, duration_sec
+                FROM sessions
+                WHERE id > ? AND id <= ? AND end_ts > start_ts
+            ''', (cached["last_id"], last_id))
+            rows = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 4)
+            columns = tuple(np.concatenate([old, new]) for old, new in zip(cached["columns"], rows.T))
+            cached = dict(cached, last_id=last_id, columns=columns)
+        _session_columns = cached
+        return cached["columns"]
+
+def _local_hour_starts(hours, phase):
+    """Début de chaque heure locale en heure locale murale (l'heure locale lue comme si elle
+    était UTC), les heures étant numérotées en secondes epoch décalées de `phase` : heure et
+    jour de la semaine s'en déduisent par divisions entières"""
+    import numpy as np
+
+    starts = hours * 3600 - phase
+    if not len(hours):
+        return starts
+    # Décalage UTC au début de chaque heure : relevé une fois par jour, puis heure par heure
+    # les seuls jours de changement d'heure
+    first_hour = int(hours.min())
+    hour_count = int(hours.max()) - first_hour + 1
+
+    def offset(hour):
+        return time.localtime((first_hour + hour) * 3600 - phase).tm_gmtoff
+
+    daily = [offset(day * 24) for day in range(hour_count // 24 + 2)]
+    offsets = np.repeat(np.array(daily[:-1], dtype=np.int64), 24)
+    for day in range(len(daily) - 1):
+        if daily[day] != daily[day + 1]:
+            offsets[day * 24:day * 24 + 24] = [offset(hour) for hour in range(day * 24, day * 24 + 24)]
+    return starts + offsets[hours - first_hour]
+
+@cached_query
+def get_usage_heatmap(start_date, end_date):
+    """Temps par application, jour de la semaine et heure entre deux dates (incluses) :
+    retourne (app_names, matrice numpy (applications, 7, 24) en secondes), lundi = 0,
+    applications triées par temps total décroissant. Les sessions sont découpées aux
+    changements d'heure locale sur le temps réel (epoch), sans boucle Python par session :
+    l'heure sautée au passage à l'heure d'été ne reçoit rien, l'heure répétée à l'heure
+    d'hiver reçoit ses deux passages"""
+    # Import différé : numpy n'est pas chargé par le mode sans interface
+    import numpy as np
+
+    # Une session commencée jusqu'à une semaine avant la période peut encore y déborder
+    app_ids, start, end, duration = _load_session_columns(start_date - timedelta(days=7))
+    app_rows = get_connection().execute('SELECT id, name FROM apps').fetchall()
+
+    # Minuits locaux qui bornent la période, en secondes epoch
+    range_start = int(datetime.combine(start_date, datetime.min.time()).timestamp())
+    range_end = int(datetime.combine(end_date + timedelta(days=1), datetime.min.time()).timestamp())
+    keep = (end > range_start) & (start < range_end)
+    app_ids, start, end, duration = app_ids[keep], start[keep], end[keep], duration[keep]
+    if not len(start) or not app_rows:
+        return (), np.zeros((0, 7, 24))
+
+    # Identifiant d'application -> index de son nom (plusieurs chemins peuvent porter le même nom)
+    ids = np.array([app_id for app_id, _ in app_rows], dtype=np.int64)
+    app_names, name_index = np.unique([name for _, name in app_rows], return_inverse=True)
+    lookup = np.zeros(max(ids.max(), app_ids.max()) + 1, dtype=np.int64)
+    lookup[ids] = name_index
+    app_index = lookup[app_ids]
+
+    # Chaque portion reçoit sa part de duration_sec : les totaux restent ceux des sessions
+    elapsed = end - start
+    weight = np.divide(duration, elapsed, out=np.zeros(len(elapsed)), where=elapsed > 0)
+    start = np.clip(start, range_start, range_end)
+    end = np.clip(end, range_start, range_end)
+    keep = end > start
+    app_index, start, end, weight = app_index[keep], start[keep], end[keep], weight[keep]
+
+    # Heures locales alignées sur les heures epoch, décalées de la part non entière du
+    # décalage UTC (fuseaux à la demi-heure), supposée la même toute la période
+    phase = time.localtime(range_start).tm_gmtoff % 3600
+    start, end = start + phase, end + phase
+
+    # Une portion par heure touchée : heure de départ, puis heures suivantes par décalage
+    first_hour = start // 3600
+    hour_count = (end - 1) // 3600 - first_hour + 1
+    session = np.repeat(np.arange(len(start)), hour_count)
+    offset = np.arange(len(session)) - np.repeat(np.cumsum(hour_count) - hour_count, hour_count)
+    hour = first_hour[session] + offset
+    seconds = (np.minimum(end[session], (hour + 1) * 3600)
+               - np.maximum(start[session], hour * 3600)) * weight[session]
+
+    # Heure locale murale du début de chaque portion ; 1er janvier 1970 : un jeudi (lundi = 0)
+    wall_hour = _local_hour_starts(hour, phase) // 3600
+    weekday = (wall_hour // 24 + 3) % 7
+    cell = (app_index[session] * 7 + weekday) * 24 + wall_hour % 24
+    matrix = np.bincount(cell, weights=seconds, minlength=len(app_names) * 168).reshape(-1, 7, 24)
+
+    totals = matrix.sum(axis=(1, 2))
+    order = np.argsort(-totals, kind="stable")
+    order = order[totals[order] > 0]
+    matrix = matrix[order]
+    # Résultat partagé par le cache : lecture seule
+    matrix.flags.writeable = False
+    return tuple(str(name) for name in app_names[order]), matrix
+
+# Lots lus à la fois par les parcours complets (exports) : la mémoire utilisée ne dépend
+# que de cette taille, pas du nombre de sessions
+EXPORT_BATCH_SIZE = 5000
+
+@contextlib.contextmanager
+def read_connection():
+    """Connexion de lecture dédiée, fermée en sortie de bloc : un long parcours (export)
+    dans un thread éphémère ne laisse pas de connexion ouverte derrière lui"""
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT)
+    try:
+        _configure_connection(conn)
+        yield conn
+    finally:
+        conn.close()
+
+def _day_bounds(start_date=None, end_date=None):
+    """Bornes ISO incluses d'un filtre sur sessions.day (None pour une borne ouverte)"""
+    return (start_date.isoformat() if start_date else '',
+            end_date.isoformat() if end_date else '9999-12-31')
+
+def count_sessions(start_date=None, end_date=None, conn=None):
+    """Nombre de sessions commencées entre deux dates incluses (None pour une borne ouverte)"""
+    conn = conn or get_connection()
+    # Index (day, app_id, duration_sec) : comptage sans lire la table
+    cursor = conn.execute('SELECT COUNT(*) FROM sessions WHERE day BETWEEN ? AND ?',
+                          _day_bounds(start_date, end_date))
+    return cursor.fetchone()[0]
+
+def iter_session_batches(start_date=None, end_date=None, batch_size=EXPORT_BATCH_SIZE, conn=None):
+    """Parcourt les sessions commencées entre deux dates incluses dans l'ordre chronologique,
+    par lots de `batch_size` lignes (id, app_name, app_path, start_time, end_time, duration_sec, day)
+    lus avec fetchmany : jamais plus d'un lot en mémoire, quelle que soit la taille de l'historique"""
+    conn = conn or get_connection()
+    first_day, last_day = _day_bounds(start_date, end_date)
+
+    # Les identifiants suivent l'ordre chronologique : parcours de la clé primaire entre le
+    # premier et le dernier, sans tri (un ORDER BY id sur le seul filtre par jour trierait
+    # tout le résultat dans une table temporaire en mémoire)
+    first_id = conn.execute('SELECT MIN(id) FROM sessions WHERE day >= ?', (first_day,)).fetchone()[0]
+    last_id = conn.execute('SELECT MAX(id) FROM sessions WHERE day <= ?', (last_day,)).fetchone()[0]
+    if first_id is None or last_id is None:
+        return
+
+    cursor = conn.execute('''
+        SELECT id, app_name, app_path, start_time, end_time, duration_sec, day
+        FROM session_details
+        WHERE id BETWEEN ? AND ? AND day BETWEEN ? AND ?
+        ORDER BY id
+    ''', (first_id, last_id, first_day, last_day))
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+@cached_query
 def get_all_apps():
     """Récupère la liste de toutes les applications utilisées"""
-    conn = sqlite3.connect("chronix.db")
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
-        SELECT DISTINCT app_name, app_path
-        FROM sessions 
-        ORDER BY app_name
+        SELECT name, NULLIF(path, '')
+        FROM apps
+        ORDER BY name
     ''')
     
     results = cursor.fetchall()
-    conn.close()
     
     return [(app_name, app_path) for app_name, app_path in results]
 
+def get_apps_since(last_id):
+    """Applications (app_id, app_name, app_path) ajoutées après l'identifiant donné"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    # Parcours de la clé primaire : ne lit que les nouvelles lignes
+    cursor.execute('''
+        SELECT id, name, NULLIF(path, '')
+        FROM apps
+        WHERE id > ?
+        ORDER BY id
+    ''', (last_id,))
+    
+    return cursor.fetchall()
+
+@cached_query
 def get_app_path(app_name):
     """Récupère le chemin d'une application"""
-    conn = sqlite3.connect("chronix.db")
+    conn = get_connection()
     cursor = conn.cursor()
     
+    # Chemin le plus récent si l'application a été lancée depuis plusieurs emplacements
     cursor.execute('''
-        SELECT app_path 
-        FROM sessions 
-        WHERE app_name = ?
+        SELECT NULLIF(path, '')
+        FROM apps
+        WHERE name = ?
+        ORDER BY last_seen DESC
         LIMIT 1
     ''', (app_name,))
     
     result = cursor.fetchone()
-    conn.close()
     
     return result[0] if result else None
 
 def add_quota(app_name, daily_limit_minutes):
     """Ajoute ou met à jour un quota pour une application"""
-    conn = sqlite3.connect("chronix.db")
-    cursor = conn.cursor()
+    conn = get_connection()
     
-    cursor.execute('''
-        INSERT OR REPLACE INTO quotas (app_name, daily_limit_minutes, enabled)
-        VALUES (?, ?, 1)
-    ''', (app_name, daily_limit_minutes))
+    with conn:
+        conn.execute('''
+            INSERT OR REPLACE INTO quotas (app_name, daily_limit_minutes, enabled)
+            VALUES (?, ?, 1)
+        ''', (app_name, daily_limit_minutes))
     
-    conn.commit()
-    conn.close()
+    bump_data_version()
 
 def remove_quota(app_name):
     """Supprime un quota pour une application"""
-    conn = sqlite3.connect("chronix.db")
-    cursor = conn.cursor()
+    conn = get_connection()
     
-    cursor.execute('DELETE FROM quotas WHERE app_name = ?', (app_name,))
+    with conn:
+        conn.execute('DELETE FROM quotas WHERE app_name = ?', (app_name,))
     
-    conn.commit()
-    conn.close()
+    bump_data_version()
 
+@cached_query
 def get_quotas():
     """Récupère tous les quotas configurés"""
-    conn = sqlite3.connect("chronix.db")
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT app_name, daily_limit_minutes FROM quotas WHERE enabled = 1')
     
     results = cursor.fetchall()
-    conn.close()
     
     return [(app_name, minutes) for app_name, minutes in results]
 
+@cached_query
 def check_quota_exceeded(app_name):
     """Vérifie si le quota quotidien d'une application est dépassé"""
-    conn = sqlite3.connect("chronix.db")
+    conn = get_connection()
     cursor = conn.cursor()
     
     # Récupérer le quota
@@ -184,7 +1058,6 @@ def check_quota_exceeded(app_name):
     quota_result = cursor.fetchone()
     
     if not quota_result:
-        conn.close()
         return False
     
     daily_limit_seconds = quota_result[0] * 60
@@ -192,21 +1065,20 @@ def check_quota_exceeded(app_name):
     # Récupérer l'utilisation d'aujourd'hui
     today = datetime.now().date()
     cursor.execute('''
-        SELECT SUM(duration_sec) 
-        FROM sessions 
-        WHERE app_name = ? AND DATE(start_time) = ?
-    ''', (app_name, today.isoformat()))
+        SELECT total_sec
+        FROM daily_usage
+        WHERE day = ? AND app_name = ?
+    ''', (today.isoformat(), app_name))
     
     usage_result = cursor.fetchone()
-    today_usage = usage_result[0] if usage_result[0] else 0
-    
-    conn.close()
+    today_usage = usage_result[0] if usage_result else 0
     
     return today_usage >= daily_limit_seconds
 
+@cached_query
 def get_quota_usage(app_name):
     """Récupère l'utilisation actuelle d'une application par rapport à son quota"""
-    conn = sqlite3.connect("chronix.db")
+    conn = get_connection()
     cursor = conn.cursor()
     
     # Récupérer le quota
@@ -214,7 +1086,6 @@ def get_quota_usage(app_name):
     quota_result = cursor.fetchone()
     
     if not quota_result:
-        conn.close()
         return 0, 0, 0
     
     daily_limit_seconds = quota_result[0] * 60
@@ -222,15 +1093,57 @@ def get_quota_usage(app_name):
     # Récupérer l'utilisation d'aujourd'hui
     today = datetime.now().date()
     cursor.execute('''
-        SELECT SUM(duration_sec) 
-        FROM sessions 
-        WHERE app_name = ? AND DATE(start_time) = ?
-    ''', (app_name, today.isoformat()))
+        SELECT total_sec
+        FROM daily_usage
+        WHERE day = ? AND app_name = ?
+    ''', (today.isoformat(), app_name))
     
     usage_result = cursor.fetchone()
-    today_usage = usage_result[0] if usage_result[0] else 0
-    
-    conn.close()
+    today_usage = usage_result[0] if usage_result else 0
     
     percentage = (today_usage / daily_limit_seconds) * 100 if daily_limit_seconds > 0 else 0
-    return today_usage, daily_limit_seconds, percentage 
\ No newline at end of file
+    return today_usage, daily_limit_seconds, percentage
+
+@cached_query
+def get_all_quota_usage(date=None, aliases=()):
+    """Récupère en une requête l'utilisation de tous les quotas actifs :
+    liste de (app_name, used_seconds, limit_seconds, percentage).
+    aliases : paires (nom, nom canonique) ; un quota compte alors le temps de tous les noms
+    regroupés sous le même nom canonique que le sien"""
+    if date is None:
+        date = datetime.now().date()
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    if not aliases:
+        cursor.execute('''
+            SELECT q.app_name, COALESCE(u.total_sec, 0), q.daily_limit_minutes * 60
+            FROM quotas q
+            LEFT JOIN daily_usage u ON u.day = ? AND u.app_name = q.app_name
+            WHERE q.enabled = 1
+            ORDER BY q.app_name
+        ''', (date.isoformat(),))
+    else:
+        values = ", ".join("(?, ?)" for _ in aliases)
+        cursor.execute(f'''
+            WITH alias (name, canonical) AS (VALUES {values}),
+            usage AS (
+                SELECT COALESCE(a.canonical, u.app_name) AS app_name, SUM(u.total_sec) AS total_sec
+                FROM daily_usage u
+                LEFT JOIN alias a ON a.name = u.app_name
+                WHERE u.day = ?
+                GROUP BY 1
+            )
+            SELECT q.app_name, COALESCE(u.total_sec, 0), q.daily_limit_minutes * 60
+            FROM quotas q
+            LEFT JOIN alias a ON a.name = q.app_name
+            LEFT JOIN usage u ON u.app_name = COALESCE(a.canonical, q.app_name)
+            WHERE q.enabled = 1
+            ORDER BY q.app_name
+        ''', (*(value for pair in aliases for value in pair), date.isoformat()))
+    
+    results = cursor.fetchall()
+    
+    return [(app_name, used, limit, (used / limit) * 100 if limit > 0 else 0)
+            for app_name, used, limit in results]
@@ -0,0 +1,117 @@
+# tracker/export.py
+# Export des sessions en CSV ou JSON Lines, compressé ou non : python -m tracker.export <fichier>
+#
+# Les sessions sont lues par lots (db_manager.iter_session_batches) et écrites au fil de l'eau :
+# la mémoire utilisée reste la même pour mille ou pour plusieurs millions de sessions
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+from datetime import date
+
+from tracker import db_manager
+
+FORMATS = ("csv", "jsonl")
+COLUMNS = ("id", "app_name", "app_path", "start_time", "end_time", "duration_sec", "day")
+
+# Compromis taille/vitesse : le niveau 9 par défaut de gzip compresse près de moitié plus
+# lentement pour un fichier à peine 2 % plus petit (voir benchmarks/bench_export.py)
+GZIP_LEVEL = 6
+
+class ExportCancelled(Exception):
+    """Levée quand l'export est annulé avant la fin (le fichier partiel est supprimé)"""
+
+def guess_format(path):
+    """(format, compressé) d'après l'extension : .csv, .jsonl, .ndjson, suivies ou non de .gz"""
+    name = path.lower()
+    compress = name.endswith(".gz")
+    if compress:
+        name = name[:-3]
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl", compress
+    return "csv", compress
+
+def export_sessions(path, start_date=None, end_date=None, fmt=None, compress=None,
+                    progress=None, is_cancelled=lambda: False, batch_size=db_manager.EXPORT_BATCH_SIZE):
+    """Écrit les sessions commencées entre deux dates incluses (None pour une borne ouverte)
+    dans `path` et retourne leur nombre ; progress(écrites, total) est appelé après chaque lot.
+    Le fichier est écrit à côté puis renommé : jamais de fichier tronqué à l'emplacement final"""
+    guessed_format, guessed_compress = guess_format(path)
+    fmt = fmt or guessed_format
+    compress = guessed_compress if compress is None else compress
+    if fmt not in FORMATS:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+
+    partial_path = path + ".part"
+    written = 0
+    try:
+        with db_manager.read_connection() as conn:
+            # Une seule transaction de lecture : le total annoncé et les lignes lues
+            # viennent du même état de la base, même si le tracker écrit entre-temps
+            conn.execute('BEGIN')
+            total = db_manager.count_sessions(start_date, end_date, conn=conn)
+            if compress:
+                output = gzip.open(partial_path, "wt", compresslevel=GZIP_LEVEL, encoding="utf-8", newline="")
+            else:
+                output = open(partial_path, "w", encoding="utf-8", newline="")
+            with output:
+                if fmt == "csv":
+                    writer = csv.writer(output)
+                    writer.writerow(COLUMNS)
+                if progress:
+                    progress(0, total)
+                for rows in db_manager.iter_session_batches(start_date, end_date, batch_size, conn=conn):
+                    if is_cancelled():
+                        raise ExportCancelled()
+                    if fmt == "csv":
+                        writer.writerows(rows)
+                    else:
+                        output.writelines(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + "\n"
+                                          for row in rows)
+                    written += len(rows)
+                    if progress:
+                        progress(written, max(total, written))
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return written
+
+def main(argv=None):
+    """Point d'entrée de l'export en ligne de commande"""
+    parser = argparse.ArgumentParser(prog="python -m tracker.export",
+                                     description="Export des sessions Chronix en CSV ou JSON Lines")
+    parser.add_argument("output", help="fichier de sortie : .csv, .jsonl, suivi de .gz pour compresser")
+    parser.add_argument("--db", default=db_manager.DB_PATH, help="chemin de la base (défaut : %(default)s)")
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat, metavar="AAAA-MM-JJ",
+                        help="première journée exportée (défaut : début de l'historique)")
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat, metavar="AAAA-MM-JJ",
+                        help="dernière journée exportée, incluse (défaut : aujourd'hui compris)")
+    parser.add_argument("--format", choices=FORMATS, help="format (défaut : d'après l'extension)")
+    parser.add_argument("--gzip", action="store_true", default=None,
+                        help="compresser (défaut : si le fichier se termine par .gz)")
+    parser.add_argument("--batch-size", type=int, default=db_manager.EXPORT_BATCH_SIZE,
+                        help="sessions lues à la fois (défaut : %(default)s)")
+    args = parser.parse_args(argv)
+
+    db_manager.set_db_path(args.db)
+    db_manager.init_db()
+
+    def show_progress(written, total):
+        percentage = written / total * 100 if total else 100
+        print(f"\r📤 {written}/{total} sessions ({percentage:.0f} %)", end="", flush=True)
+
+    try:
+        written = export_sessions(args.output, args.start_date, args.end_date, fmt=args.format,
+                                  compress=args.gzip, progress=show_progress, batch_size=args.batch_size)
+    except KeyboardInterrupt:
+        print("\n🛑 Export interrompu")
+        return 1
+    print(f"\n✅ {written} sessions exportées vers {os.path.abspath(args.output)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+# tracker/foreground.py
+# Sources de la fenêtre au premier plan : chaque source pousse les changements de
+# fenêtre, horodatés, vers un callback on_change(info, timestamp).
+# Les sources Windows ne donnent que le pid et le titre ; le TimeTracker résout les
+# métadonnées du processus via son ProcessCache.
+import ctypes
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+try:
+    import win32gui
+    import win32process
+except ImportError:
+    # Hors Windows : seule la source simulée est disponible
+    win32gui = win32process = None
+
+def windows_available():
+    """Indique si l'API Windows de détection des fenêtres est utilisable (avec psutil,
+    sans lequel le ProcessCache ne peut rien dire des processus)"""
+    from . import process_cache
+    return win32gui is not None and process_cache.psutil is not None
+
+def get_window_info(hwnd):
+    """Retourne le pid et le titre d'une fenêtre (aucun accès au processus)"""
+    try:
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        if not pid:
+            return None
+        return {
+            "pid": pid,
+            "title": win32gui.GetWindowText(hwnd)
+        }
+    except Exception:
+        return None
+
+def get_foreground_window_info():
+    """Retourne les infos brutes de la fenêtre actuellement au premier plan"""
+    try:
+        return get_window_info(win32gui.GetForegroundWindow())
+    except Exception:
+        return None
+
+class ForegroundSource:
+    """Source de changements de fenêtre au premier plan.
+
+    run(on_change) bloque dans le thread du tracker jusqu'à stop() et appelle
+    on_change(info, timestamp) à chaque changement ; info vaut None quand plus
+    aucune fenêtre n'est suivie (la session en cours se termine alors à timestamp)."""
+
+    def __init__(self):
+        self._stop_event = threading.Event()
+
+    def reset(self):
+        """Réarme la source avant un nouveau démarrage"""
+        self._stop_event.clear()
+
+    def now(self):
+        """Horloge des horodatages de la source (fin de session à l'arrêt du tracking)"""
+        return datetime.now()
+
+    def run(self, on_change):
+        raise NotImplementedError
+
+    def stop(self):
+        """Demande l'arrêt de run() (appelable depuis n'importe quel thread)"""
+        self._stop_event.set()
+
+class PollingForegroundSource(ForegroundSource):
+    """Interroge la fenêtre au premier plan à intervalle fixe (erreur d'attribution
+    jusqu'à `interval` secondes par changement)"""
+
+    def __init__(self, probe=None, interval=2.0):
+        super().__init__()
+        self.probe = probe or get_foreground_window_info
+        self.interval = interval
+        self.wakeups = 0
+
+    def run(self, on_change):
+        last_pid = None
+        while not self._stop_event.is_set():
+            self.wakeups += 1
+            info = self.probe()
+            # Une fenêtre illisible (processus protégé...) ne termine pas la session en cours
+            if info and info["pid"] != last_pid:
+                last_pid = info["pid"]
+                on_change(info, datetime.now())
+            self._stop_event.wait(self.interval)
+
+class WinEventForegroundSource(PollingForegroundSource):
+    """Notifications Windows (SetWinEventHook sur EVENT_SYSTEM_FOREGROUND) : aucun
+    réveil hors changement de fenêtre, horodatage exact fourni par le système.
+    Se replie sur la scrutation si le hook ne peut pas être installé."""
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WM_QUIT = 0x0012
+    PM_NOREMOVE = 0x0000
+
+    def __init__(self, fallback_interval=2.0):
+        super().__init__(interval=fallback_interval)
+        self._thread_id = None
+
+    def run(self, on_change):
+        try:
+            from ctypes import wintypes
+            user32 = ctypes.windll.user32
+            kernel32 = ctypes.windll.kernel32
+        except (AttributeError, ImportError, OSError):
+            print("⚠️  Notifications Windows indisponibles, repli sur la scrutation")
+            return super().run(on_change)
+
+        def event_timestamp(event_time):
+            # event_time vient de GetTickCount (ms depuis le démarrage, sur 32 bits)
+            age_ms = (kernel32.GetTickCount() - event_time) & 0xFFFFFFFF
+            return datetime.now() - timedelta(milliseconds=age_ms)
+
+        def callback(hook, event, hwnd, id_object, id_child, event_thread, event_time):
+            self.wakeups += 1
+            info = get_window_info(hwnd)
+            if info:
+                on_change(info, event_timestamp(event_time))
+
+        # Garder une référence au callback tant que le hook est actif
+        proc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG,
+                                  wintypes.LONG, wintypes.DWORD, wintypes.DWORD)(callback)
+        hook = user32.SetWinEventHook(self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND,
+                                      0, proc, 0, 0, self.WINEVENT_OUTOFCONTEXT)
+        if not hook:
+            print("⚠️  Impossible d'installer le hook Windows, repli sur la scrutation")
+            return super().run(on_change)
+
+        try:
+            # Créer la file de messages du thread avant de le rendre joignable par stop()
+            msg = wintypes.MSG()
+            user32.PeekMessageW(ctypes.byref(msg), 0, 0, 0, self.PM_NOREMOVE)
+            self._thread_id = kernel32.GetCurrentThreadId()
+            if self._stop_event.is_set():
+                return
+
+            # État initial : la fenêtre déjà au premier plan
+            info = get_foreground_window_info()
+            if info:
+                on_change(info, datetime.now())
+
+            # Boucle de messages : les callbacks sont appelés pendant GetMessageW
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            self._thread_id = None
+            user32.UnhookWinEvent(hook)
+
+    def stop(self):
+        super().stop()
+        thread_id = self._thread_id
+        if thread_id:
+            ctypes.windll.user32.PostThreadMessageW(thread_id, self.WM_QUIT, 0, 0)
+
+class SimulatedForegroundSource(ForegroundSource):
+    """Rejoue un scénario déterministe de (exe_name, secondes au premier plan) ;
+    exe_name None simule une absence de fenêtre suivie (écran verrouillé...).
+
+    Les horodatages sont ceux du scénario : avec speed > 1 le temps est accéléré,
+    avec speed=math.inf tout est rejoué immédiatement (tests, benchmarks)."""
+
+    DEFAULT_SCRIPT = (
+        ("chrome.exe", 20),
+        ("code.exe", 45),
+        ("slack.exe", 5),
+        ("code.exe", 30),
+        ("explorer.exe", 3),
+        ("spotify.exe", 10),
+    )
+
+    def __init__(self, script=None, speed=1.0, loop=True, start_time=None):
+        super().__init__()
+        self.script = tuple(script or self.DEFAULT_SCRIPT)
+        if not self.script or any(seconds <= 0 for _, seconds in self.script):
+            raise ValueError("Le scénario doit contenir des durées strictement positives")
+        self.speed = speed
+        self.loop = loop
+        self.start_time = start_time
+        self.events = 0
+        self._clock_anchor = None   # (horodatage simulé, instant réel correspondant)
+        # Un pid stable par exécutable, comme un processus qui reste ouvert
+        self.pids = {}
+        for exe_name, _ in self.script:
+            if exe_name is not None:
+                self.pids.setdefault(exe_name, 1000 + len(self.pids))
+
+    @staticmethod
+    def parse_script(text):
+        """Construit un scénario depuis "chrome.exe:20,-:5,code.exe:45" ("-" : aucune fenêtre)"""
+        script = []
+        for item in text.split(","):
+            exe_name, _, seconds = item.strip().rpartition(":")
+            script.append((None if exe_name == "-" else exe_name, float(seconds)))
+        return script
+
+    def window_info(self, exe_name):
+        """Infos simulées d'une fenêtre, métadonnées du processus comprises"""
+        if exe_name is None:
+            return None
+        return {
+            "pid": self.pids[exe_name],
+            "exe_name": exe_name,
+            "path": f"C:\\Program Files\\Simulation\\{exe_name}",
+            "title": f"{exe_name} (simulé)"
+        }
+
+    def probe_at(self, elapsed):
+        """Fenêtre au premier plan `elapsed` secondes après le début du scénario"""
+        if self.loop:
+            elapsed %= sum(seconds for _, seconds in self.script)
+        for exe_name, seconds in self.script:
+            if elapsed < seconds:
+                return self.window_info(exe_name)
+            elapsed -= seconds
+        return None
+
+    def now(self):
+        """Temps simulé : dernier horodatage rejoué, plus le temps réel écoulé depuis (accéléré)"""
+        if self._clock_anchor is None:
+            return datetime.now()
+        timestamp, anchored_at = self._clock_anchor
+        if math.isinf(self.speed):
+            return timestamp
+        return timestamp + timedelta(seconds=(time.monotonic() - anchored_at) * self.speed)
+
+    def run(self, on_change):
+        timestamp = self.start_time or datetime.now()
+        while True:
+            for exe_name, seconds in self.script:
+                if self._stop_event.is_set():
+                    return
+                self.events += 1
+                self._clock_anchor = (timestamp, time.monotonic())
+                on_change(self.window_info(exe_name), timestamp)
+                timestamp += timedelta(seconds=seconds)
+                if not math.isinf(self.speed) and self._stop_event.wait(seconds / self.speed):
+                    return
+            if not self.loop:
+                # Fin du scénario : la dernière fenêtre quitte le premier plan
+                self._clock_anchor = (timestamp, time.monotonic())
+                on_change(None, timestamp)
+                return
+
+def default_source():
+    """Source par défaut : notifications Windows (repli automatique sur la scrutation)"""
+    if not windows_available():
+        raise RuntimeError("La détection des fenêtres nécessite Windows (pywin32 et psutil) ; "
+                           "utiliser SimulatedForegroundSource ailleurs")
+    return WinEventForegroundSource()
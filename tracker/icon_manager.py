@@ -1,15 +1,82 @@
+import hashlib
 import os
-from PyQt6.QtGui import QIcon, QPixmap, QColor, QPainter, QFont
-from PyQt6.QtCore import Qt
-
-class IconManager:
-    """Gestionnaire d'icônes pour les applications"""
-    
-    def __init__(self):
-        self.icon_cache = {}
+import queue
+import threading
+from collections import OrderedDict
+
+from PyQt6.QtGui import QIcon, QImage, QPixmap, QColor, QPainter, QFont
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+
+from tracker.app_names import app_name_resolver
+
+try:
+    import win32gui
+except ImportError:
+    # Hors Windows : seules les icônes générées sont disponibles
+    win32gui = None
+
+# Dossier des icônes déjà rendues (relatif au répertoire de travail, comme chronix.db)
+ICON_CACHE_DIR = os.environ.get("CHRONIX_ICON_CACHE", "icon_cache")
+
+# À incrémenter quand le rendu change : les anciens fichiers ne correspondent plus à aucune clé
+RENDER_VERSION = 1
+
+ICON_SIZE = 32
+
+def extract_exe_icon(exe_path, size=ICON_SIZE):
+    """Icône réelle de l'exécutable (Windows), ou None si elle n'est pas disponible"""
+    from_hicon = getattr(QImage, "fromHICON", None)
+    if win32gui is None or from_hicon is None or not exe_path:
+        return None
+    try:
+        large, small = win32gui.ExtractIconEx(exe_path, 0, 1)
+    except Exception:
+        return None
+    try:
+        if not large:
+            return None
+        image = from_hicon(int(large[0]))
+    finally:
+        for handle in list(large) + list(small):
+            win32gui.DestroyIcon(handle)
+    if image.isNull():
+        return None
+    return image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation)
+
+class IconManager(QObject):
+    """Gestionnaire d'icônes pour les applications : mémoire (LRU bornée), puis, dans un thread
+    dédié, fichiers PNG déjà rendus ou rendu (icône réelle ou pastille générée)"""
+
+    # Nom canonique dont l'icône vient d'être rendue (dans le thread de l'interface)
+    icon_ready = pyqtSignal(str)
+    # Interne : image lue ou rendue par le thread de rendu, convertie en QIcon dans le thread de l'interface
+    _image_rendered = pyqtSignal(str, QImage)
+
+    def __init__(self, cache_dir=ICON_CACHE_DIR, max_memory_icons=256, max_disk_icons=2000,
+                 async_render=True):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.max_memory_icons = max_memory_icons
+        self.max_disk_icons = max_disk_icons
+        self.async_render = async_render
+        self.icon_cache = OrderedDict()     # nom canonique -> QIcon, du moins au plus récent
+        self._pending = set()               # noms canoniques en cours de rendu
+        self._render_queue = queue.Queue()
+        self._render_thread = None
+        self._unpruned_writes = 0           # PNG écrits depuis la dernière purge du cache disque
+        self._default_icon = None
+        self._image_rendered.connect(self._on_image_rendered)
+
+        # Compteurs
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.renders = 0
+        self.evictions = 0
+
         self.app_colors = {
             "Chrome": "#4285f4",
-            "Firefox": "#ff7139", 
+            "Firefox": "#ff7139",
             "Edge": "#0078d4",
             "Brave": "#ff2000",
             "Cursor": "#00d4ff",
@@ -19,63 +86,194 @@ class IconManager:
             "Steam": "#171a21",
             "Explorateur Windows": "#0078d4"
         }
-    
+
     def get_app_icon(self, exe_path):
-        """Crée une icône simple basée sur le nom de l'application"""
-        # Extraire le nom de l'app depuis le chemin
-        app_name = os.path.basename(exe_path).replace('.exe', '').title()
-        
-        # Créer une icône colorée avec la première lettre
-        return self.create_text_icon(app_name[0] if app_name else "?", app_name)
-    
+        """Crée l'icône d'un exécutable : icône réelle si possible, sinon pastille avec son nom"""
+        # Même nom canonique que le tracker (et donc mêmes couleurs)
+        app_name = app_name_resolver.resolve(os.path.basename(exe_path), exe_path) if exe_path else ""
+        return QIcon(QPixmap.fromImage(self.render_icon_image(app_name, exe_path)))
+
+    def render_icon_image(self, app_name, exe_path):
+        """Rendu de l'icône dans une QImage (utilisable hors du thread de l'interface)"""
+        image = extract_exe_icon(exe_path)
+        if image is None:
+            image = self.create_text_image(app_name[0] if app_name else "?", app_name)
+        return image
+
     def create_text_icon(self, text, app_name):
         """Crée une icône avec du texte"""
-        # Créer un pixmap
-        pixmap = QPixmap(32, 32)
-        pixmap.fill(QColor(0, 0, 0, 0))  # Transparent
-        
+        return QIcon(QPixmap.fromImage(self.create_text_image(text, app_name)))
+
+    def create_text_image(self, text, app_name):
+        """Dessine une pastille colorée avec du texte (QImage : sans risque hors du thread de l'interface)"""
+        image = QImage(ICON_SIZE, ICON_SIZE, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(QColor(0, 0, 0, 0))  # Transparent
+
         # Choisir une couleur pour l'app
         color = self.app_colors.get(app_name, "#00d4ff")
-        
+
         # Dessiner un cercle coloré
-        painter = QPainter(pixmap)
+        painter = QPainter(image)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
+
         # Cercle de fond
         painter.setBrush(QColor(color))
         painter.setPen(QColor(color))
         painter.drawEllipse(2, 2, 28, 28)
-        
+
         # Texte blanc
         painter.setPen(QColor("white"))
         font = QFont()
         font.setBold(True)
         font.setPointSize(12)
         painter.setFont(font)
-        
+
         # Centrer le texte
-        painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, text)
+        painter.drawText(image.rect(), Qt.AlignmentFlag.AlignCenter, text)
         painter.end()
-        
-        return QIcon(pixmap)
-    
+
+        return image
+
     def get_cached_icon(self, app_name, exe_path):
-        """Récupère une icône depuis le cache ou l'extrait"""
-        if app_name in self.icon_cache:
-            return self.icon_cache[app_name]
-        
-        icon = self.get_app_icon(exe_path)
-        if icon:
-            self.icon_cache[app_name] = icon
-            
-        return icon
-    
+        """Récupère une icône depuis la mémoire, ou la fait lire sur disque ou rendre.
+        Hors mémoire, retourne l'icône par défaut ; icon_ready est émis une fois l'icône prête.
+        Aucun accès disque dans le thread de l'interface (appelée depuis les modèles de vues)"""
+        app_name = app_name_resolver.canonical(app_name)
+        icon = self.icon_cache.get(app_name)
+        if icon is not None:
+            self.icon_cache.move_to_end(app_name)
+            self.memory_hits += 1
+            return icon
+
+        if not self.async_render:
+            icon = QIcon(QPixmap.fromImage(self._load_icon_image(app_name, exe_path)))
+            self._remember(app_name, icon)
+            self._prune_after_writes()
+            return icon
+
+        if app_name not in self._pending:
+            self._pending.add(app_name)
+            self._ensure_render_thread()
+            self._render_queue.put((app_name, exe_path))
+        return self.get_default_icon()
+
+    def cache_file(self, app_name, exe_path):
+        """Fichier PNG d'une icône, propre au chemin de l'exe et à sa date de modification"""
+        try:
+            stat = os.stat(exe_path) if exe_path else None
+            stamp = f"{stat.st_mtime_ns}:{stat.st_size}" if stat else ""
+        except OSError:
+            stamp = ""
+        key = f"{RENDER_VERSION}|{app_name}|{exe_path or ''}|{stamp}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
     def get_default_icon(self):
         """Retourne une icône par défaut"""
-        # Créer une icône simple (cercle bleu)
-        pixmap = QPixmap(32, 32)
-        pixmap.fill(QColor(0, 212, 255))  # Couleur néon bleue
-        return QIcon(pixmap)
+        if self._default_icon is None:
+            # Créer une icône simple (cercle bleu)
+            pixmap = QPixmap(ICON_SIZE, ICON_SIZE)
+            pixmap.fill(QColor(0, 212, 255))  # Couleur néon bleue
+            self._default_icon = QIcon(pixmap)
+        return self._default_icon
+
+    def get_stats(self):
+        """Retourne la taille et les compteurs du cache d'icônes"""
+        return {
+            "memory_size": len(self.icon_cache),
+            "max_memory_icons": self.max_memory_icons,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "renders": self.renders,
+            "evictions": self.evictions,
+            "pending": len(self._pending),
+        }
+
+    def _remember(self, app_name, icon):
+        """Ajoute une icône au cache mémoire en évinçant la moins récemment utilisée"""
+        self.icon_cache[app_name] = icon
+        self.icon_cache.move_to_end(app_name)
+        while len(self.icon_cache) > self.max_memory_icons:
+            self.icon_cache.popitem(last=False)
+            self.evictions += 1
+
+    def _load_icon_image(self, app_name, exe_path):
+        """Image de l'icône : fichier PNG déjà rendu, sinon rendu et enregistrement"""
+        cache_file = self.cache_file(app_name, exe_path)
+        image = QImage(cache_file) if os.path.exists(cache_file) else QImage()
+        if image.isNull():
+            return self._render_to_file(app_name, exe_path, cache_file)
+
+        self.disk_hits += 1
+        try:
+            # Date de dernier usage : les fichiers les plus anciens partent en premier
+            os.utime(cache_file)
+        except OSError:
+            pass
+        return image
+
+    def _render_to_file(self, app_name, exe_path, cache_file):
+        """Rend l'icône et l'enregistre sur disque pour les prochains lancements"""
+        image = self.render_icon_image(app_name, exe_path)
+        self.renders += 1
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Écriture atomique : un lecteur ne voit jamais de PNG à moitié écrit
+            temp_file = f"{cache_file}.{threading.get_ident()}.tmp"
+            if image.save(temp_file, "PNG"):
+                os.replace(temp_file, cache_file)
+                self._unpruned_writes += 1
+        except OSError as e:
+            print(f"⚠️  Icône non enregistrée ({app_name}): {e}")
+        return image
+
+    def _ensure_render_thread(self):
+        """Démarre le thread de rendu au premier besoin"""
+        if self._render_thread is None or not self._render_thread.is_alive():
+            self._render_thread = threading.Thread(target=self._render_loop, daemon=True,
+                                                   name="chronix-icon-render")
+            self._render_thread.start()
+
+    def _render_loop(self):
+        """Thread de rendu : lit ou rend les icônes demandées, puis purge le cache disque
+        une fois la file vidée si de nouveaux fichiers y ont été écrits"""
+        while True:
+            app_name, exe_path = self._render_queue.get()
+            try:
+                image = self._load_icon_image(app_name, exe_path)
+            except Exception as e:
+                print(f"❌ Erreur lors du rendu de l'icône de {app_name}: {e}")
+                image = QImage()
+            # Connexion en file d'attente : traité dans le thread de l'interface
+            self._image_rendered.emit(app_name, image)
+            if self._render_queue.empty():
+                self._prune_after_writes()
+
+    def _on_image_rendered(self, app_name, image):
+        self._pending.discard(app_name)
+        if not image.isNull():
+            self._remember(app_name, QIcon(QPixmap.fromImage(image)))
+            self.icon_ready.emit(app_name)
+
+    def _prune_after_writes(self):
+        """Purge le cache disque si des fichiers y ont été ajoutés depuis la dernière purge"""
+        if self._unpruned_writes:
+            self._unpruned_writes = 0
+            self._prune_disk_cache()
+
+    def _prune_disk_cache(self):
+        """Supprime les PNG les moins récemment utilisés au-delà de max_disk_icons"""
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".png")]
+        except OSError:
+            return
+        if len(entries) <= self.max_disk_icons:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_disk_icons]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
 
 # Instance globale
 icon_manager = IconManager()
@@ -0,0 +1,24 @@
+# tracker/maintenance.py
+# Commandes de maintenance de la base : python -m tracker.maintenance <commande>
+import argparse
+
+from tracker import db_manager
+
+def main(argv=None):
+    """Point d'entrée des commandes de maintenance"""
+    parser = argparse.ArgumentParser(description="Maintenance de la base Chronix")
+    parser.add_argument("command", choices=["migrate", "rebuild-rollup", "vacuum"],
+                        help="migrate : applique les migrations ; rebuild-rollup : recalcule daily_usage ; "
+                             "vacuum : compacte la base")
+    parser.add_argument("--db", default=db_manager.DB_PATH, help="chemin de la base (défaut : %(default)s)")
+    args = parser.parse_args(argv)
+    
+    db_manager.set_db_path(args.db)
+    db_manager.init_db()
+    if args.command == "rebuild-rollup":
+        db_manager.rebuild_daily_usage()
+    elif args.command == "vacuum":
+        db_manager.vacuum()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# tracker/periods.py
+# Calcul des périodes calendaires (semaines du lundi au dimanche, mois, trimestres, années)
+from datetime import datetime, timedelta
+
+GROUP_BY = ("app", "day", "week", "month")
+
+def week_start(day):
+    """Lundi de la semaine contenant `day`"""
+    return day - timedelta(days=day.weekday())
+
+def month_start(day):
+    """Premier jour du mois contenant `day`"""
+    return day.replace(day=1)
+
+def add_months(day, months):
+    """Premier jour du mois situé `months` mois après celui de `day` (négatif : avant)"""
+    index = day.year * 12 + day.month - 1 + months
+    return day.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+def quarter_start(day):
+    """Premier jour du trimestre contenant `day`"""
+    return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+
+def bucket_start(day, group_by):
+    """Début du jour, de la semaine ou du mois contenant `day`"""
+    if group_by == "week":
+        return week_start(day)
+    if group_by == "month":
+        return month_start(day)
+    return day
+
+def next_bucket(day, group_by):
+    """Début de la tranche suivant celle qui commence à `day`"""
+    if group_by == "week":
+        return day + timedelta(days=7)
+    if group_by == "month":
+        return add_months(day, 1)
+    return day + timedelta(days=1)
+
+def bucket_starts(start_date, end_date, group_by):
+    """Débuts des tranches (jours, semaines ou mois calendaires) couvrant [start_date, end_date]"""
+    starts = []
+    day = bucket_start(start_date, group_by)
+    while day <= end_date:
+        starts.append(day)
+        day = next_bucket(day, group_by)
+    return starts
+
+# Périodes proposées dans l'onglet Statistiques : (début, fin) incluses, la fin ne dépassant pas aujourd'hui
+PERIODS = {
+    "Aujourd'hui": lambda today: (today, today),
+    "Hier": lambda today: (today - timedelta(days=1), today - timedelta(days=1)),
+    "Cette semaine": lambda today: (week_start(today), today),
+    "Semaine dernière": lambda today: (week_start(today) - timedelta(days=7), week_start(today) - timedelta(days=1)),
+    "7 derniers jours": lambda today: (today - timedelta(days=6), today),
+    "Ce mois": lambda today: (month_start(today), today),
+    "Mois dernier": lambda today: (add_months(today, -1), month_start(today) - timedelta(days=1)),
+    "30 derniers jours": lambda today: (today - timedelta(days=29), today),
+    "Ce trimestre": lambda today: (quarter_start(today), today),
+    "Trimestre dernier": lambda today: (add_months(quarter_start(today), -3), quarter_start(today) - timedelta(days=1)),
+    "Cette année": lambda today: (today.replace(month=1, day=1), today),
+    "Année dernière": lambda today: (today.replace(year=today.year - 1, month=1, day=1),
+                                     today.replace(month=1, day=1) - timedelta(days=1)),
+}
+
+def period_range(period, today=None):
+    """Dates (début, fin) incluses d'une période nommée (aujourd'hui si inconnue)"""
+    today = today or datetime.now().date()
+    return PERIODS.get(period, PERIODS["Aujourd'hui"])(today)
@@ -0,0 +1,112 @@
+# tracker/process_cache.py
+# Cache des métadonnées de processus (exe, chemin, nom convivial) pour le tracking
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+try:
+    import psutil
+except ImportError:
+    # Source simulée : les métadonnées arrivent avec les événements, sans processus à lire
+    psutil = None
+
+ProcessInfo = namedtuple("ProcessInfo", ["pid", "create_time", "exe_name", "path", "name"])
+
+class ProcessCache:
+    """Cache LRU borné des processus déjà vus, indexé par (pid, heure de création) :
+    un pid réutilisé par un autre processus ne retrouve jamais l'ancienne entrée.
+    Un succès ne coûte qu'un appel système (l'heure de création)."""
+
+    def __init__(self, resolve_name, max_size=256, prune_interval=300.0):
+        self.resolve_name = resolve_name    # (exe_name, path) -> nom convivial
+        self.max_size = max_size
+        self.prune_interval = prune_interval
+        self._entries = OrderedDict()       # (pid, create_time) -> ProcessInfo
+        self._keys_by_pid = {}              # pid -> (pid, create_time)
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0                  # entrées sorties par la limite de taille
+        self.exited = 0                     # entrées retirées car le processus s'est terminé
+
+    def get(self, pid):
+        """Retourne le ProcessInfo du processus, ou None s'il est terminé ou inaccessible
+        (toujours None sans psutil)"""
+        if psutil is None:
+            return None
+        try:
+            # psutil lit l'heure de création dès la construction
+            proc = psutil.Process(pid)
+            key = (pid, proc.create_time())
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            with self._lock:
+                if self._remove_pid(pid):
+                    self.exited += 1
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        try:
+            exe_name = proc.name()
+            path = proc.exe()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+        entry = ProcessInfo(pid, key[1], exe_name, path, self.resolve_name(exe_name, path))
+
+        with self._lock:
+            # Un autre processus portait ce pid auparavant : son entrée est périmée
+            self._remove_pid(pid)
+            self._entries[key] = entry
+            self._keys_by_pid[pid] = key
+            while len(self._entries) > self.max_size:
+                old_key, _ = self._entries.popitem(last=False)
+                del self._keys_by_pid[old_key[0]]
+                self.evictions += 1
+
+        if time.monotonic() - self._last_prune >= self.prune_interval:
+            self.prune()
+        return entry
+
+    def prune(self):
+        """Retire les entrées des processus terminés"""
+        if psutil is None:
+            return
+        alive = set(psutil.pids())
+        with self._lock:
+            self._last_prune = time.monotonic()
+            for pid in [pid for pid in self._keys_by_pid if pid not in alive]:
+                self._remove_pid(pid)
+                self.exited += 1
+
+    def clear(self):
+        """Vide le cache (ex. après un changement des règles de nommage)"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_pid.clear()
+
+    def _remove_pid(self, pid):
+        key = self._keys_by_pid.pop(pid, None)
+        if key is None:
+            return False
+        del self._entries[key]
+        return True
+
+    def get_stats(self):
+        """Retourne la taille et les compteurs du cache"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "exited": self.exited,
+        }
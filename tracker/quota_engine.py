@@ -0,0 +1,233 @@
+# tracker/quota_engine.py
+# Suivi des quotas en mémoire : aucune requête SQL sur le chemin critique du tracking
+import math
+import threading
+from datetime import datetime, timedelta
+
+from . import db_manager
+from .app_names import app_name_resolver
+
+# Délai réel minimal (s) avant de replanifier une minuterie : une horloge qui n'avance pas
+# (temps simulé figé) ne fait jamais tourner le moteur en boucle
+MIN_RESCHEDULE_DELAY = 1.0
+
+class QuotaEngine:
+    """Utilisation du jour par application (sessions terminées + session en cours),
+    avec une alerte planifiée à l'instant exact où le quota sera épuisé"""
+
+    def __init__(self, on_exceeded=None, now=datetime.now, speed=lambda: 1.0):
+        self.on_exceeded = on_exceeded  # appelé avec (app_name, used_seconds, limit_seconds)
+        self.now = now                  # horloge du tracker (temps simulé pour une source simulée)
+        self.speed = speed              # secondes de cette horloge par seconde réelle
+        self.limits = {}                # nom canonique (alias appliqués) -> limite quotidienne en secondes
+        self.usage = {}                 # app_name -> secondes des sessions terminées aujourd'hui
+                                        # (toutes les applications : un quota ajouté en cours de
+                                        # journée part du temps déjà passé)
+        self.alerted = set()            # applications déjà signalées aujourd'hui
+        self.day = None
+        self.running_app = None
+        self.running_start = None
+        self._lock = threading.RLock()
+        self._alert_timer = None
+        self._midnight_timer = None
+
+    def load(self, today=None):
+        """Charge les quotas et l'utilisation du jour depuis la base (démarrage du tracking,
+        aucune session n'est alors en attente d'écriture)"""
+        today = today or self.now().date()
+        limits = self._read_limits()
+        usage = self._canonical_usage(db_manager.get_daily_stats(today))
+
+        with self._lock:
+            if today != self.day:
+                self.alerted.clear()
+            self.day = today
+            self.limits = limits
+            self.usage = usage
+            self._schedule_midnight()
+            self._schedule_alert()
+
+    def reload(self):
+        """Relit les limites après l'ajout, la modification ou la suppression d'un quota.
+        L'utilisation reste celle tenue en mémoire : le temps pas encore écrit en base
+        (file d'écriture, regroupement, session en cours) n'est pas perdu. Appelée aussi
+        quand les alias du fichier de règles changent"""
+        limits = self._read_limits()
+        with self._lock:
+            self.usage = self._canonical_usage(self.usage.items())
+            # Une limite changée peut de nouveau donner lieu à une alerte aujourd'hui
+            self.alerted = {app_name for app_name in self.alerted
+                            if limits.get(app_name) == self.limits.get(app_name)}
+            self.limits = limits
+            self._schedule_alert()
+
+    @staticmethod
+    def _read_limits():
+        """Limites quotidiennes en secondes des quotas actifs, sous le nom canonique des
+        applications : un quota posé sur un nom devenu alias s'applique au nom qui le remplace
+        (la plus petite limite si plusieurs quotas visent le même nom)"""
+        limits = {}
+        for app_name, minutes in db_manager.get_quotas():
+            app_name = app_name_resolver.canonical(app_name)
+            limits[app_name] = min(limits.get(app_name, minutes * 60), minutes * 60)
+        return limits
+
+    @staticmethod
+    def _canonical_usage(stats):
+        """Regroupe des (app_name, seconds) sous le nom canonique des applications"""
+        usage = {}
+        for app_name, seconds in stats:
+            app_name = app_name_resolver.canonical(app_name)
+            usage[app_name] = usage.get(app_name, 0) + seconds
+        return usage
+
+    def stop(self):
+        """Annule les minuteries en attente"""
+        with self._lock:
+            self._cancel(self._alert_timer)
+            self._cancel(self._midnight_timer)
+            self._alert_timer = self._midnight_timer = None
+
+    def start_session(self, app_name, start_time):
+        """Signale le début d'une session au premier plan"""
+        with self._lock:
+            # Horloge sans minuterie (temps simulé instantané) : minuit passe avec les sessions
+            if self.day is not None and start_time.date() > self.day:
+                self._reset_day(start_time.date())
+            self.running_app = app_name
+            self.running_start = start_time
+            self._schedule_alert()
+
+    def end_session(self, app_name, start_time, end_time, duration):
+        """Ajoute la session terminée à l'utilisation du jour"""
+        with self._lock:
+            self.running_app = None
+            self.running_start = None
+
+            if end_time.date() != self.day:
+                self._reset_day(end_time.date())
+
+            if duration > 0:
+                # Seule la part postérieure à minuit compte pour aujourd'hui
+                midnight = datetime.combine(self.day, datetime.min.time())
+                today_part = duration if start_time >= midnight else int((end_time - midnight).total_seconds())
+                self.usage[app_name] = self.usage.get(app_name, 0) + max(0, min(duration, today_part))
+
+            # Quota épuisé pendant la session sans que la minuterie l'ait signalé
+            # (temps simulé instantané, ou minuterie pas encore déclenchée)
+            exceeded = self._mark_exceeded(app_name)
+            self._schedule_alert()
+
+        if exceeded:
+            self._notify(*exceeded)
+
+    def live_usage(self, app_name, now=None):
+        """Utilisation du jour, session en cours comprise"""
+        now = now or self.now()
+        with self._lock:
+            used = self.usage.get(app_name, 0)
+            if app_name == self.running_app and self.running_start:
+                midnight = datetime.combine(self.day or now.date(), datetime.min.time())
+                used += max(0, int((now - max(self.running_start, midnight)).total_seconds()))
+            return used
+
+    def get_usage(self, now=None):
+        """Retourne (app_name, used_seconds, limit_seconds, percentage) pour chaque quota"""
+        with self._lock:
+            results = []
+            for app_name, limit in sorted(self.limits.items()):
+                used = self.live_usage(app_name, now)
+                results.append((app_name, used, limit, (used / limit) * 100 if limit > 0 else 0))
+            return results
+
+    def is_exceeded(self, app_name, now=None):
+        """Vérifie si le quota d'une application est atteint"""
+        with self._lock:
+            limit = self.limits.get(app_name)
+            return limit is not None and self.live_usage(app_name, now) >= limit
+
+    def _mark_exceeded(self, app_name):
+        """Marque le quota épuisé s'il vient de l'être ; retourne (app_name, used, limit) à signaler"""
+        if app_name not in self.limits or app_name in self.alerted or not self.is_exceeded(app_name):
+            return None
+        self.alerted.add(app_name)
+        return app_name, self.live_usage(app_name), self.limits[app_name]
+
+    def _notify(self, app_name, used, limit):
+        """Signale un quota épuisé (hors du verrou)"""
+        if self.on_exceeded:
+            self.on_exceeded(app_name, used, limit)
+
+    def _schedule_alert(self, minimum_delay=0.0):
+        """Planifie l'alerte de la session en cours à l'instant prévu d'épuisement"""
+        self._cancel(self._alert_timer)
+        self._alert_timer = None
+
+        app_name = self.running_app
+        if app_name not in self.limits or app_name in self.alerted or not self._has_timers():
+            return
+
+        remaining = self.limits[app_name] - self.live_usage(app_name)
+        self._alert_timer = threading.Timer(max(self._real_seconds(remaining), minimum_delay),
+                                            self._on_alert_timer)
+        self._alert_timer.daemon = True
+        self._alert_timer.start()
+
+    def _on_alert_timer(self):
+        """Déclenchée à l'épuisement prévu du quota de l'application active"""
+        with self._lock:
+            app_name = self.running_app
+            if app_name is None:
+                return
+            exceeded = self._mark_exceeded(app_name)
+            if exceeded is None:
+                # Dérive de la minuterie : replanifier sur le temps restant
+                self._schedule_alert(MIN_RESCHEDULE_DELAY)
+                return
+
+        self._notify(*exceeded)
+
+    def _schedule_midnight(self, minimum_delay=0.0):
+        """Planifie la remise à zéro à minuit (heure locale)"""
+        self._cancel(self._midnight_timer)
+        self._midnight_timer = None
+        if not self._has_timers():
+            # Temps simulé instantané : la journée change avec les sessions (start_session, end_session)
+            return
+        now = self.now()
+        next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        delay = max(self._real_seconds((next_midnight - now).total_seconds()), minimum_delay)
+        self._midnight_timer = threading.Timer(delay, self._on_midnight)
+        self._midnight_timer.daemon = True
+        self._midnight_timer.start()
+
+    def _on_midnight(self):
+        """Nouvelle journée : utilisation et alertes remises à zéro"""
+        with self._lock:
+            today = self.now().date()
+            if today == self.day:
+                # Réveil légèrement en avance : replanifier
+                self._schedule_midnight(MIN_RESCHEDULE_DELAY)
+                return
+            self._reset_day(today)
+            self._schedule_midnight()
+            self._schedule_alert()
+
+    def _reset_day(self, day):
+        """Repart d'une utilisation nulle pour le jour donné"""
+        self.day = day
+        self.usage.clear()
+        self.alerted.clear()
+
+    def _has_timers(self):
+        """Faux quand l'horloge du tracker avance sans que le temps réel passe (speed infinie)"""
+        return not math.isinf(self.speed())
+
+    def _real_seconds(self, seconds):
+        """Délai réel d'une minuterie pour `seconds` secondes de l'horloge du tracker"""
+        return max(0.0, seconds) / self.speed()
+
+    @staticmethod
+    def _cancel(timer):
+        if timer:
+            timer.cancel()
@@ -0,0 +1,154 @@
+# tracker/session_coalescer.py
+# Regroupement des sessions avant écriture : les allers-retours rapides (Alt+Tab,
+# notifications, flashs de l'explorateur) ne produisent plus une ligne chacun
+import threading
+
+class _Segment:
+    """Portion de temps au premier plan, éventuellement étendue par les fusions"""
+    __slots__ = ("app_name", "app_path", "start", "end")
+
+    def __init__(self, app_name, app_path, start, end):
+        self.app_name = app_name
+        self.app_path = app_path
+        self.start = start
+        self.end = end
+
+    @property
+    def seconds(self):
+        return (self.end - self.start).total_seconds()
+
+class SessionCoalescer:
+    """Reçoit les sessions terminées dans l'ordre et transmet à `submit` des sessions regroupées :
+    - un passage plus court que `min_dwell` est attribué à la session qui l'entoure ;
+    - un aller-retour A -> B -> A dont B dure moins de `bounce_gap` ne forme qu'une session A.
+    Seules des sessions contiguës sont regroupées (une absence de fenêtre coupe toujours).
+    min_dwell=0 et bounce_gap=0 désactivent le regroupement"""
+
+    def __init__(self, submit, min_dwell=3.0, bounce_gap=10.0):
+        self.submit = submit            # (app_name, app_path, start_iso, end_iso, duration_sec)
+        self.min_dwell = min_dwell
+        self.bounce_gap = max(bounce_gap, min_dwell)
+        self._pending = None            # dernière session, encore extensible
+        self._held = None               # passage court qui suit _pending (aller-retour possible)
+        self._lock = threading.Lock()
+
+        # Compteurs
+        self.received = 0
+        self.written = 0
+        self.skipped = 0                # sessions de durée nulle, jamais écrites
+        self.blips_absorbed = 0
+        self.bounces_merged = 0
+        self.reattributed_seconds = 0.0
+
+    def add(self, app_name, app_path, start_time, end_time):
+        """Ajoute une session terminée (horodatages datetime)"""
+        segment = _Segment(app_name, app_path, start_time, end_time)
+        with self._lock:
+            self.received += 1
+            self._add(segment)
+
+    def release(self, current_app=None):
+        """La fenêtre `current_app` est au premier plan depuis plus de bounce_gap : les sessions
+        en attente sont transmises jusqu'à leur fin actuelle. Si `current_app` est l'application
+        en attente (retour après un aller-retour), le passage intermédiaire lui est attribué ;
+        la session en cours sera écrite comme une ligne à part, contiguë"""
+        with self._lock:
+            if self._pending is None:
+                return
+            if self._held is not None and current_app == self._pending.app_name:
+                # Aller-retour A -> B -> A dont le retour vers A est encore ouvert
+                self.bounces_merged += 1
+                self.reattributed_seconds += self._held.seconds
+                self._pending.end = max(self._pending.end, self._held.end)
+                self._held = None
+            self._emit_all()
+
+    def flush(self):
+        """Transmet toutes les sessions en attente (arrêt du tracking)"""
+        with self._lock:
+            self._emit_all()
+
+    def pending_segments(self):
+        """Sessions en attente de regroupement (app_name, app_path, start, end), pas encore transmises"""
+        with self._lock:
+            return [(segment.app_name, segment.app_path, segment.start, segment.end)
+                    for segment in (self._pending, self._held) if segment is not None]
+
+    @property
+    def rows_saved(self):
+        """Lignes évitées : sessions reçues moins sessions transmises (hors attente)"""
+        waiting = (self._pending is not None) + (self._held is not None)
+        return self.received - self.written - self.skipped - waiting
+
+    def get_stats(self):
+        """Retourne les compteurs du regroupement"""
+        return {
+            "received": self.received,
+            "written": self.written,
+            "skipped": self.skipped,
+            "rows_saved": self.rows_saved,
+            "blips_absorbed": self.blips_absorbed,
+            "bounces_merged": self.bounces_merged,
+            "reattributed_seconds": round(self.reattributed_seconds, 1),
+        }
+
+    def _add(self, segment):
+        last = self._held or self._pending
+        if last is None:
+            self._pending = segment
+            return
+
+        if segment.start > last.end:
+            # Trou dans le suivi (écran verrouillé...) : rien ne se regroupe par-dessus
+            self._emit_all()
+            self._pending = segment
+            return
+
+        if segment.seconds < self.min_dwell:
+            # Passage trop bref : attribué à la session qui précède
+            if segment.app_name != last.app_name:
+                self.blips_absorbed += 1
+                self.reattributed_seconds += segment.seconds
+            if int(segment.seconds) <= 0:
+                # N'aurait jamais été écrit : ce n'est pas une ligne évitée
+                self.skipped += 1
+            last.end = max(last.end, segment.end)
+            return
+
+        if segment.app_name == self._pending.app_name:
+            if self._held is not None:
+                # Aller-retour A -> B -> A : B est attribué à A
+                self.bounces_merged += 1
+                self.reattributed_seconds += self._held.seconds
+                self._held = None
+            self._pending.end = max(self._pending.end, segment.end)
+            return
+
+        if self._held is None and segment.seconds < self.bounce_gap:
+            # Peut-être un aller-retour : décision à la session suivante
+            self._held = segment
+            return
+
+        # Vraie nouvelle session : les précédentes sont définitives
+        self._emit(self._pending)
+        self._pending = self._held
+        self._held = None
+        if self._pending is None:
+            self._pending = segment
+        else:
+            self._add(segment)
+
+    def _emit_all(self):
+        for segment in (self._pending, self._held):
+            if segment is not None:
+                self._emit(segment)
+        self._pending = self._held = None
+
+    def _emit(self, segment):
+        duration = int(segment.seconds)
+        if duration <= 0:  # Ignorer les sessions trop courtes
+            self.skipped += 1
+            return
+        self.written += 1
+        self.submit(segment.app_name, segment.app_path, segment.start.isoformat(),
+                    segment.end.isoformat(), duration)
@@ -0,0 +1,131 @@
+# tracker/session_journal.py
+# Journal de la session ouverte : un petit fichier réécrit en place à chaque battement,
+# relu au démarrage suivant si le processus a été tué, la machine éteinte, etc.
+import json
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime
+
+class SessionJournal:
+    """Deux emplacements de taille fixe écrits en alternance : un enregistrement interrompu
+    en cours d'écriture laisse toujours l'autre intact. Chaque enregistrement porte un numéro
+    de séquence et une somme de contrôle ; le plus récent valide fait foi.
+
+    Un enregistrement contient les sessions pas encore écrites en base :
+    [(app_name, app_path, start, end)], end valant None pour la session ouverte
+    (elle se termine alors à l'heure du battement)."""
+
+    MAGIC = b"CHRX"
+    HEADER = struct.Struct("<4sQII")    # magic, séquence, longueur, crc32
+    SLOT_SIZE = 4096
+
+    def __init__(self, path, interval=30.0, durable=True):
+        self.path = path
+        self.interval = interval        # secondes entre deux battements
+        self.durable = durable          # fsync à chaque battement (coupure de courant)
+        self._fd = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.heartbeats = 0
+
+    def read(self):
+        """Retourne (heartbeat, segments) du dernier enregistrement valide, ou None"""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read(2 * self.SLOT_SIZE)
+        except OSError:
+            return None
+
+        best = None
+        for offset in (0, self.SLOT_SIZE):
+            record = self._parse(data[offset:offset + self.SLOT_SIZE])
+            if record and (best is None or record[0] > best[0]):
+                best = record
+        if best is None:
+            return None
+
+        self._sequence = max(self._sequence, best[0])
+        payload = best[1]
+        if not payload["segments"]:
+            return None
+        heartbeat = datetime.fromisoformat(payload["heartbeat"])
+        segments = [(app_name, app_path, datetime.fromisoformat(start),
+                     datetime.fromisoformat(end) if end else heartbeat)
+                    for app_name, app_path, start, end in payload["segments"]]
+        return heartbeat, segments
+
+    def write(self, segments, heartbeat):
+        """Enregistre les sessions non écrites (un battement)"""
+        payload = json.dumps({
+            "heartbeat": heartbeat.isoformat(),
+            "segments": [(app_name, app_path, start.isoformat(), end.isoformat() if end else None)
+                         for app_name, app_path, start, end in segments],
+        }, ensure_ascii=False).encode("utf-8")
+        if self.HEADER.size + len(payload) > self.SLOT_SIZE:
+            # Ne garder que les sessions les plus récentes (la session ouverte en dernier)
+            return self.write(segments[1:], heartbeat) if len(segments) > 1 else False
+
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o600)
+            self._sequence += 1
+            record = self.HEADER.pack(self.MAGIC, self._sequence, len(payload), zlib.crc32(payload)) + payload
+            # Réécriture en place d'un emplacement : aucune allocation de fichier, aucun renommage
+            os.lseek(self._fd, (self._sequence % 2) * self.SLOT_SIZE, os.SEEK_SET)
+            os.write(self._fd, record)
+            if self.durable:
+                os.fsync(self._fd)
+            self.heartbeats += 1
+        return True
+
+    def clear(self, now=None):
+        """Aucune session en attente (arrêt propre, ou après récupération)"""
+        self.write([], now or datetime.now())
+
+    def start(self, snapshot):
+        """Démarre les battements : snapshot() retourne (segments, heure du battement)"""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._heartbeat_loop, args=(snapshot,), daemon=True,
+                                        name="chronix-session-journal")
+        self._thread.start()
+
+    def stop(self):
+        """Arrête les battements (le dernier enregistrement reste sur disque)"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def close(self):
+        """Arrête les battements et ferme le fichier"""
+        self.stop()
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def _heartbeat_loop(self, snapshot):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.write(*snapshot())
+            except Exception as e:
+                print(f"❌ Erreur lors de l'écriture du journal de session: {e}")
+
+    def _parse(self, slot):
+        """Décode un emplacement ; None s'il est vide, tronqué ou corrompu"""
+        if len(slot) < self.HEADER.size:
+            return None
+        magic, sequence, length, checksum = self.HEADER.unpack_from(slot)
+        payload = slot[self.HEADER.size:self.HEADER.size + length]
+        if magic != self.MAGIC or len(payload) != length or zlib.crc32(payload) != checksum:
+            return None
+        try:
+            return sequence, json.loads(payload.decode("utf-8"))
+        except ValueError:
+            return None
@@ -0,0 +1,190 @@
+# tracker/session_writer.py
+# Écriture différée des sessions : le thread de tracking ne touche jamais au disque
+import atexit
+import queue
+import threading
+import time
+
+from . import db_manager
+
+# Attente maximale (s) entre deux tentatives quand l'écriture échoue à répétition
+MAX_RETRY_DELAY = 60.0
+
+class _FlushRequest:
+    """Marqueur déposé dans la file pour forcer un vidage (et éventuellement l'arrêt)"""
+
+    def __init__(self, stop=False):
+        self.stop = stop
+        self.done = threading.Event()
+
+class SessionWriter:
+    """File bornée de sessions, écrites par lots (une transaction par vidage)"""
+
+    def __init__(self, max_batch=50, max_delay=5.0, max_queue=10000, on_flush=None):
+        self.max_batch = max_batch      # vidage dès que le lot atteint cette taille
+        self.max_delay = max_delay      # âge maximal (s) de la plus ancienne session en attente
+        self.on_flush = on_flush        # appelé avec le lot après chaque écriture réussie
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.writer_thread = None
+        self._batch = []                # lot en cours d'accumulation dans le thread d'écriture
+        self._retry_delay = 0.0         # attente avant la prochaine tentative (0 : pas d'échec en cours)
+        self._start_lock = threading.Lock()
+        # Ne rien perdre si l'interpréteur s'arrête sans appel explicite à stop()
+        atexit.register(self.stop, 5.0)
+
+        # Compteurs
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.flush_count = 0
+        self.failed_flushes = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+
+    @property
+    def queue_depth(self):
+        """Nombre de sessions (et marqueurs) en attente d'écriture"""
+        return self.queue.qsize()
+
+    def get_stats(self):
+        """Retourne les compteurs de la file d'écriture"""
+        return {
+            "queue_depth": self.queue_depth,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flush_count": self.flush_count,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_latency": self.last_flush_latency,
+            "max_flush_latency": self.max_flush_latency,
+            "avg_flush_latency": self.total_flush_latency / self.flush_count if self.flush_count else 0.0,
+        }
+
+    def submit(self, app_name, app_path, start_time, end_time, duration_sec):
+        """Dépose une session dans la file sans jamais bloquer l'appelant"""
+        self._ensure_started()
+        try:
+            self.queue.put_nowait((app_name, app_path, start_time, end_time, duration_sec))
+        except queue.Full:
+            self.dropped += 1
+            print(f"⚠️  File d'écriture pleine, session perdue: {app_name}")
+            return False
+
+        self.submitted += 1
+        return True
+
+    def pending_sessions(self):
+        """Sessions soumises mais pas encore écrites, lot en cours compris"""
+        with self.queue.mutex:
+            queued = [item for item in self.queue.queue if not isinstance(item, _FlushRequest)]
+        return list(self._batch) + queued
+
+    def flush(self, timeout=None):
+        """Écrit immédiatement les sessions en attente et attend la fin de l'écriture"""
+        if not self.writer_thread or not self.writer_thread.is_alive():
+            return True
+
+        request = _FlushRequest()
+        self.queue.put(request)
+        return request.done.wait(timeout)
+
+    def stop(self, timeout=None):
+        """Vide la file puis arrête le thread d'écriture ; retourne False si des sessions
+        n'ont pas pu être écrites (elles restent dans pending_sessions)"""
+        if not self.writer_thread or not self.writer_thread.is_alive():
+            return not self._batch
+
+        request = _FlushRequest(stop=True)
+        self.queue.put(request)
+        done = request.done.wait(timeout)
+        self.writer_thread.join(timeout)
+        self.writer_thread = None
+
+        unwritten = len(self.pending_sessions())
+        if not done or unwritten:
+            print(f"❌ Arrêt de l'écriture : {unwritten} sessions non écrites")
+            return False
+        return True
+
+    def _ensure_started(self):
+        """Démarre le thread d'écriture au premier usage"""
+        if self.writer_thread and self.writer_thread.is_alive():
+            return
+
+        with self._start_lock:
+            if not self.writer_thread or not self.writer_thread.is_alive():
+                self.writer_thread = threading.Thread(target=self._writer_loop, daemon=True,
+                                                      name="chronix-session-writer")
+                self.writer_thread.start()
+
+    def _writer_loop(self):
+        """Boucle du thread d'écriture : regroupe les sessions par taille ou par âge"""
+        # Lot laissé par un thread précédent dont la dernière écriture a échoué
+        batch = list(self._batch)
+        deadline = time.monotonic() if batch else None
+
+        while True:
+            # Sans session en attente, on dort jusqu'à la prochaine soumission
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is None:
+                # Âge maximal atteint
+                batch, deadline = self._write_batch(batch)
+            elif isinstance(item, _FlushRequest):
+                batch, deadline = self._write_batch(batch)
+                self._batch = batch
+                item.done.set()
+                if item.stop:
+                    # Un prochain thread d'écriture ouvrira sa propre connexion
+                    db_manager.close_thread_connection()
+                    return
+            elif len(batch) >= self.queue.maxsize > 0:
+                # Écriture en échec depuis longtemps : le lot conservé ne grossit plus
+                self.dropped += 1
+                print(f"⚠️  Lot en attente plein, session perdue: {item[0]}")
+            else:
+                batch.append(item)
+                if len(batch) == 1:
+                    deadline = time.monotonic() + self.max_delay
+                # Après un échec, la prochaine tentative attend la fin du délai
+                if len(batch) >= self.max_batch and not self._retry_delay:
+                    batch, deadline = self._write_batch(batch)
+            self._batch = batch
+
+    def _write_batch(self, batch):
+        """Écrit un lot ; en cas d'échec le lot est conservé pour une nouvelle tentative,
+        après un délai qui double à chaque échec (jusqu'à MAX_RETRY_DELAY)"""
+        if not batch:
+            return [], None
+
+        start = time.perf_counter()
+        try:
+            db_manager.insert_sessions(batch)
+        except Exception as e:
+            self.failed_flushes += 1
+            self._retry_delay = min(max(self._retry_delay * 2, self.max_delay), MAX_RETRY_DELAY)
+            print(f"❌ Échec de l'écriture de {len(batch)} sessions (nouvel essai dans "
+                  f"{self._retry_delay:g} s): {e}")
+            return batch, time.monotonic() + self._retry_delay
+
+        self._retry_delay = 0.0
+
+        latency = time.perf_counter() - start
+        self.flush_count += 1
+        self.written += len(batch)
+        self.last_flush_latency = latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+        self.total_flush_latency += latency
+
+        if self.on_flush:
+            try:
+                self.on_flush(batch)
+            except Exception as e:
+                print(f"❌ Erreur après écriture des sessions: {e}")
+
+        return [], None
@@ -1,148 +1,85 @@
-import time
+import math
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime
 from . import db_manager
-import psutil
-import win32gui
-import win32process
+from . import foreground
+from .process_cache import ProcessCache
+from .app_names import app_name_resolver
+from .session_writer import SessionWriter
+from .session_coalescer import SessionCoalescer
+from .session_journal import SessionJournal
+from .quota_engine import QuotaEngine
 
 class TimeTracker:
-    def __init__(self):
+    def __init__(self, source=None, min_dwell=3.0, bounce_gap=10.0, heartbeat_interval=30.0):
         self.current_app = None
         self.start_time = None
         self.is_tracking = False
         self.tracking_thread = None
-        self.quota_alerts = {}
+        # Source des changements de fenêtre (ForegroundSource) ; par défaut les
+        # notifications Windows, choisies au démarrage du tracking
+        self.source = source
+        # Métadonnées des processus déjà vus : pas de psutil ni de résolution de nom
+        # quand la même application revient au premier plan
+        self.process_cache = ProcessCache(self.get_friendly_app_name)
+        # Noms à recalculer si le fichier de règles change
+        app_name_resolver.listeners.append(self.process_cache.clear)
+        # Les sessions terminées partent dans une file écrite par un thread dédié
+        self.session_writer = SessionWriter()
+        # Regroupement des allers-retours rapides avant la file d'écriture
+        self.coalescer = SessionCoalescer(self.session_writer.submit, min_dwell, bounce_gap)
+        self._release_timer = None
+        # Journal des sessions pas encore en base, relu au démarrage après un arrêt brutal
+        self.heartbeat_interval = heartbeat_interval
+        self.journal = None
+        self.recovered_sessions = 0
+        # Quotas suivis en mémoire, alertes planifiées à l'instant d'épuisement
+        self.quota_engine = QuotaEngine(on_exceeded=self._on_quota_exceeded, now=self._now,
+                                        speed=self._clock_speed)
+        # Un quota posé sur un nom suit les alias du fichier de règles
+        app_name_resolver.listeners.append(self.quota_engine.reload)
+        # Notification optionnelle (ex. interface) appelée avec (app_name, used, limit)
+        self.on_quota_exceeded = None
         
-    def get_foreground_window_info(self):
-        """Retourne les infos de la fenêtre actuellement au premier plan."""
+    def describe_window(self, info):
+        """Complète les infos brutes d'une fenêtre avec le processus et le nom convivial de l'application."""
         try:
-            hwnd = win32gui.GetForegroundWindow()
-            window_title = win32gui.GetWindowText(hwnd)
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-
-            proc = psutil.Process(pid)
-            exe_path = proc.exe()
-            name = proc.name()
-            
-            # Convertir le nom de l'exe en nom convivial
-            friendly_name = self.get_friendly_app_name(name, exe_path)
+            if "exe_name" in info:
+                # Source simulée : métadonnées fournies avec l'événement
+                exe_name, exe_path = info["exe_name"], info["path"]
+                friendly_name = self.get_friendly_app_name(exe_name, exe_path)
+            else:
+                process = self.process_cache.get(info["pid"])
+                if process is None:
+                    return None
+                exe_name, exe_path, friendly_name = process.exe_name, process.path, process.name
             
             return {
-                "pid": pid,
+                "pid": info["pid"],
                 "name": friendly_name,
-                "exe_name": name,  # Garder le nom original pour la compatibilité
+                "exe_name": exe_name,  # Garder le nom original pour la compatibilité
                 "path": exe_path,
-                "title": window_title
+                "title": info["title"]
             }
-        except (psutil.NoSuchProcess, psutil.AccessDenied, Exception):
+        except Exception:
             return None
 
     def get_friendly_app_name(self, exe_name, exe_path):
         """Convertit le nom de l'exe en nom convivial de l'application"""
-        # Dictionnaire de mapping pour les applications courantes
-        app_names = {
-            # Navigateurs
-            "chrome.exe": "Chrome",
-            "firefox.exe": "Firefox",
-            "msedge.exe": "Edge",
-            "brave.exe": "Brave",
-            "opera.exe": "Opera",
-            
-            # Éditeurs de code
-            "code.exe": "VS Code",
-            "cursor.exe": "Cursor",
-            "notepad++.exe": "Notepad++",
-            "sublime_text.exe": "Sublime Text",
-            "atom.exe": "Atom",
-            "webstorm64.exe": "WebStorm",
-            "pycharm64.exe": "PyCharm",
-            "intellij64.exe": "IntelliJ IDEA",
-            
-            # Applications Microsoft
-            "explorer.exe": "Explorateur Windows",
-            "notepad.exe": "Bloc-notes",
-            "wordpad.exe": "WordPad",
-            "calc.exe": "Calculatrice",
-            "mspaint.exe": "Paint",
-            "winword.exe": "Microsoft Word",
-            "excel.exe": "Microsoft Excel",
-            "powerpnt.exe": "Microsoft PowerPoint",
-            "outlook.exe": "Microsoft Outlook",
-            "teams.exe": "Microsoft Teams",
-            "skype.exe": "Skype",
-            
-            # Applications de communication
-            "discord.exe": "Discord",
-            "slack.exe": "Slack",
-            "telegram.exe": "Telegram",
-            "whatsapp.exe": "WhatsApp",
-            
-            # Applications de développement
-            "python.exe": "Python",
-            "node.exe": "Node.js",
-            "git.exe": "Git",
-            "docker.exe": "Docker",
-            "postman.exe": "Postman",
-            
-            # Applications de design
-            "photoshop.exe": "Adobe Photoshop",
-            "illustrator.exe": "Adobe Illustrator",
-            "figma.exe": "Figma",
-            "sketch.exe": "Sketch",
-            
-            # Applications de jeux
-            "steam.exe": "Steam",
-            "epicgameslauncher.exe": "Epic Games",
-            "origin.exe": "Origin",
-            "battle.net.exe": "Battle.net",
-            
-            # Applications système
-            "svchost.exe": "Service Windows",
-            "winlogon.exe": "Windows Logon",
-            "csrss.exe": "Client Server Runtime",
-            "wininit.exe": "Windows Initialization",
-            "services.exe": "Services Windows",
-            "lsass.exe": "Local Security Authority",
-            "spoolsv.exe": "Spooler Service",
-            "taskmgr.exe": "Gestionnaire des tâches",
-            "control.exe": "Panneau de configuration",
-            "regedit.exe": "Éditeur de registre",
-            "cmd.exe": "Invite de commandes",
-            "powershell.exe": "PowerShell",
-            "conhost.exe": "Console Host",
-        }
-        
-        # Vérifier d'abord dans le dictionnaire
-        if exe_name.lower() in app_names:
-            return app_names[exe_name.lower()]
-        
-        # Si pas trouvé, essayer d'extraire le nom depuis le chemin
-        if exe_path:
-            try:
-                # Extraire le nom du dossier parent (souvent le nom de l'app)
-                import os
-                parent_dir = os.path.basename(os.path.dirname(exe_path))
-                
-                # Nettoyer le nom
-                clean_name = parent_dir.replace(" (x86)", "").replace(" (x64)", "")
-                
-                # Si le nom parent semble être un nom d'application (pas un chemin système)
-                if not any(system_path in exe_path.lower() for system_path in [
-                    "windows", "program files", "system32", "syswow64", "appdata"
-                ]):
-                    return clean_name
-                    
-            except:
-                pass
-        
-        # En dernier recours, retourner le nom sans l'extension
-        return exe_name.replace('.exe', '').title()
+        return app_name_resolver.resolve(exe_name, exe_path)
 
     def start_tracking(self):
         """Démarre le tracking en arrière-plan"""
         if not self.is_tracking:
+            if self.source is None:
+                self.source = foreground.default_source()
             self.is_tracking = True
+            self.source.reset()
+            journal_path = db_manager.DB_PATH + ".session"
+            if self.journal is None or self.journal.path != journal_path:
+                if self.journal:
+                    self.journal.close()
+                self.journal = SessionJournal(journal_path, self.heartbeat_interval)
             self.tracking_thread = threading.Thread(target=self._tracking_loop, daemon=True)
             self.tracking_thread.start()
             print("🔵 Tracking démarré")
@@ -150,66 +87,171 @@ class TimeTracker:
     def stop_tracking(self):
         """Arrête le tracking"""
         self.is_tracking = False
+        if self.source:
+            self.source.stop()
+        # Attendre que la source ait rendu la main avant de clore la session
+        if self.tracking_thread and self.tracking_thread is not threading.current_thread():
+            self.tracking_thread.join(timeout=5.0)
         if self.current_app:
             self._stop_current_session()
+        self._cancel_release()
+        if self.journal:
+            self.journal.stop()
+        self.coalescer.flush()
+        self.session_writer.flush()
+        if self.journal and not self.session_writer.pending_sessions():
+            # Tout est en base : plus rien à récupérer au prochain démarrage
+            self.journal.clear(self._now())
         print("🔴 Tracking arrêté")
 
+    def shutdown(self):
+        """Arrête le tracking et termine proprement l'écriture des sessions"""
+        if self.is_tracking or self.current_app:
+            self.stop_tracking()
+        self.session_writer.stop()
+        self.quota_engine.stop()
+        if self.journal:
+            self.journal.close()
+
     def _tracking_loop(self):
-        """Boucle principale de tracking"""
-        while self.is_tracking:
-            app_info = self.get_foreground_window_info()
-            
-            if app_info and app_info.get("name"):
-                if not self.current_app or app_info["pid"] != self.current_app["pid"]:
-                    self._stop_current_session()
-                    self._start_new_session(app_info)
-            
-            time.sleep(2)  # Vérification toutes les 2 secondes
+        """Thread de tracking : la source y bloque et y signale chaque changement de fenêtre"""
+        # Sessions d'une exécution interrompue, avant le chargement des quotas qui les compte
+        self.recover_sessions()
+        self.journal.start(self._journal_snapshot)
+        # Charger l'utilisation du jour une seule fois, hors du thread de l'interface
+        self.quota_engine.load()
+        
+        try:
+            self.source.run(self._on_foreground_change)
+        except Exception as e:
+            print(f"❌ Erreur de la source de fenêtres: {e}")
+
+    def _on_foreground_change(self, info, timestamp):
+        """Nouvelle fenêtre au premier plan (None : plus aucune), à l'instant exact du changement"""
+        if not self.is_tracking:
+            return
+        if info is None:
+            self._stop_current_session(timestamp)
+            return
+        
+        app_info = self.describe_window(info)
+        if app_info and app_info.get("name"):
+            if not self.current_app or app_info["pid"] != self.current_app["pid"]:
+                self._stop_current_session(timestamp)
+                self._start_new_session(app_info, timestamp)
 
-    def _start_new_session(self, app_info):
+    def _start_new_session(self, app_info, start_time=None):
         """Démarre une nouvelle session pour l'application"""
         self.current_app = app_info
-        self.start_time = datetime.now()
+        self.start_time = start_time or datetime.now()
+        self.quota_engine.start_session(self.current_app['name'], self.start_time)
+        self._schedule_release()
         print(f"🟢 Session démarrée: {self.current_app['name']}")
 
-    def _stop_current_session(self):
+    def _stop_current_session(self, end_time=None):
         """Termine la session en cours et l'enregistre"""
         if self.current_app and self.start_time:
-            end_time = datetime.now()
+            end_time = end_time or self._now()
             duration = int((end_time - self.start_time).total_seconds())
 
-            if duration > 0:  # Ignorer les sessions trop courtes
-                db_manager.insert_session(
-                    self.current_app['name'],  # Utilise maintenant le nom convivial
-                    self.current_app.get('path', ''),
-                    self.start_time.isoformat(),
-                    end_time.isoformat(),
-                    duration
-                )
-                
-                # Vérifier les quotas
-                self._check_quota_alert(self.current_app['name'], duration)
+            # Regroupement puis écriture différée : ne bloque pas la boucle de tracking
+            self.coalescer.add(
+                self.current_app['name'],  # Utilise maintenant le nom convivial
+                self.current_app.get('path', ''),
+                self.start_time,
+                end_time
+            )
 
+            # Les quotas comptent le temps réel de chaque application, sans regroupement
+            self.quota_engine.end_session(self.current_app['name'], self.start_time, end_time, duration)
             print(f"🔴 Session terminée: {self.current_app['name']} - {duration}s")
 
         self.current_app = None
         self.start_time = None
 
-    def _check_quota_alert(self, app_name, duration):
-        """Vérifie si un quota est dépassé et génère une alerte"""
-        if db_manager.check_quota_exceeded(app_name):
-            if app_name not in self.quota_alerts:
-                self.quota_alerts[app_name] = True
-                print(f"⚠️  ALERTE: Quota dépassé pour {app_name}!")
-                # Ici on pourrait ajouter une notification système
-        else:
-            # Réinitialiser l'alerte si le quota n'est plus dépassé
-            self.quota_alerts.pop(app_name, None)
+    def _schedule_release(self):
+        """Une fois la fenêtre restée plus de bounce_gap au premier plan, les sessions en
+        attente de regroupement partent à l'écriture sans attendre la fin de celle-ci"""
+        self._cancel_release()
+        # bounce_gap est en secondes de l'horloge du tracker ; en temps simulé instantané,
+        # pas de minuterie : l'événement suivant arrive de toute façon aussitôt
+        speed = self._clock_speed()
+        if self.coalescer.bounce_gap > 0 and not math.isinf(speed):
+            self._release_timer = threading.Timer(self.coalescer.bounce_gap / speed, self._release_pending)
+            self._release_timer.daemon = True
+            self._release_timer.start()
+
+    def _cancel_release(self):
+        if self._release_timer is not None:
+            self._release_timer.cancel()
+            self._release_timer = None
+
+    def _release_pending(self):
+        current_app = self.current_app
+        self.coalescer.release(current_app['name'] if current_app else None)
+
+    def recover_sessions(self):
+        """Écrit en base les sessions du journal laissées par une exécution interrompue.
+        Chacune se termine au dernier battement ; ce qui précède la fin de la dernière
+        session en base y est déjà et n'est pas réécrit"""
+        try:
+            record = self.journal.read()
+            if record is None:
+                return 0
+            heartbeat, segments = record
+            last_end = db_manager.get_last_session_end()
+            last_end = datetime.fromisoformat(last_end) if last_end else None
+
+            sessions = []
+            for app_name, app_path, start_time, end_time in segments:
+                if last_end and start_time < last_end:
+                    start_time = last_end
+                duration = int((end_time - start_time).total_seconds())
+                if duration <= 0:
+                    continue
+                sessions.append((app_name, app_path, start_time.isoformat(), end_time.isoformat(), duration))
+                last_end = end_time
+
+            if sessions:
+                db_manager.insert_sessions(sessions)
+                print(f"♻️  {len(sessions)} session(s) récupérée(s) après un arrêt brutal "
+                      f"(dernier battement : {heartbeat:%d/%m %H:%M:%S})")
+            self.journal.clear(heartbeat)
+            self.recovered_sessions += len(sessions)
+            return len(sessions)
+        except Exception as e:
+            print(f"❌ Erreur lors de la récupération des sessions: {e}")
+            return 0
+
+    def _journal_snapshot(self):
+        """Sessions pas encore en base (file d'écriture, regroupement, session ouverte) et heure du battement"""
+        now = self._now()
+        segments = [(app_name, app_path, datetime.fromisoformat(start_time), datetime.fromisoformat(end_time))
+                    for app_name, app_path, start_time, end_time, _ in self.session_writer.pending_sessions()]
+        segments += self.coalescer.pending_segments()
+        current_app, start_time = self.current_app, self.start_time
+        if current_app and start_time:
+            segments.append((current_app['name'], current_app.get('path', ''), start_time, None))
+        return segments, now
+
+    def _now(self):
+        """Heure courante selon la source (temps simulé pour une source simulée)"""
+        return self.source.now() if self.source else datetime.now()
+
+    def _clock_speed(self):
+        """Accélération de l'horloge de la source (1 en temps réel)"""
+        return getattr(self.source, "speed", 1.0) or 1.0
+
+    def _on_quota_exceeded(self, app_name, used, limit):
+        """Appelé par le moteur de quotas à l'instant où un quota est épuisé"""
+        print(f"⚠️  ALERTE: Quota dépassé pour {app_name}!")
+        if self.on_quota_exceeded:
+            self.on_quota_exceeded(app_name, used, limit)
 
     def get_current_session_info(self):
         """Retourne les informations sur la session en cours"""
         if self.current_app and self.start_time:
-            duration = int((datetime.now() - self.start_time).total_seconds())
+            duration = int((self._now() - self.start_time).total_seconds())
             return {
                 "app_name": self.current_app["name"],
                 "start_time": self.start_time,
@@ -241,5 +283,15 @@ class TimeTracker:
             minutes = (seconds % 3600) // 60
             return f"{hours}h {minutes}m"
 
-# Instance globale du tracker
-time_tracker = TimeTracker()
+# Instance globale du tracker de l'interface, créée au premier appel : le mode sans
+# interface (tracker/daemon.py) construit la sienne et n'en crée pas une seconde
+_time_tracker = None
+_time_tracker_lock = threading.Lock()
+
+def get_time_tracker():
+    """Retourne le tracker de l'interface (créé au premier appel)"""
+    global _time_tracker
+    with _time_tracker_lock:
+        if _time_tracker is None:
+            _time_tracker = TimeTracker()
+        return _time_tracker
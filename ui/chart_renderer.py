@@ -0,0 +1,165 @@
+# ui/chart_renderer.py
+# Graphique d'activité : artistes persistants mis à jour en place
+from PyQt6.QtCore import QObject, QEvent
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+
+class ActivityChartRenderer(QObject):
+    """Barres et étiquettes créées une seule fois ; un rafraîchissement ne modifie que
+    leurs hauteurs et leurs textes, et ne redessine que si les données ont changé"""
+
+    def __init__(self, colors, max_bars=5, parent=None):
+        super().__init__(parent)
+        self.max_bars = max_bars
+        self.figure = Figure(figsize=(10, 6), facecolor='#1a1a1a')
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.render_count = 0
+        self._data = None       # dernières données dessinées
+        self._pending = None    # données reçues pendant que le graphique était masqué
+
+        self._setup_axes(colors)
+
+        # Rattraper le rendu différé quand le graphique redevient visible
+        self.canvas.installEventFilter(self)
+
+    def _setup_axes(self, colors):
+        """Style des axes et création des artistes persistants (une seule fois)"""
+        ax = self.ax
+        ax.set_facecolor('#1a1a1a')
+        ax.set_ylabel('Heures', color='white', fontsize=12)
+        ax.set_title('Activité Aujourd\'hui', color='white', fontsize=16, fontweight='bold')
+
+        # Personnaliser les axes
+        ax.tick_params(colors='white', labelsize=10)
+        for spine in ax.spines.values():
+            spine.set_color('white')
+
+        positions = range(self.max_bars)
+        self.bars = ax.bar(positions, [0] * self.max_bars, color=colors[:self.max_bars])
+        self.value_labels = [
+            ax.text(x, 0, '', ha='center', va='bottom', color='white', fontsize=9, fontweight='bold')
+            for x in positions
+        ]
+        for bar, label in zip(self.bars, self.value_labels):
+            bar.set_visible(False)
+            label.set_visible(False)
+
+    def update(self, labels, hours):
+        """Met à jour le graphique ; retourne True si un rendu a été demandé"""
+        data = (tuple(labels[:self.max_bars]), tuple(hours[:self.max_bars]))
+        if data == self._data:
+            self._pending = None
+            return False
+
+        if not self.canvas.isVisible():
+            # Onglet ou fenêtre masqué : aucun rendu, on le fera à l'affichage
+            self._pending = data
+            return False
+
+        self._render(data)
+        return True
+
+    def flush(self):
+        """Dessine les données reçues pendant que le graphique était masqué"""
+        if self._pending is not None and self.canvas.isVisible():
+            self._render(self._pending)
+
+    def eventFilter(self, obj, event):
+        if obj is self.canvas and event.type() == QEvent.Type.Show:
+            self.flush()
+        return False
+
+    def _render(self, data):
+        """Applique les nouvelles valeurs aux artistes existants puis planifie un dessin"""
+        labels, hours = data
+        count = len(labels)
+
+        for i, (bar, label) in enumerate(zip(self.bars, self.value_labels)):
+            visible = i < count
+            bar.set_visible(visible)
+            label.set_visible(visible)
+            if visible:
+                bar.set_height(hours[i])
+                # Valeur affichée au-dessus de la barre
+                label.set_position((bar.get_x() + bar.get_width() / 2., hours[i] + 0.01))
+                label.set_text(f'{hours[i]:.1f}h')
+
+        padded_labels = list(labels) + [''] * (self.max_bars - count)
+        self.ax.set_xticks(range(self.max_bars), padded_labels, rotation=30, ha='right', fontsize=9)
+        self.ax.set_xlim(-0.5, max(count, 1) - 0.5)
+        self.ax.set_ylim(0, max(max(hours, default=0) * 1.15, 0.1))
+
+        self.canvas.draw_idle()
+        self.render_count += 1
+        self._data = data
+        self._pending = None
+
+class HeatmapRenderer(QObject):
+    """Carte jour de la semaine × heure : une seule image matplotlib, dont seules les
+    valeurs changent d'un rafraîchissement à l'autre"""
+
+    DAYS = ["Lun", "Mar", "Mer", "Jeu", "Ven", "Sam", "Dim"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.figure = Figure(figsize=(10, 3.5), facecolor='#1a1a1a')
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.render_count = 0
+        self._data = None       # (titre, matrice 7 × 24 en heures) déjà dessinés
+        self._pending = None
+
+        self._setup_axes()
+        self.canvas.installEventFilter(self)
+
+    def _setup_axes(self):
+        """Style des axes et création de l'image persistante (une seule fois)"""
+        ax = self.ax
+        ax.set_facecolor('#1a1a1a')
+        ax.tick_params(colors='white', labelsize=9)
+        for spine in ax.spines.values():
+            spine.set_color('#404040')
+        ax.set_yticks(range(7), self.DAYS)
+        ax.set_xticks(range(0, 24, 2), [f"{hour}h" for hour in range(0, 24, 2)])
+        self.image = ax.imshow([[0] * 24] * 7, cmap='magma', aspect='auto', vmin=0, vmax=1,
+                               interpolation='nearest')
+        self.colorbar = self.figure.colorbar(self.image, ax=ax, pad=0.01)
+        self.colorbar.ax.tick_params(colors='white', labelsize=8)
+        self.colorbar.set_label('Heures', color='white', fontsize=9)
+        # Titre provisoire : tight_layout lui réserve sa place
+        self.title = ax.set_title('Activité par heure', color='white', fontsize=12, fontweight='bold')
+        self.figure.tight_layout()
+
+    def update(self, title, hours):
+        """Met à jour la carte (hours : matrice 7 × 24) ; retourne True si un rendu a été demandé"""
+        if self._data is not None and title == self._data[0] and (hours == self._data[1]).all():
+            self._pending = None
+            return False
+
+        if not self.canvas.isVisible():
+            self._pending = (title, hours)
+            return False
+
+        self._render((title, hours))
+        return True
+
+    def flush(self):
+        """Dessine les données reçues pendant que la carte était masquée"""
+        if self._pending is not None and self.canvas.isVisible():
+            self._render(self._pending)
+
+    def eventFilter(self, obj, event):
+        if obj is self.canvas and event.type() == QEvent.Type.Show:
+            self.flush()
+        return False
+
+    def _render(self, data):
+        title, hours = data
+        self.image.set_data(hours)
+        self.image.set_clim(0, max(hours.max(), 0.01))
+        self.title.set_text(title)
+        self.canvas.draw_idle()
+        self.render_count += 1
+        self._data = data
+        self._pending = None
@@ -1,27 +1,28 @@
+import importlib
 import sys
 import os
-from datetime import datetime, timedelta
+import threading
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QTabWidget, QLabel, QPushButton, 
-                             QTableWidget, QTableWidgetItem, QProgressBar,
-                             QComboBox, QSpinBox, QMessageBox, QFrame,
-                             QGridLayout, QScrollArea, QGroupBox, QSplitter,
-                             QSystemTrayIcon, QMenu)
-from PyQt6.QtCore import QTimer, Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QFont, QPalette, QColor, QIcon, QPixmap, QAction
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.dates as mdates
-from matplotlib.patches import Rectangle
-import numpy as np
+                             QTableView,
+                             QComboBox, QSpinBox, QMessageBox, QFrame, QDateEdit,
+                             QGridLayout, QGroupBox,
+                             QSystemTrayIcon, QMenu, QFileDialog, QProgressDialog)
+from PyQt6.QtCore import Qt, QThread, QDate, QTimer, pyqtSignal
+from PyQt6.QtGui import QPalette, QColor, QIcon, QPixmap, QAction
 
 # Ajouter le répertoire parent au path pour importer les modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import tracker.db_manager as db_manager
-from tracker.time_tracker import time_tracker
+from tracker import export, periods
+from tracker.time_tracker import get_time_tracker
 from tracker.icon_manager import icon_manager
+from tracker.app_catalog import app_catalog
+from ui.stats_snapshot import (build_stats_snapshot, RefreshCancelled, PeriodSelection, GROUP_BY_LABELS,
+                               format_bucket, SECTION_TODAY, SECTION_PERIOD, SECTION_QUOTAS, SECTION_HEATMAP)
+from ui.table_models import SnapshotTableModel, AppListModel, ProgressBarDelegate
+from ui.refresh_scheduler import RefreshScheduler
 
 class DarkTechTheme:
     """Thème Mode Sombre Tech avec couleurs néon"""
@@ -50,47 +51,172 @@ class DarkTechTheme:
     INFO = NEON_BLUE
 
 class StatsWorker(QThread):
-    """Thread pour mettre à jour les statistiques en arrière-plan"""
-    stats_updated = pyqtSignal()
+    """Thread qui calcule les statistiques en arrière-plan et publie des instantanés"""
+    snapshot_ready = pyqtSignal(object)
+    db_ready = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._condition = threading.Condition()
+        self._pending = None
+        self._latest_request = 0
+        self._running = True
+    
+    def request_refresh(self, period, sections):
+        """Demande un rafraîchissement ; remplace toute demande encore en cours"""
+        with self._condition:
+            self._latest_request += 1
+            self._pending = (self._latest_request, period, frozenset(sections))
+            self._condition.notify()
+    
+    def stop(self):
+        """Arrête le thread après le calcul en cours"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self.wait()
     
     def run(self):
+        try:
+            self._run()
+        finally:
+            # Un nouveau worker ouvrira sa propre connexion
+            db_manager.close_thread_connection()
+    
+    def _run(self):
+        # Ouverture et migration de la base hors du thread de l'interface
+        try:
+            db_manager.init_db()
+        except Exception as e:
+            print(f"❌ Erreur lors de l'initialisation de la base de données: {e}")
+            return
+        self.db_ready.emit()
+        
         while True:
-            self.stats_updated.emit()
-            self.msleep(5000)  # Mise à jour toutes les 5 secondes
+            with self._condition:
+                # Aucun réveil tant qu'aucune demande n'arrive
+                while self._pending is None and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                request_id, period, sections = self._pending
+                self._pending = None
+            
+            try:
+                snapshot = build_stats_snapshot(
+                    request_id, period, sections,
+                    is_cancelled=lambda: request_id != self._latest_request or not self._running)
+            except RefreshCancelled:
+                continue
+            except Exception as e:
+                print(f"❌ Erreur lors du calcul des statistiques: {e}")
+                continue
+            
+            # Transmis au thread de l'interface par une connexion en file d'attente
+            self.snapshot_ready.emit(snapshot)
+
+class ExportWorker(QThread):
+    """Thread d'export des sessions d'une période vers un fichier (CSV ou JSON Lines) ;
+    à la fin du thread, written (sessions écrites) ou error est renseigné, sauf annulation"""
+    progress = pyqtSignal(int, int)
+    
+    def __init__(self, path, start_date, end_date, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.start_date = start_date
+        self.end_date = end_date
+        self.written = None
+        self.error = None
+        self._cancelled = False
+    
+    def cancel(self):
+        """Demande l'arrêt de l'export (au prochain lot ; le fichier partiel est supprimé)"""
+        self._cancelled = True
+    
+    def run(self):
+        try:
+            self.written = export.export_sessions(self.path, self.start_date, self.end_date,
+                                                  progress=self.progress.emit,
+                                                  is_cancelled=lambda: self._cancelled)
+        except export.ExportCancelled:
+            pass
+        except Exception as e:
+            print(f"❌ Erreur lors de l'export des sessions: {e}")
+            self.error = str(e)
+        finally:
+            db_manager.close_thread_connection()
 
 class ChronixMainWindow(QMainWindow):
+    # Émis depuis le moteur de quotas (autre thread), traité dans le thread de l'interface
+    quota_exceeded = pyqtSignal(str, int, int)
+    # Émis par le thread qui importe matplotlib, une fois matplotlib chargé
+    chart_module_loaded = pyqtSignal()
+    
+    # Entrée du sélecteur de la carte d'activité cumulant toutes les applications
+    ALL_APPS_LABEL = "Toutes les applications"
+    # Entrée du sélecteur de période pour une plage choisie avec les dates
+    CUSTOM_PERIOD_LABEL = "Personnalisée"
+    # Première colonne du tableau des statistiques selon le regroupement
+    GROUP_BY_HEADERS = {"app": "Application", "day": "Jour", "week": "Semaine", "month": "Mois"}
+    STATS_HEADERS = ["Temps", "Pourcentage", "Sessions", "Moyenne", "Médiane", "Plus longue"]
+    # Filtres du dialogue d'export et extension ajoutée si le nom choisi n'en a pas
+    EXPORT_FILTERS = {
+        "CSV (*.csv)": ".csv",
+        "CSV compressé (*.csv.gz)": ".csv.gz",
+        "JSON Lines (*.jsonl)": ".jsonl",
+        "JSON Lines compressé (*.jsonl.gz)": ".jsonl.gz",
+    }
+    
+    # Sections de statistiques à calculer pour chaque onglet
+    TAB_SECTIONS = {
+        0: {SECTION_TODAY},
+        1: {SECTION_PERIOD, SECTION_HEATMAP},
+        2: {SECTION_QUOTAS},
+    }
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Chronix - Tracker de Temps")
         self.setGeometry(100, 100, 1200, 800)
         
-        # Initialiser la base de données
-        db_manager.init_db()
-        
+        # Période affichée dans l'onglet Statistiques (qui peut ne pas encore exister)
+        self.selected_period = PeriodSelection(next(iter(periods.PERIODS)))
+        self.db_loaded = False
+        # Export en cours (un seul à la fois) et sa fenêtre de progression
+        self.export_worker = None
+        self.export_progress = None
+        # Tracker de l'interface (créé au premier appel)
+        self.time_tracker = get_time_tracker()
+
         # Appliquer le thème sombre
         self.apply_dark_theme()
         
         # Créer l'interface
         self.setup_ui()
         
-        # Démarrer le tracking
-        time_tracker.start_tracking()
-        
-        # Timer pour mettre à jour l'interface
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_current_session)
-        self.update_timer.start(1000)  # Mise à jour toutes les secondes
-        
-        # Thread pour les statistiques
+        # Thread pour les statistiques : il initialise d'abord la base de données,
+        # puis calcule les statistiques hors du thread de l'interface.
+        # Le tracking démarre quand la base est prête (voir on_db_ready)
+        self.last_snapshot_id = 0
         self.stats_worker = StatsWorker()
-        self.stats_worker.stats_updated.connect(self.update_stats)
+        self.stats_worker.db_ready.connect(self.on_db_ready)
+        self.stats_worker.snapshot_ready.connect(self.update_stats)
         self.stats_worker.start()
         
+        # Session en cours toutes les secondes, onglet actif toutes les 5 secondes,
+        # uniquement quand la fenêtre est visible
+        self.refresh_scheduler = RefreshScheduler(self, self.tab_widget,
+                                                  self.refresh_tab, self.update_current_session)
+        
         # Variable pour le démarrage automatique
         self.startup_enabled = self.check_startup_status()
         
         # Créer l'icône système tray
         self.setup_system_tray()
+        
+        # Notifications de dépassement de quota
+        self.quota_exceeded.connect(self.show_quota_alert)
+        self.time_tracker.on_quota_exceeded = self.quota_exceeded.emit
 
     def apply_dark_theme(self):
         """Applique le thème sombre tech"""
@@ -153,14 +279,14 @@ class ChronixMainWindow(QMainWindow):
             QPushButton:pressed {
                 background-color: #0088cc;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #1a1a1a;
                 alternate-background-color: #2a2a2a;
                 color: #ffffff;
                 gridline-color: #404040;
                 border: 1px solid #404040;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #00d4ff;
                 color: #000000;
             }
@@ -196,7 +322,7 @@ class ChronixMainWindow(QMainWindow):
                 border-right: 5px solid transparent;
                 border-top: 5px solid #ffffff;
             }
-            QSpinBox {
+            QSpinBox, QDateEdit {
                 background-color: #2a2a2a;
                 border: 1px solid #404040;
                 color: #ffffff;
@@ -230,15 +356,28 @@ class ChronixMainWindow(QMainWindow):
         header = self.create_header()
         main_layout.addWidget(header)
         
-        # Onglets principaux
+        # Onglets principaux : seul le tableau de bord est construit au démarrage,
+        # les autres le sont à leur première activation
         self.tab_widget = QTabWidget()
         self.tab_widget.addTab(self.create_dashboard_tab(), "📊 Tableau de Bord")
-        self.tab_widget.addTab(self.create_stats_tab(), "📈 Statistiques")
-        self.tab_widget.addTab(self.create_quotas_tab(), "⏰ Quotas")
-        self.tab_widget.addTab(self.create_settings_tab(), "⚙️ Paramètres")
+        self.tab_builders = {}
+        for builder, title in ((self.create_stats_tab, "📈 Statistiques"),
+                               (self.create_quotas_tab, "⏰ Quotas"),
+                               (self.create_settings_tab, "⚙️ Paramètres")):
+            placeholder = QWidget()
+            QVBoxLayout(placeholder).setContentsMargins(0, 0, 0, 0)
+            self.tab_builders[self.tab_widget.addTab(placeholder, title)] = builder
+        # Connecté avant le planificateur de rafraîchissement : l'onglet existe avant sa mise à jour
+        self.tab_widget.currentChanged.connect(self.build_tab)
         
         main_layout.addWidget(self.tab_widget)
 
+    def build_tab(self, index):
+        """Construit le contenu d'un onglet à sa première activation"""
+        builder = self.tab_builders.pop(index, None)
+        if builder:
+            self.tab_widget.widget(index).layout().addWidget(builder())
+
     def create_header(self):
         """Crée l'en-tête avec le titre et les informations de session"""
         header_frame = QFrame()
@@ -266,11 +405,11 @@ class ChronixMainWindow(QMainWindow):
         
         layout.addStretch()
         
-        # Statut du tracking
-        self.tracking_status = QLabel("🔵 Tracking actif")
+        # Statut du tracking (mis à jour quand la base est prête)
+        self.tracking_status = QLabel("⏳ Initialisation...")
         self.tracking_status.setStyleSheet("""
             font-size: 14px;
-            color: #00ff41;
+            color: #b0b0b0;
             font-weight: bold;
         """)
         layout.addWidget(self.tracking_status)
@@ -308,9 +447,9 @@ class ChronixMainWindow(QMainWindow):
         top_group = QGroupBox("🏆 Top Applications")
         top_layout = QVBoxLayout(top_group)
         
-        self.top_apps_table = QTableWidget()
-        self.top_apps_table.setColumnCount(3)
-        self.top_apps_table.setHorizontalHeaderLabels(["Application", "Temps", "Pourcentage"])
+        self.top_apps_model = SnapshotTableModel(["Application", "Temps", "Pourcentage"], self)
+        self.top_apps_table = QTableView()
+        self.top_apps_table.setModel(self.top_apps_model)
         self.top_apps_table.horizontalHeader().setStretchLastSection(True)
         top_layout.addWidget(self.top_apps_table)
         
@@ -320,11 +459,18 @@ class ChronixMainWindow(QMainWindow):
         chart_group = QGroupBox("📊 Activité en Temps Réel")
         chart_layout = QVBoxLayout(chart_group)
         
-        self.figure = Figure(figsize=(10, 6), facecolor='#1a1a1a')
-        self.canvas = FigureCanvas(self.figure)
-        self.ax = self.figure.add_subplot(111)
-        self.ax.set_facecolor('#1a1a1a')
-        chart_layout.addWidget(self.canvas)
+        # Le graphique (et l'import de matplotlib) est créé au premier rendu, voir update_chart
+        self.chart = None
+        self.chart_data = None
+        self.heatmap = None
+        self.heatmap_snapshot = None
+        self.chart_module_requested = False
+        self.chart_module_loaded.connect(self.on_chart_module_loaded)
+        self.chart_layout = chart_layout
+        self.chart_placeholder = QLabel("Chargement du graphique...")
+        self.chart_placeholder.setStyleSheet("color: #808080;")
+        self.chart_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        chart_layout.addWidget(self.chart_placeholder)
         
         layout.addWidget(chart_group)
         
@@ -340,21 +486,69 @@ class ChronixMainWindow(QMainWindow):
         controls_layout = QHBoxLayout()
         
         self.period_combo = QComboBox()
-        self.period_combo.addItems(["Aujourd'hui", "Cette semaine", "Ce mois", "Semaine dernière", "Mois dernier"])
-        self.period_combo.currentTextChanged.connect(self.update_stats)
+        self.period_combo.addItems([*periods.PERIODS, self.CUSTOM_PERIOD_LABEL])
+        self.period_combo.setCurrentText(self.selected_period.label)
+        self.period_combo.currentTextChanged.connect(self.on_period_changed)
         controls_layout.addWidget(QLabel("Période:"))
         controls_layout.addWidget(self.period_combo)
         
+        # Plage de dates : reflète la période choisie, la modifier passe en période personnalisée
+        self.start_date_edit = QDateEdit()
+        self.end_date_edit = QDateEdit()
+        for date_edit in (self.start_date_edit, self.end_date_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("dd/MM/yyyy")
+        self.show_period_dates()
+        self.start_date_edit.dateChanged.connect(self.on_date_range_changed)
+        self.end_date_edit.dateChanged.connect(self.on_date_range_changed)
+        controls_layout.addWidget(QLabel("Du:"))
+        controls_layout.addWidget(self.start_date_edit)
+        controls_layout.addWidget(QLabel("Au:"))
+        controls_layout.addWidget(self.end_date_edit)
+        
+        self.group_by_combo = QComboBox()
+        self.group_by_combo.addItems(list(GROUP_BY_LABELS))
+        self.group_by_combo.currentTextChanged.connect(self.on_group_by_changed)
+        controls_layout.addWidget(QLabel("Regrouper par:"))
+        controls_layout.addWidget(self.group_by_combo)
+        
         controls_layout.addStretch()
+        
+        # Export des sessions de la période affichée
+        self.export_btn = QPushButton("📤 Exporter")
+        self.export_btn.clicked.connect(self.export_sessions)
+        controls_layout.addWidget(self.export_btn)
         layout.addLayout(controls_layout)
         
         # Tableau des statistiques
-        self.stats_table = QTableWidget()
-        self.stats_table.setColumnCount(4)
-        self.stats_table.setHorizontalHeaderLabels(["Application", "Temps", "Pourcentage", "Sessions"])
+        self.stats_model = SnapshotTableModel(["Application", *self.STATS_HEADERS], self)
+        self.stats_table = QTableView()
+        self.stats_table.setModel(self.stats_model)
         self.stats_table.horizontalHeader().setStretchLastSection(True)
         layout.addWidget(self.stats_table)
         
+        # Heures d'activité de la période, pour une application ou pour toutes
+        heatmap_group = QGroupBox("🗓️ Heures d'Activité")
+        heatmap_layout = QVBoxLayout(heatmap_group)
+        
+        heatmap_controls = QHBoxLayout()
+        self.heatmap_app_combo = QComboBox()
+        self.heatmap_app_combo.addItem(self.ALL_APPS_LABEL)
+        self.heatmap_app_combo.currentTextChanged.connect(self.render_heatmap)
+        heatmap_controls.addWidget(QLabel("Application:"))
+        heatmap_controls.addWidget(self.heatmap_app_combo)
+        heatmap_controls.addStretch()
+        heatmap_layout.addLayout(heatmap_controls)
+        
+        # Comme le graphique du tableau de bord, créée au premier rendu (voir update_heatmap)
+        self.heatmap_layout = heatmap_layout
+        self.heatmap_placeholder = QLabel("Chargement de la carte...")
+        self.heatmap_placeholder.setStyleSheet("color: #808080;")
+        self.heatmap_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        heatmap_layout.addWidget(self.heatmap_placeholder)
+        
+        layout.addWidget(heatmap_group)
+        
         return widget
 
     def create_quotas_tab(self):
@@ -366,8 +560,12 @@ class ChronixMainWindow(QMainWindow):
         add_group = QGroupBox("➕ Ajouter un Quota")
         add_layout = QGridLayout(add_group)
         
+        # Liste alimentée par le catalogue : seuls les ajouts sont insérés, la sélection reste
+        self.app_model = AppListModel(self.get_app_icon, self)
+        icon_manager.icon_ready.connect(self.app_model.refresh_icons)
+        self.app_catalog_position = 0
         self.app_combo = QComboBox()
-        self.update_app_combo()
+        self.app_combo.setModel(self.app_model)
         add_layout.addWidget(QLabel("Application:"), 0, 0)
         add_layout.addWidget(self.app_combo, 0, 1)
         
@@ -388,9 +586,11 @@ class ChronixMainWindow(QMainWindow):
         quotas_group = QGroupBox("📋 Quotas Configurés")
         quotas_layout = QVBoxLayout(quotas_group)
         
-        self.quotas_table = QTableWidget()
-        self.quotas_table.setColumnCount(4)
-        self.quotas_table.setHorizontalHeaderLabels(["Application", "Limite", "Utilisé", "Progression"])
+        self.quotas_model = SnapshotTableModel(["Application", "Limite", "Utilisé", "Progression"], self)
+        self.quotas_table = QTableView()
+        self.quotas_table.setModel(self.quotas_model)
+        # Colonne de progression dessinée par un délégué plutôt qu'un QProgressBar par ligne
+        self.quotas_table.setItemDelegateForColumn(3, ProgressBarDelegate(self.quotas_table))
         self.quotas_table.horizontalHeader().setStretchLastSection(True)
         quotas_layout.addWidget(self.quotas_table)
         
@@ -407,11 +607,12 @@ class ChronixMainWindow(QMainWindow):
         tracking_group = QGroupBox("🔍 Contrôles du Tracking")
         tracking_layout = QVBoxLayout(tracking_group)
         
-        self.tracking_btn = QPushButton("Arrêter le Tracking")
+        self.tracking_btn = QPushButton()
         self.tracking_btn.clicked.connect(self.toggle_tracking)
         tracking_layout.addWidget(self.tracking_btn)
         
         layout.addWidget(tracking_group)
+        self.update_tracking_controls()
         
         # Base de données
         db_group = QGroupBox("🗄️ Base de Données")
@@ -428,161 +629,222 @@ class ChronixMainWindow(QMainWindow):
 
     def update_current_session(self):
         """Met à jour l'affichage de la session en cours"""
-        session_info = time_tracker.get_current_session_info()
+        session_info = self.time_tracker.get_current_session_info()
         
         if session_info:
-            duration = time_tracker.format_duration(session_info["duration"])
+            duration = self.time_tracker.format_duration(session_info["duration"])
             self.current_session_label.setText(f"Session: {session_info['app_name']} - {duration}")
         else:
             self.current_session_label.setText("Aucune session active")
 
-    def update_stats(self):
-        """Met à jour toutes les statistiques"""
-        self.update_today_summary()
-        self.update_top_apps()
-        self.update_stats_table()
-        self.update_quotas_table()
-        self.update_chart()
-        self.update_app_combo()
+    def on_db_ready(self):
+        """Base de données prête : démarrer le tracking"""
+        self.db_loaded = True
+        self.time_tracker.start_tracking()
+        self.update_tracking_controls()
+
+    def on_period_changed(self, period):
+        """Nouvelle période choisie dans l'onglet Statistiques"""
+        if period == self.CUSTOM_PERIOD_LABEL:
+            self.on_date_range_changed()
+            return
+        self.selected_period = PeriodSelection(period, group_by=self.selected_period.group_by)
+        self.show_period_dates()
+        self.request_stats_refresh()
+
+    def on_date_range_changed(self, *_):
+        """Dates modifiées à la main : plage personnalisée"""
+        start_date = self.start_date_edit.date().toPyDate()
+        end_date = self.end_date_edit.date().toPyDate()
+        if start_date > end_date:
+            # Garder une plage valide : l'autre borne suit celle qui vient d'être modifiée
+            if self.sender() is self.end_date_edit:
+                start_date = end_date
+            else:
+                end_date = start_date
+            self.show_period_dates(start_date, end_date)
+        self.period_combo.blockSignals(True)
+        self.period_combo.setCurrentText(self.CUSTOM_PERIOD_LABEL)
+        self.period_combo.blockSignals(False)
+        self.selected_period = PeriodSelection(self.CUSTOM_PERIOD_LABEL, start_date, end_date,
+                                               self.selected_period.group_by)
+        self.request_stats_refresh()
+
+    def on_group_by_changed(self, label):
+        """Nouveau regroupement du tableau (application, jour, semaine ou mois)"""
+        selection = self.selected_period
+        self.selected_period = PeriodSelection(selection.label, selection.start_date, selection.end_date,
+                                               GROUP_BY_LABELS[label])
+        self.request_stats_refresh()
+
+    def show_period_dates(self, start_date=None, end_date=None):
+        """Affiche dans les sélecteurs de dates la plage de la période choisie"""
+        if start_date is None:
+            start_date, end_date = self.selected_period.date_range()
+        for date_edit, day in ((self.start_date_edit, start_date), (self.end_date_edit, end_date)):
+            date_edit.blockSignals(True)
+            date_edit.setDate(QDate(day.year, day.month, day.day))
+            date_edit.blockSignals(False)
+
+    def request_stats_refresh(self):
+        """Demande un nouveau calcul des statistiques de l'onglet affiché"""
+        self.refresh_scheduler.refresh_now()
+
+    def refresh_tab(self, index):
+        """Demande au thread dédié les seules statistiques de l'onglet donné"""
+        sections = self.TAB_SECTIONS.get(index)
+        if sections:
+            self.stats_worker.request_refresh(self.selected_period, sections)
+
+    def update_stats(self, snapshot):
+        """Met à jour toutes les statistiques à partir d'un instantané calculé en arrière-plan"""
+        # Ignorer un instantané plus ancien que celui déjà affiché
+        if snapshot.request_id < self.last_snapshot_id:
+            return
+        self.last_snapshot_id = snapshot.request_id
+        
+        if SECTION_TODAY in snapshot.sections:
+            self.update_today_summary(snapshot)
+            self.update_top_apps(snapshot)
+            self.update_chart(snapshot)
+        if SECTION_PERIOD in snapshot.sections:
+            self.update_stats_table(snapshot)
+        if SECTION_HEATMAP in snapshot.sections:
+            self.update_heatmap(snapshot)
+        if SECTION_QUOTAS in snapshot.sections:
+            self.update_quotas_table(snapshot)
+            self.update_app_combo()
 
     def update_app_combo(self):
-        """Met à jour le combo box des applications avec les icônes"""
-        self.app_combo.clear()
-        apps = db_manager.get_all_apps()
-        
-        for app_name, app_path in apps:
-            # Récupérer l'icône de l'application
-            icon = icon_manager.get_cached_icon(app_name, app_path)
-            if not icon:
-                icon = icon_manager.get_default_icon()
-            
-            self.app_combo.addItem(icon, app_name)
+        """Ajoute au combo box les applications découvertes depuis la dernière mise à jour"""
+        new_apps, self.app_catalog_position = app_catalog.get_since(self.app_catalog_position)
+        self.app_model.add_apps(new_apps)
+
+    def get_app_icon(self, app_name, app_path):
+        """Icône d'une application du combo box (demandée uniquement à l'affichage)"""
+        return icon_manager.get_cached_icon(app_name, app_path) or icon_manager.get_default_icon()
 
-    def update_today_summary(self):
+    def update_today_summary(self, snapshot):
         """Met à jour le résumé d'aujourd'hui"""
-        summary = time_tracker.get_today_summary()
-        
-        total_time = time_tracker.format_duration(summary["total_time"])
+        total_time = self.time_tracker.format_duration(snapshot.today_total)
         self.today_total_label.setText(f"Temps total: {total_time}")
-        self.today_apps_label.setText(f"Applications: {summary['apps_count']}")
+        self.today_apps_label.setText(f"Applications: {snapshot.today_apps_count}")
 
-    def update_top_apps(self):
+    def update_top_apps(self, snapshot):
         """Met à jour le tableau des top applications"""
-        stats = db_manager.get_daily_stats()
-        total_time = sum(seconds for _, seconds in stats)
-        
-        self.top_apps_table.setRowCount(len(stats[:10]))
-        
-        for i, (app_name, seconds) in enumerate(stats[:10]):
-            duration = time_tracker.format_duration(seconds)
-            percentage = (seconds / total_time * 100) if total_time > 0 else 0
-            
-            self.top_apps_table.setItem(i, 0, QTableWidgetItem(app_name))
-            self.top_apps_table.setItem(i, 1, QTableWidgetItem(duration))
-            self.top_apps_table.setItem(i, 2, QTableWidgetItem(f"{percentage:.1f}%"))
+        self.top_apps_model.set_rows(
+            (app_name, self.time_tracker.format_duration(seconds), f"{percentage:.1f}%")
+            for app_name, seconds, percentage in snapshot.top_apps
+        )
 
-    def update_stats_table(self):
+    def update_stats_table(self, snapshot):
         """Met à jour le tableau des statistiques"""
-        period = self.period_combo.currentText()
-        
-        if period == "Aujourd'hui":
-            stats = db_manager.get_daily_stats()
-        elif period == "Cette semaine":
-            stats = db_manager.get_weekly_stats()
-        elif period == "Ce mois":
-            stats = db_manager.get_monthly_stats()
-        elif period == "Semaine dernière":
-            stats = db_manager.get_weekly_stats(1)
-        elif period == "Mois dernier":
-            stats = db_manager.get_monthly_stats(1)
-        else:
-            stats = []
-        
-        total_time = sum(seconds for _, seconds in stats)
-        
-        self.stats_table.setRowCount(len(stats))
-        
-        for i, (app_name, seconds) in enumerate(stats):
-            duration = time_tracker.format_duration(seconds)
-            percentage = (seconds / total_time * 100) if total_time > 0 else 0
-            
-            self.stats_table.setItem(i, 0, QTableWidgetItem(app_name))
-            self.stats_table.setItem(i, 1, QTableWidgetItem(duration))
-            self.stats_table.setItem(i, 2, QTableWidgetItem(f"{percentage:.1f}%"))
-            self.stats_table.setItem(i, 3, QTableWidgetItem("N/A"))  # Sessions count
+        group_by = snapshot.period.group_by
+        if not self.selected_period.start_date:
+            # Période nommée : ses dates changent avec le jour courant
+            self.show_period_dates()
+        self.stats_model.set_headers([self.GROUP_BY_HEADERS[group_by], *self.STATS_HEADERS])
+        self.stats_model.set_rows(
+            (key if group_by == "app" else format_bucket(key, group_by),
+             self.time_tracker.format_duration(seconds), f"{percentage:.1f}%", str(count),
+             *(self.time_tracker.format_duration(value) if count else "-" for value in (average, median, longest)))
+            for key, seconds, percentage, count, average, median, longest in snapshot.period_stats
+        )
 
-    def update_quotas_table(self):
+    def update_quotas_table(self, snapshot):
         """Met à jour le tableau des quotas"""
-        quotas = db_manager.get_quotas()
-        
-        self.quotas_table.setRowCount(len(quotas))
-        
-        for i, (app_name, limit_minutes) in enumerate(quotas):
-            used_seconds, limit_seconds, percentage = db_manager.get_quota_usage(app_name)
-            
-            used_time = time_tracker.format_duration(used_seconds)
-            limit_time = time_tracker.format_duration(limit_seconds)
-            
-            self.quotas_table.setItem(i, 0, QTableWidgetItem(app_name))
-            self.quotas_table.setItem(i, 1, QTableWidgetItem(limit_time))
-            self.quotas_table.setItem(i, 2, QTableWidgetItem(used_time))
-            
-            # Barre de progression
-            progress = QProgressBar()
-            progress.setValue(int(percentage))
-            if percentage > 100:
-                progress.setStyleSheet("QProgressBar::chunk { background-color: #ff4444; }")
-            elif percentage > 80:
-                progress.setStyleSheet("QProgressBar::chunk { background-color: #ff6b35; }")
-            else:
-                progress.setStyleSheet("QProgressBar::chunk { background-color: #00d4ff; }")
-            
-            self.quotas_table.setCellWidget(i, 3, progress)
+        # La dernière colonne porte le pourcentage brut, dessiné par ProgressBarDelegate
+        self.quotas_model.set_rows(
+            (app_name, self.time_tracker.format_duration(limit_seconds),
+             self.time_tracker.format_duration(used_seconds), percentage)
+            for app_name, used_seconds, limit_seconds, percentage in snapshot.quota_usage
+        )
 
-    def update_chart(self):
-        """Met à jour le graphique d'activité"""
-        self.ax.clear()
-        
-        # Données d'exemple pour le graphique
-        stats = db_manager.get_daily_stats()
-        if stats:
-            apps = [app for app, _ in stats[:5]]
-            times = [seconds/3600 for _, seconds in stats[:5]]  # Convertir en heures
-            
-            # Tronquer les noms d'applications pour éviter le débordement
-            truncated_apps = []
-            for app in apps:
-                if len(app) > 12:
-                    truncated_apps.append(app[:10] + "...")
-                else:
-                    truncated_apps.append(app)
-            
-            colors = [DarkTechTheme.NEON_BLUE, DarkTechTheme.NEON_PURPLE, 
-                     DarkTechTheme.NEON_GREEN, DarkTechTheme.NEON_ORANGE, 
-                     DarkTechTheme.NEON_PINK]
-            
-            bars = self.ax.bar(truncated_apps, times, color=colors[:len(truncated_apps)])
-            self.ax.set_ylabel('Heures', color='white', fontsize=12)
-            self.ax.set_title('Activité Aujourd\'hui', color='white', fontsize=16, fontweight='bold')
-            
-            # Personnaliser les axes
-            self.ax.tick_params(colors='white', labelsize=10)
-            self.ax.spines['bottom'].set_color('white')
-            self.ax.spines['top'].set_color('white')
-            self.ax.spines['left'].set_color('white')
-            self.ax.spines['right'].set_color('white')
-            
-            # Rotation des labels et ajustement de la taille
-            plt.setp(self.ax.get_xticklabels(), rotation=30, ha='right', fontsize=9)
-            
-            # Ajouter les valeurs sur les barres
-            for i, (bar, time_val) in enumerate(zip(bars, times)):
-                height = bar.get_height()
-                self.ax.text(bar.get_x() + bar.get_width()/2., height + 0.01,
-                           f'{time_val:.1f}h', ha='center', va='bottom', 
-                           color='white', fontsize=9, fontweight='bold')
-        
-        self.canvas.draw()
+    def update_chart(self, snapshot):
+        """Met à jour le graphique d'activité (rendu ignoré si rien n'a changé ou s'il est masqué)"""
+        self.chart_data = (snapshot.chart_labels, snapshot.chart_hours)
+        if self.chart is not None:
+            self.chart.update(*self.chart_data)
+        else:
+            self.request_chart_module()
+
+    def request_chart_module(self):
+        """Import différé : matplotlib n'est chargé qu'au premier rendu d'un graphique,
+        dans un thread pour ne pas figer la fenêtre qui vient de s'afficher"""
+        if "matplotlib.figure" in sys.modules:
+            self.create_charts()
+        elif not self.chart_module_requested:
+            self.chart_module_requested = True
+            threading.Thread(target=self.load_chart_module, name="chronix-chart-import", daemon=True).start()
+
+    def load_chart_module(self):
+        """Importe matplotlib hors du thread de l'interface ; son backend Qt (ui.chart_renderer)
+        crée des objets Qt et n'est importé que dans le thread de l'interface"""
+        importlib.import_module("matplotlib.figure")
+        self.chart_module_loaded.emit()
+
+    def on_chart_module_loaded(self):
+        """matplotlib chargé : les graphiques sont créés au prochain tour de la boucle d'événements"""
+        QTimer.singleShot(0, self.create_charts)
+
+    def create_charts(self):
+        """Crée le graphique d'activité et la carte d'activité qui ont des données à afficher"""
+        self.create_chart()
+        self.create_heatmap()
+
+    def create_chart(self):
+        """Remplace l'emplacement réservé par le graphique, avec les dernières données reçues"""
+        if self.chart is not None or self.chart_data is None:
+            return
+        from ui.chart_renderer import ActivityChartRenderer
+        self.chart = ActivityChartRenderer([DarkTechTheme.NEON_BLUE, DarkTechTheme.NEON_PURPLE,
+                                            DarkTechTheme.NEON_GREEN, DarkTechTheme.NEON_ORANGE,
+                                            DarkTechTheme.NEON_PINK], parent=self)
+        self.chart_layout.replaceWidget(self.chart_placeholder, self.chart.canvas)
+        self.chart_placeholder.deleteLater()
+        self.chart.update(*self.chart_data)
+
+    def update_heatmap(self, snapshot):
+        """Met à jour le sélecteur d'applications et la carte d'activité de la période"""
+        self.heatmap_snapshot = snapshot
+        apps = [self.ALL_APPS_LABEL, *snapshot.heatmap_apps]
+        current = [self.heatmap_app_combo.itemText(i) for i in range(self.heatmap_app_combo.count())]
+        if apps != current:
+            # Conserver l'application choisie si elle est toujours parmi les plus utilisées
+            selected = self.heatmap_app_combo.currentText()
+            self.heatmap_app_combo.blockSignals(True)
+            self.heatmap_app_combo.clear()
+            self.heatmap_app_combo.addItems(apps)
+            self.heatmap_app_combo.setCurrentText(selected if selected in apps else self.ALL_APPS_LABEL)
+            self.heatmap_app_combo.blockSignals(False)
+        
+        if self.heatmap is not None:
+            self.render_heatmap()
+        else:
+            self.request_chart_module()
+
+    def create_heatmap(self):
+        """Remplace l'emplacement réservé par la carte d'activité"""
+        if self.heatmap is not None or self.heatmap_snapshot is None:
+            return
+        from ui.chart_renderer import HeatmapRenderer
+        self.heatmap = HeatmapRenderer(parent=self)
+        self.heatmap_layout.replaceWidget(self.heatmap_placeholder, self.heatmap.canvas)
+        self.heatmap_placeholder.deleteLater()
+        self.render_heatmap()
+
+    def render_heatmap(self, *_):
+        """Dessine la ligne de la matrice correspondant à l'application choisie (sans requête)"""
+        snapshot = self.heatmap_snapshot
+        if self.heatmap is None or snapshot is None:
+            return
+        app_name = self.heatmap_app_combo.currentText()
+        if app_name in snapshot.heatmap_apps:
+            hours = snapshot.heatmap[snapshot.heatmap_apps.index(app_name)] / 3600
+        else:
+            hours = snapshot.heatmap[-1] / 3600
+        total = self.time_tracker.format_duration(int(hours.sum() * 3600))
+        self.heatmap.update(f"{app_name} — {snapshot.period.title()} ({total})", hours)
 
     def add_quota(self):
         """Ajoute un nouveau quota"""
@@ -591,21 +853,89 @@ class ChronixMainWindow(QMainWindow):
         
         if app_name:
             db_manager.add_quota(app_name, limit_minutes)
-            self.update_quotas_table()
+            self.time_tracker.quota_engine.reload()
+            self.request_stats_refresh()
             QMessageBox.information(self, "Succès", f"Quota ajouté pour {app_name}")
 
+    def export_sessions(self):
+        """Exporte les sessions de la période affichée, dans un thread avec une barre de progression"""
+        if self.export_worker is not None:
+            return
+        start_date, end_date = self.selected_period.date_range()
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Exporter les sessions", f"chronix-sessions-{start_date}-{end_date}.csv",
+            ";;".join(self.EXPORT_FILTERS))
+        if not path:
+            return
+        if not path.lower().endswith((".csv", ".jsonl", ".ndjson", ".gz")):
+            path += self.EXPORT_FILTERS.get(selected_filter, ".csv")
+        
+        self.export_progress = QProgressDialog("Export des sessions...", "Annuler", 0, 0, self)
+        self.export_progress.setWindowTitle("Chronix")
+        self.export_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.export_progress.setMinimumDuration(500)
+        
+        self.export_worker = ExportWorker(path, start_date, end_date, self)
+        self.export_worker.progress.connect(self.show_export_progress)
+        self.export_worker.finished.connect(self.on_export_done)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+        self.export_btn.setEnabled(False)
+        self.export_worker.start()
+
+    def show_export_progress(self, written, total):
+        """Avancement de l'export (en sessions écrites)"""
+        if self.export_progress is None:
+            return
+        self.export_progress.setMaximum(max(total, 1))
+        self.export_progress.setValue(written)
+        self.export_progress.setLabelText(f"Export des sessions... {written} / {total}")
+
+    def on_export_done(self):
+        """Fin du thread d'export (terminé, annulé ou en échec)"""
+        worker = self.export_worker
+        self.export_progress.close()
+        self.export_progress = None
+        self.export_worker = None
+        worker.deleteLater()
+        self.export_btn.setEnabled(True)
+        
+        if worker.error is not None:
+            QMessageBox.warning(self, "Erreur", f"L'export a échoué: {worker.error}")
+        elif worker.written is not None:
+            QMessageBox.information(self, "Succès", f"{worker.written} sessions exportées vers {worker.path}")
+
+    def show_quota_alert(self, app_name, used_seconds, limit_seconds):
+        """Affiche une notification quand un quota quotidien est épuisé"""
+        limit_time = self.time_tracker.format_duration(limit_seconds)
+        self.tray_icon.showMessage("Chronix - Quota dépassé",
+                                   f"{app_name} a atteint sa limite quotidienne ({limit_time})",
+                                   QSystemTrayIcon.MessageIcon.Warning, 5000)
+
     def toggle_tracking(self):
         """Active/désactive le tracking"""
-        if time_tracker.is_tracking:
-            time_tracker.stop_tracking()
-            self.tracking_btn.setText("Démarrer le Tracking")
-            self.tracking_status.setText("🔴 Tracking arrêté")
-            self.tracking_status.setStyleSheet("color: #ff4444; font-weight: bold;")
+        if not self.db_loaded:
+            return
+        if self.time_tracker.is_tracking:
+            self.time_tracker.stop_tracking()
         else:
-            time_tracker.start_tracking()
-            self.tracking_btn.setText("Arrêter le Tracking")
+            self.time_tracker.start_tracking()
+        self.update_tracking_controls()
+
+    def update_tracking_controls(self):
+        """Aligne le statut, le bouton des paramètres et l'action du tray sur l'état du tracking"""
+        if not self.db_loaded:
+            return
+        button_text = "Arrêter le Tracking" if self.time_tracker.is_tracking else "Démarrer le Tracking"
+        if self.time_tracker.is_tracking:
             self.tracking_status.setText("🔵 Tracking actif")
             self.tracking_status.setStyleSheet("color: #00ff41; font-weight: bold;")
+        else:
+            self.tracking_status.setText("🔴 Tracking arrêté")
+            self.tracking_status.setStyleSheet("color: #ff4444; font-weight: bold;")
+        self.tracking_action.setText(button_text)
+        # Le bouton n'existe qu'une fois l'onglet Paramètres construit
+        if hasattr(self, "tracking_btn"):
+            self.tracking_btn.setText(button_text)
 
     def clear_history(self):
         """Vide l'historique des sessions"""
@@ -675,18 +1005,7 @@ class ChronixMainWindow(QMainWindow):
 
     def toggle_tracking_from_tray(self):
         """Active/désactive le tracking depuis le tray"""
-        if time_tracker.is_tracking:
-            time_tracker.stop_tracking()
-            self.tracking_action.setText("Démarrer le Tracking")
-            self.tracking_btn.setText("Démarrer le Tracking")
-            self.tracking_status.setText("🔴 Tracking arrêté")
-            self.tracking_status.setStyleSheet("color: #ff4444; font-weight: bold;")
-        else:
-            time_tracker.start_tracking()
-            self.tracking_action.setText("Arrêter le Tracking")
-            self.tracking_btn.setText("Arrêter le Tracking")
-            self.tracking_status.setText("🔵 Tracking actif")
-            self.tracking_status.setStyleSheet("color: #00ff41; font-weight: bold;")
+        self.toggle_tracking()
 
     def check_startup_status(self):
         """Vérifie si l'application est configurée pour le démarrage automatique"""
@@ -739,7 +1058,11 @@ class ChronixMainWindow(QMainWindow):
 
     def quit_application(self):
         """Quitte complètement l'application"""
-        time_tracker.stop_tracking()
+        self.time_tracker.shutdown()
+        self.stats_worker.stop()
+        if self.export_worker is not None:
+            self.export_worker.cancel()
+            self.export_worker.wait()
         self.tray_icon.hide()
         QApplication.quit()
 
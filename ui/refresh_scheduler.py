@@ -0,0 +1,67 @@
+# ui/refresh_scheduler.py
+# Planification des rafraîchissements selon la visibilité de la fenêtre et l'onglet actif
+from PyQt6.QtCore import QObject, QEvent, QTimer
+
+class RefreshScheduler(QObject):
+    """Ne rafraîchit que l'onglet affiché, suspend tout quand la fenêtre est masquée
+    ou réduite, et rattrape avec un seul rafraîchissement à l'affichage"""
+
+    def __init__(self, window, tab_widget, refresh_tab, refresh_session,
+                 stats_interval=5000, session_interval=1000):
+        super().__init__(window)
+        self.window = window
+        self.tab_widget = tab_widget
+        self.refresh_tab = refresh_tab            # appelé avec l'index de l'onglet affiché
+        self.refresh_session = refresh_session    # mise à jour de la session en cours (en-tête)
+        self.active = False
+
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(stats_interval)
+        self.stats_timer.timeout.connect(self.refresh_now)
+
+        self.session_timer = QTimer(self)
+        self.session_timer.setInterval(session_interval)
+        self.session_timer.timeout.connect(self.refresh_session)
+
+        tab_widget.currentChanged.connect(self._on_tab_changed)
+        window.installEventFilter(self)
+
+    def refresh_now(self):
+        """Rafraîchit immédiatement l'onglet affiché (sans effet si la fenêtre est masquée)"""
+        if self.active:
+            self.refresh_tab(self.tab_widget.currentIndex())
+
+    def resume(self):
+        """Fenêtre visible : relance les minuteries et rattrape le retard en une fois"""
+        if self.active:
+            return
+        self.active = True
+        self.session_timer.start()
+        self.stats_timer.start()
+        self.refresh_session()
+        self.refresh_now()
+
+    def suspend(self):
+        """Fenêtre masquée ou réduite : plus aucun réveil lié à l'interface"""
+        self.active = False
+        self.session_timer.stop()
+        self.stats_timer.stop()
+
+    def _on_tab_changed(self, index):
+        if self.active:
+            # Rafraîchir le nouvel onglet tout de suite et repartir pour un intervalle complet
+            self.stats_timer.start()
+            self.refresh_tab(index)
+
+    def eventFilter(self, obj, event):
+        if obj is self.window:
+            if event.type() == QEvent.Type.Show and not self.window.isMinimized():
+                self.resume()
+            elif event.type() == QEvent.Type.Hide:
+                self.suspend()
+            elif event.type() == QEvent.Type.WindowStateChange:
+                if self.window.isMinimized():
+                    self.suspend()
+                elif self.window.isVisible():
+                    self.resume()
+        return False
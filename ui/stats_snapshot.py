@@ -0,0 +1,199 @@
+# ui/stats_snapshot.py
+# Calcul des statistiques du tableau de bord, hors du thread de l'interface
+import os
+import sys
+from dataclasses import dataclass
+from datetime import date
+
+# Ajouter le répertoire parent au path pour importer les modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracker.db_manager as db_manager
+from tracker import periods
+from tracker.app_catalog import app_catalog
+from tracker.app_names import app_name_resolver
+from tracker.time_tracker import get_time_tracker
+
+# Regroupements proposés pour le tableau de l'onglet Statistiques (libellé -> group_by)
+GROUP_BY_LABELS = {
+    "Application": "app",
+    "Jour": "day",
+    "Semaine": "week",
+    "Mois": "month",
+}
+
+@dataclass(frozen=True)
+class PeriodSelection:
+    """Période de l'onglet Statistiques : une période nommée (recalculée à chaque
+    rafraîchissement, « Aujourd'hui » change à minuit) ou une plage de dates fixe"""
+    label: str
+    start_date: date = None
+    end_date: date = None
+    group_by: str = "app"
+
+    def date_range(self):
+        """Dates (début, fin) incluses"""
+        if self.start_date and self.end_date:
+            return self.start_date, self.end_date
+        return periods.period_range(self.label)
+
+    def title(self):
+        """Libellé affiché (les dates pour une plage personnalisée)"""
+        if self.start_date and self.end_date:
+            return f"du {self.start_date:%d/%m/%Y} au {self.end_date:%d/%m/%Y}"
+        return self.label
+
+MONTH_NAMES = ["janvier", "février", "mars", "avril", "mai", "juin", "juillet",
+               "août", "septembre", "octobre", "novembre", "décembre"]
+
+def format_bucket(bucket, group_by):
+    """Libellé d'une tranche de get_range_stats (début ISO) pour le tableau"""
+    day = date.fromisoformat(bucket)
+    if group_by == "week":
+        return f"Semaine du {day:%d/%m/%Y}"
+    if group_by == "month":
+        return f"{MONTH_NAMES[day.month - 1].capitalize()} {day.year}"
+    return f"{day:%d/%m/%Y}"
+
+TOP_APPS_COUNT = 10
+HEATMAP_APPS_COUNT = 30
+CHART_APPS_COUNT = 5
+CHART_LABEL_LENGTH = 12
+
+# Sections calculables indépendamment, selon l'onglet affiché
+SECTION_TODAY = "today"     # résumé du jour, top applications et graphique
+SECTION_PERIOD = "period"   # tableau de l'onglet Statistiques
+SECTION_QUOTAS = "quotas"   # utilisation des quotas et liste des applications
+SECTION_HEATMAP = "heatmap" # heures d'activité de la période (onglet Statistiques)
+ALL_SECTIONS = frozenset({SECTION_TODAY, SECTION_PERIOD, SECTION_QUOTAS, SECTION_HEATMAP})
+
+class RefreshCancelled(Exception):
+    """Levée quand une demande plus récente rend le calcul en cours inutile"""
+
+@dataclass(frozen=True)
+class StatsSnapshot:
+    """Instantané immuable de ce qu'affichent les onglets de statistiques ;
+    les champs des sections non demandées restent à None"""
+    request_id: int
+    period: PeriodSelection
+    sections: frozenset
+    today_total: int = None
+    today_apps_count: int = None
+    top_apps: tuple = None       # ((app_name, seconds, percentage), ...)
+    chart_labels: tuple = None   # noms tronqués pour l'axe du graphique
+    chart_hours: tuple = None    # temps en heures, dans le même ordre
+    period_stats: tuple = None   # ((app_name, seconds, percentage, session_count, average_sec,
+                                 # median_sec, max_sec), ...), ou le début ISO de la tranche à la
+                                 # place de app_name selon period.group_by
+    quota_usage: tuple = None    # ((app_name, used_seconds, limit_seconds, percentage), ...)
+    heatmap_apps: tuple = None   # applications les plus utilisées de la période
+    heatmap: object = None       # matrice numpy (len(heatmap_apps) + 1, 7, 24) en secondes,
+                                 # la dernière ligne totalisant toutes les applications
+
+def canonical_stats(stats):
+    """Regroupe les (app_name, seconds) sous leur nom canonique (alias du fichier de règles)"""
+    totals = {}
+    for app_name, seconds in stats:
+        app_name = app_name_resolver.canonical(app_name)
+        totals[app_name] = totals.get(app_name, 0) + seconds
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+def canonical_session_stats(stats):
+    """Regroupe les (app_name, seconds, session_count, average_sec, median_sec, max_sec) sous leur
+    nom canonique ; la médiane de plusieurs alias est la moyenne de leurs médianes pondérée par
+    leur nombre de sessions (approximation)"""
+    merged = {}
+    for app_name, seconds, count, average, median, longest in stats:
+        app_name = app_name_resolver.canonical(app_name)
+        total, sessions, session_sec, median_sum, maximum = merged.get(app_name, (0, 0, 0, 0, 0))
+        merged[app_name] = (total + seconds, sessions + count, session_sec + average * count,
+                            median_sum + median * count, max(maximum, longest))
+    rows = [(app_name, total, sessions, round(session_sec / sessions) if sessions else 0,
+             round(median_sum / sessions) if sessions else 0, maximum)
+            for app_name, (total, sessions, session_sec, median_sum, maximum) in merged.items()]
+    return sorted(rows, key=lambda row: row[1], reverse=True)
+
+def live_quota_usage(rows):
+    """Remplace l'utilisation lue en base par celle du moteur de quotas pendant le tracking :
+    session en cours et sessions pas encore écrites comprises, comme pour les alertes"""
+    time_tracker = get_time_tracker()
+    if not time_tracker.is_tracking:
+        return rows
+    live = {app_name: used for app_name, used, _, _ in time_tracker.quota_engine.get_usage()}
+    results = []
+    for app_name, used, limit, percentage in rows:
+        used = live.get(app_name_resolver.canonical(app_name), used)
+        results.append((app_name, used, limit, (used / limit) * 100 if limit > 0 else 0))
+    return results
+
+def canonical_heatmap(app_names, matrix, limit=HEATMAP_APPS_COUNT):
+    """Regroupe les lignes de la matrice sous les noms canoniques, garde les `limit` applications
+    les plus utilisées et ajoute une dernière ligne pour l'ensemble des applications"""
+    import numpy as np
+
+    names = {}
+    rows = [names.setdefault(app_name_resolver.canonical(app_name), len(names)) for app_name in app_names]
+    merged = np.zeros((len(names), 7, 24))
+    np.add.at(merged, np.array(rows, dtype=np.int64), matrix)
+
+    order = np.argsort(-merged.sum(axis=(1, 2)), kind="stable")[:limit]
+    labels = list(names)
+    result = np.concatenate([merged[order], merged.sum(axis=0, keepdims=True)])
+    result.flags.writeable = False
+    return tuple(labels[i] for i in order), result
+
+def with_percentages(stats):
+    """Ajoute à chaque (app_name, seconds, ...) sa part du temps total, en troisième position"""
+    total_time = sum(row[1] for row in stats)
+    return tuple((app_name, seconds, (seconds / total_time * 100) if total_time > 0 else 0, *rest)
+                 for app_name, seconds, *rest in stats)
+
+def truncate_label(app_name):
+    """Tronque les noms d'applications pour éviter le débordement sur l'axe"""
+    if len(app_name) > CHART_LABEL_LENGTH:
+        return app_name[:CHART_LABEL_LENGTH - 2] + "..."
+    return app_name
+
+def build_stats_snapshot(request_id, period, sections=ALL_SECTIONS, is_cancelled=lambda: False):
+    """Exécute les requêtes des sections demandées et retourne un StatsSnapshot"""
+    def checkpoint():
+        if is_cancelled():
+            raise RefreshCancelled()
+
+    values = {}
+
+    if SECTION_TODAY in sections:
+        today_stats = canonical_stats(db_manager.get_daily_stats())
+        checkpoint()
+        chart_stats = today_stats[:CHART_APPS_COUNT]
+        values.update(
+            today_total=sum(seconds for _, seconds in today_stats),
+            today_apps_count=len(today_stats),
+            top_apps=with_percentages(today_stats)[:TOP_APPS_COUNT],
+            chart_labels=tuple(truncate_label(app_name) for app_name, _ in chart_stats),
+            chart_hours=tuple(seconds / 3600 for _, seconds in chart_stats),
+        )
+
+    if SECTION_PERIOD in sections:
+        # Sommes cumulées des totaux quotidiens et statistiques des sessions en un seul appel
+        stats = db_manager.get_range_stats(*period.date_range(), group_by=period.group_by, sessions=True)
+        if period.group_by == "app":
+            stats = canonical_session_stats(stats)
+        values["period_stats"] = with_percentages(stats)
+        checkpoint()
+
+    if SECTION_HEATMAP in sections:
+        app_names, matrix = db_manager.get_usage_heatmap(*period.date_range())
+        values["heatmap_apps"], values["heatmap"] = canonical_heatmap(app_names, matrix)
+        checkpoint()
+
+    if SECTION_QUOTAS in sections:
+        # Un quota posé sur un nom devenu alias compte le temps du nom qui le remplace
+        values["quota_usage"] = tuple(live_quota_usage(
+            db_manager.get_all_quota_usage(aliases=app_name_resolver.alias_pairs())))
+        checkpoint()
+        # Le catalogue ne lit que les applications ajoutées depuis la dernière fois
+        app_catalog.sync()
+        checkpoint()
+
+    return StatsSnapshot(request_id=request_id, period=period, sections=frozenset(sections), **values)
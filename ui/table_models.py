@@ -0,0 +1,157 @@
+# ui/table_models.py
+# Modèles de tableaux mis à jour par différence, sans recréer d'éléments ni de widgets
+import bisect
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex, QRectF
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+
+class SnapshotTableModel(QAbstractTableModel):
+    """Tableau alimenté par des lignes (tuples de valeurs) ; à chaque nouvel instantané,
+    seules les cellules modifiées émettent dataChanged"""
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def set_headers(self, headers):
+        """Change les libellés des colonnes (même nombre de colonnes)"""
+        headers = list(headers)
+        if headers != self.headers:
+            self.headers = headers
+            self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, len(headers) - 1)
+
+    def set_rows(self, rows):
+        """Remplace le contenu en n'émettant que les changements nécessaires"""
+        new_rows = [tuple(row) for row in rows]
+        old_count, new_count = len(self.rows), len(new_rows)
+
+        # Ajuster le nombre de lignes en fin de tableau
+        if new_count < old_count:
+            self.beginRemoveRows(QModelIndex(), new_count, old_count - 1)
+            del self.rows[new_count:]
+            self.endRemoveRows()
+        elif new_count > old_count:
+            self.beginInsertRows(QModelIndex(), old_count, new_count - 1)
+            self.rows.extend(new_rows[old_count:])
+            self.endInsertRows()
+
+        # Lignes existantes : signaler uniquement la plage de colonnes modifiées
+        for row in range(min(old_count, new_count)):
+            old, new = self.rows[row], new_rows[row]
+            if old == new:
+                continue
+            changed = [column for column, (a, b) in enumerate(zip(old, new)) if a != b]
+            self.rows[row] = new
+            self.dataChanged.emit(self.index(row, changed[0]), self.index(row, changed[-1]),
+                                  [Qt.ItemDataRole.DisplayRole])
+
+class AppListModel(QAbstractListModel):
+    """Liste triée des applications (nom, chemin) pour un QComboBox : chaque ajout est inséré
+    à sa place sans réinitialiser le modèle, la sélection courante est donc conservée.
+    Les icônes ne sont demandées que pour les lignes effectivement affichées"""
+
+    PATH_ROLE = Qt.ItemDataRole.UserRole
+
+    def __init__(self, icon_provider=None, parent=None):
+        super().__init__(parent)
+        self.icon_provider = icon_provider  # (app_name, app_path) -> QIcon
+        self.apps = []                      # [(app_name, app_path)], triée sans casse
+        self._keys = []                     # clés de tri, pour bisect
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.apps)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        app_name, app_path = self.apps[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return app_name
+        if role == Qt.ItemDataRole.DecorationRole and self.icon_provider:
+            return self.icon_provider(app_name, app_path)
+        if role == self.PATH_ROLE:
+            return app_path
+        return None
+
+    def refresh_icons(self, *_):
+        """Signale que des icônes ont changé (rendu terminé) ; seules les lignes visibles sont redessinées"""
+        if self.apps:
+            self.dataChanged.emit(self.index(0), self.index(len(self.apps) - 1),
+                                  [Qt.ItemDataRole.DecorationRole])
+
+    def add_apps(self, apps):
+        """Insère de nouvelles applications à leur place dans l'ordre alphabétique"""
+        apps = sorted(apps, key=lambda app: app[0].casefold())
+        if not apps:
+            return
+
+        if not self.apps:
+            # Premier remplissage : une seule insertion pour toute la liste
+            self.beginInsertRows(QModelIndex(), 0, len(apps) - 1)
+            self.apps = apps
+            self._keys = [app_name.casefold() for app_name, _ in apps]
+            self.endInsertRows()
+            return
+
+        for app in apps:
+            key = app[0].casefold()
+            row = bisect.bisect_right(self._keys, key)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._keys.insert(row, key)
+            self.apps.insert(row, app)
+            self.endInsertRows()
+
+class ProgressBarDelegate(QStyledItemDelegate):
+    """Dessine une barre de progression à partir d'un pourcentage, sans widget enfant"""
+
+    def paint(self, painter, option, index):
+        percentage = index.data() or 0
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        rect = QRectF(option.rect.adjusted(4, 4, -4, -4))
+
+        # Fond et bordure
+        painter.setPen(QColor("#404040"))
+        painter.setBrush(QColor("#1a1a1a"))
+        painter.drawRoundedRect(rect, 4, 4)
+
+        # Remplissage coloré selon le niveau d'utilisation
+        if percentage > 100:
+            color = "#ff4444"
+        elif percentage > 80:
+            color = "#ff6b35"
+        else:
+            color = "#00d4ff"
+
+        fill_width = (rect.width() - 2) * min(percentage, 100) / 100
+        if fill_width > 0:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(color))
+            painter.drawRoundedRect(QRectF(rect.x() + 1, rect.y() + 1, fill_width, rect.height() - 2), 3, 3)
+
+        painter.setPen(QColor("#ffffff"))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, f"{int(percentage)}%")
+        painter.restore()